@@ -244,6 +244,32 @@ DEFAULT_FROM_EMAIL = "CatzoTeam <catzo.code@gmail.com>"
 GMAIL_USER = config('GMAIL_USER', default='')
 GMAIL_APP_PASSWORD = config('GMAIL_APP_PASSWORD', default='')
 
+# ============================================
+# BACKGROUND EXPORTS
+# ============================================
+# 'thread': the web process drains the export queue itself
+# 'process': only `manage.py run_export_worker` does
+# Deploys that also run run_export_worker must set 'process' on web (the Procfile does)
+EXPORT_WORKER_MODE = config('EXPORT_WORKER_MODE', default='thread')
+EXPORT_JOB_TTL = config('EXPORT_JOB_TTL', default=24 * 3600, cast=int)  # seconds
+EXPORT_REUSE_WINDOW = config('EXPORT_REUSE_WINDOW', default=600, cast=int)  # seconds
+
+# ============================================
+# BACKGROUND OCR
+# ============================================
+# 'inline': the web process runs uploaded screenshots through its own pool
+# 'process': only `manage.py run_ocr_worker` does
+# Deploys that also run run_ocr_worker must set 'process' on web (the Procfile does);
+# 'inline' stays the default for single-process deploys (Dockerfile/Render, Railway)
+OCR_WORKER_MODE = config('OCR_WORKER_MODE', default='inline')
+OCR_POOL_SIZE = config('OCR_POOL_SIZE', default=2, cast=int)  # worker processes
+OCR_CACHE_SIZE = config('OCR_CACHE_SIZE', default=500, cast=int)  # results kept by screenshot hash (0 = off)
+# Overrides for registration_portal.ocr_preprocess.DEFAULT_PREPROCESSING
+# Off until `manage.py ocr_benchmark` on real screenshots shows it helps
+OCR_PREPROCESSING = {
+    'enabled': config('OCR_PREPROCESS', default=False, cast=bool),
+}
+
 # ============================================
 # SECURITY SETTINGS (Production)
 # ============================================
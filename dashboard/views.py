@@ -13,13 +13,25 @@ from django.core.paginator import Paginator
 import json
 
 from performance.models import DailyPoints, MonthlyIncentive
+from performance import ledger
+from performance.rollups import get_snapshot
+from performance.aggregation import month_performance
+from performance.forecasting import (
+    STATUS_NAMES, forecast_team, incentive_payouts, month_progress, projection_statuses, scenario_grid,
+)
 from task_management.models import TaskType, Task, TaskPackage
+from task_management.utils.workload import branch_workload, invalidate_branch_workload
 from accounts.models import User
 from django.contrib.auth.hashers import make_password
 from django.core.mail import send_mail
 from django.conf import settings
 import secrets
 import string
+from django.core.cache import cache
+
+
+TASK_SUGGESTIONS_CACHE_KEY = 'dashboard:top_task_types'
+TASK_SUGGESTIONS_CACHE_TTL = 600  # seconds
 
 
 @login_required
@@ -39,28 +51,14 @@ def staff_dashboard(request):
     user = request.user
     today = date.today()
     
-    # Get or create today's points
-    today_points, created = DailyPoints.objects.get_or_create(
-        user=user,
-        date=today,
-        defaults={'points': Decimal('0.00')}
-    )
-    
-    # Calculate week stats
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    
-    week_points = DailyPoints.objects.filter(
-        user=user,
-        date__range=[week_start, week_end]
-    ).aggregate(
-        total=Sum('points'),
-        days_worked=Count('id')
-    )
+    # Points summary - one read of the snapshot kept by the points ledger
+    snapshot = get_snapshot(user, today)
+    today_points = DailyPoints(user=user, date=today, points=snapshot.today_points)
     
-    week_total = week_points['total'] or Decimal('0.00')
-    week_days_worked = week_points['days_worked'] or 0
-    week_average = (week_total / week_days_worked) if week_days_worked > 0 else Decimal('0.00')
+    # Week stats
+    week_total = snapshot.week_points
+    week_days_worked = snapshot.week_days_worked
+    week_average = snapshot.week_average
     week_target = Decimal('50.00') * 5
     
     # TODAY'S ASSIGNED TASKS
@@ -97,50 +95,43 @@ def staff_dashboard(request):
         status='submitted'
     ).select_related('task_type', 'package__cat').order_by('-id')[:5]
     
-    # Task-based points today
-    task_points_today = completed_tasks_today.aggregate(
-        total=Sum('points')
-    )['total'] or 0
+    # Count tasks + task-based points today in one conditional aggregate
+    completed_today = Q(completed_at__date=today, status='completed')
+    task_stats = Task.objects.filter(assigned_staff=user).aggregate(
+        today=Count('id', filter=Q(status__in=['assigned', 'in_progress'])),
+        completed=Count('id', filter=completed_today),
+        pending_approval=Count('id', filter=Q(status='submitted')),
+        upcoming=Count('id', filter=Q(status__in=['assigned', 'pending'])),
+        completed_points=Sum('points', filter=completed_today),
+    )
+    
+    task_points_today = task_stats['completed_points'] or 0
     
-    # Count tasks
+    # Counts match the lists shown on the page
     tasks_count = {
-        'today': today_tasks.count(),
-        'completed': completed_tasks_today.count(),
-        'pending_approval': pending_approval.count(),
-        'upcoming': upcoming_tasks.count(),
+        'today': min(task_stats['today'], 10),
+        'completed': min(task_stats['completed'], 20),
+        'pending_approval': min(task_stats['pending_approval'], 5),
+        'upcoming': min(task_stats['upcoming'], 5),
     }
     
-    # Calculate month stats
+    # Month stats
     month_start = today.replace(day=1)
     days_in_month = monthrange(today.year, today.month)[1]
     
-    month_points = DailyPoints.objects.filter(
-        user=user,
-        date__year=today.year,
-        date__month=today.month
-    ).aggregate(
-        total=Sum('points'),
-        average=Avg('points'),
-        days_worked=Count('id')
-    )
-    
-    month_total = month_points['total'] or Decimal('0.00')
-    month_average = month_points['average'] or Decimal('0.00')
-    month_days_worked = month_points['days_worked'] or 0
+    month_total = snapshot.month_points
+    month_days_worked = snapshot.month_days_worked
+    month_average = snapshot.daily_average
     
     # Projections
     days_elapsed = today.day
     days_remaining = days_in_month - today.day
     
-    if month_days_worked > 0:
-        daily_average = month_total / month_days_worked
-        projected_total = daily_average * days_in_month
-    else:
-        daily_average = Decimal('0.00')
-        projected_total = Decimal('0.00')
+    daily_average = snapshot.daily_average
+    projected_total = snapshot.projected_total
     
     # Calculate points needed
-    monthly_target = Decimal('1200.00')
+    monthly_target = MonthlyIncentive.MONTHLY_TARGET
     points_needed = max(monthly_target - month_total, 0)
     
     if days_remaining > 0:
@@ -150,7 +141,7 @@ def staff_dashboard(request):
     
     # Status checks
     on_track = projected_total >= monthly_target
-    in_danger_zone = projected_total < Decimal('850.00')
+    in_danger_zone = projected_total < MonthlyIncentive.WARNING_THRESHOLD
     will_get_bonus = projected_total > monthly_target
     
     # Bonus calculation
@@ -159,16 +150,9 @@ def staff_dashboard(request):
     else:
         bonus_amount = Decimal('0.00')
     
-    # Get monthly incentive
-    monthly_incentive, created = MonthlyIncentive.objects.get_or_create(
-        user=user,
-        month=month_start,
-        defaults={'total_points': month_total}
-    )
-    
-    if not created:
-        monthly_incentive.total_points = month_total
-        monthly_incentive.calculate_incentive()
+    # Incentive tiers are a pure function of the month total - no extra read
+    monthly_incentive = MonthlyIncentive(user=user, month=month_start, total_points=month_total)
+    monthly_incentive.apply_incentive_tiers()
     
     # Task suggestions
     task_suggestions = get_task_suggestions(user, daily_points_required)
@@ -216,16 +200,24 @@ def get_task_suggestions(user, daily_points_required):
     if daily_points_required <= 0:
         return []
     
-    task_types = TaskType.objects.filter(is_active=True).order_by('-points')  
+    # Top task types change rarely - cache them instead of scanning per request
+    top_task_types = cache.get(TASK_SUGGESTIONS_CACHE_KEY)
+    if top_task_types is None:
+        top_task_types = list(
+            TaskType.objects.filter(is_active=True).order_by('-points').values_list('name', 'points')[:5]
+        )
+        cache.set(TASK_SUGGESTIONS_CACHE_KEY, top_task_types, TASK_SUGGESTIONS_CACHE_TTL)
     
     suggestions = []
-    for task in task_types[:5]:  
-        count_needed = int(daily_points_required / task.points) + 1  
-        total_points = count_needed * task.points  
+    for name, points in top_task_types:
+        if not points:
+            continue
+        count_needed = int(daily_points_required / points) + 1  
+        total_points = count_needed * points  
         
         suggestions.append({
-            'task_name': task.name,
-            'points_per_task': task.points,  
+            'task_name': name,
+            'points_per_task': points,  
             'count_needed': count_needed,
             'total_points': total_points,
         })
@@ -245,54 +237,26 @@ def manager_dashboard(request):
     manager_branch = user.branch  # CRITICAL: Get manager's branch
     
     # ============ MANAGER'S PERSONAL PROGRESS ============
-    today_points, created = DailyPoints.objects.get_or_create(
-        user=user,
-        date=today,
-        defaults={'points': Decimal('0.00')}
-    )
+    snapshot = get_snapshot(user, today)
+    today_points = DailyPoints(user=user, date=today, points=snapshot.today_points)
     
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    
-    week_points = DailyPoints.objects.filter(
-        user=user,
-        date__range=[week_start, week_end]
-    ).aggregate(
-        total=Sum('points'),
-        days_worked=Count('id')
-    )
-    
-    week_total = week_points['total'] or Decimal('0.00')
-    week_days_worked = week_points['days_worked'] or 0
-    week_average = (week_total / week_days_worked) if week_days_worked > 0 else Decimal('0.00')
+    week_total = snapshot.week_points
+    week_days_worked = snapshot.week_days_worked
+    week_average = snapshot.week_average
     week_target = Decimal('50.00') * 5
     
     month_start = today.replace(day=1)
     days_in_month = monthrange(today.year, today.month)[1]
     
-    month_points = DailyPoints.objects.filter(
-        user=user,
-        date__year=today.year,
-        date__month=today.month
-    ).aggregate(
-        total=Sum('points'),
-        average=Avg('points'),
-        days_worked=Count('id')
-    )
-    
-    month_total = month_points['total'] or Decimal('0.00')
-    month_average = month_points['average'] or Decimal('0.00')
-    month_days_worked = month_points['days_worked'] or 0
+    month_total = snapshot.month_points
+    month_average = snapshot.daily_average
+    month_days_worked = snapshot.month_days_worked
     
     days_elapsed = today.day
     days_remaining = days_in_month - today.day
     
-    if month_days_worked > 0:
-        daily_average = month_total / month_days_worked
-        projected_total = daily_average * days_in_month
-    else:
-        daily_average = Decimal('0.00')
-        projected_total = Decimal('0.00')
+    daily_average = snapshot.daily_average
+    projected_total = snapshot.projected_total
     
     monthly_target = Decimal('1200.00')
     points_needed = max(monthly_target - month_total, 0)
@@ -347,56 +311,25 @@ def manager_dashboard(request):
     ).select_related('task_type', 'assigned_staff', 'package__cat').order_by('-id')[:20]
     
     # STAFF AVAILABILITY - Only staff from manager's branch
-    staff_members_base = User.objects.filter(
-        is_active=True,
-        role='staff',
-        branch=manager_branch  # FILTER BY BRANCH
-    ).order_by('username')
+    staff_list = [
+        staff for staff in branch_workload(manager_branch)
+        if staff.role == 'staff'
+    ][:20]
     
-    staff_list = []
     available_count = 0
     busy_count = 0
     
-    for staff in staff_members_base[:20]:
-        pending = Task.objects.filter(
-            assigned_staff=staff,
-            status__in=['pending', 'assigned']
-        ).count()
-        
-        completed = Task.objects.filter(
-            assigned_staff=staff,
-            status='completed'
-        ).count()
-        
-        total = pending + completed
-        
-        completed_tasks = Task.objects.filter(
-            assigned_staff=staff,
-            status='completed'
-        ).select_related('task_type')
-        
-        points = 0
-        for t in completed_tasks:
-            if hasattr(t, 'task_type') and hasattr(t.task_type, 'points'):
-                points += t.task_type.points
-        
-        staff.pending_tasks = pending
-        staff.completed_tasks = completed
-        staff.total_tasks_count = total
-        staff.points_value = points
-        
+    for staff in staff_list:
         if staff.get_full_name():
             names = staff.get_full_name().split()
             staff.initials = ''.join([n[0].upper() for n in names[:2]])
         else:
             staff.initials = staff.username[0].upper()
         
-        if pending <= 5:
+        if staff.pending_tasks <= 5:
             available_count += 1
         else:
             busy_count += 1
-        
-        staff_list.append(staff)
     
     # STATISTICS - Branch specific
     stats = {
@@ -496,6 +429,7 @@ def assign_task_package(request, package_id):
             if assigned_count > 0:
                 package.status = 'assigned'
                 package.save()
+                invalidate_branch_workload(manager_branch)
                 
                 messages.success(
                     request,
@@ -516,17 +450,11 @@ def assign_task_package(request, package_id):
     tasks = package.tasks.all().select_related('task_type')
     
     # CRITICAL: Only show staff from manager's branch
-    staff_list = User.objects.filter(
-        is_active=True,
-        role__in=['staff', 'manager'],
-        branch=manager_branch  # FILTER BY BRANCH
-    ).annotate(
-        active_tasks=Count(
-            'tm_assigned_tasks',
-            filter=Q(tm_assigned_tasks__status__in=['pending', 'assigned', 'in_progress'])
-        ),
-        is_current_manager=Count('id', filter=Q(id=request.user.id))
-    ).order_by('-is_current_manager', 'active_tasks', 'username')
+    # Current manager first, then least busy
+    staff_list = sorted(
+        branch_workload(manager_branch),
+        key=lambda staff: (staff.id != request.user.id, staff.active_tasks, staff.username)
+    )
 
     context = {
         'package': package,
@@ -584,8 +512,6 @@ def approve_task(request, task_id):
 
 def award_points_to_staff(task):
     """Award points when task is approved"""
-    from decimal import Decimal
-    
     today = timezone.now().date()
     user = task.assigned_staff
     
@@ -594,61 +520,23 @@ def award_points_to_staff(task):
     else:
         points = Decimal('0.00')
     
-    daily_points, created = DailyPoints.objects.get_or_create(
-        user=user,
-        date=today,
-        defaults={
-            'points': Decimal('0.00'),
-            'grooming_points': Decimal('0.00'),
-            'service_points': Decimal('0.00'),
-            'booking_points': Decimal('0.00'),
-            'bonus_points': Decimal('0.00'),
-        }
-    )
-    
-    if hasattr(task.task_type, 'category'):
-        category = task.task_type.category
-        if category == 'grooming' and hasattr(daily_points, 'grooming_points'):
-            daily_points.grooming_points += points
-            if hasattr(daily_points, 'grooming_count'):
-                daily_points.grooming_count += 1
-        elif category == 'sales' and hasattr(daily_points, 'booking_points'):
-            daily_points.booking_points += points
-            if hasattr(daily_points, 'booking_count'):
-                daily_points.booking_count += 1
-        else:
-            if hasattr(daily_points, 'service_points'):
-                daily_points.service_points += points
-            if hasattr(daily_points, 'cat_service_count'):
-                daily_points.cat_service_count += 1
-    
-    total = Decimal('0.00')
-    if hasattr(daily_points, 'grooming_points'):
-        total += daily_points.grooming_points
-    if hasattr(daily_points, 'service_points'):
-        total += daily_points.service_points
-    if hasattr(daily_points, 'booking_points'):
-        total += daily_points.booking_points
-    if hasattr(daily_points, 'bonus_points'):
-        total += daily_points.bonus_points
-    
-    daily_points.points = total
-    daily_points.save()
-    
-    from performance.models import MonthlyIncentive
-    first_day = today.replace(day=1)
-    monthly_incentive, created = MonthlyIncentive.objects.get_or_create(
-        user=user,
-        month=first_day,
-        defaults={'total_points': Decimal('0.00')}
+    category = getattr(task.task_type, 'category', '')
+    if category == 'grooming':
+        ledger_category = 'grooming'
+    elif category == 'sales':
+        ledger_category = 'booking'
+    else:
+        ledger_category = 'service'
+    
+    ledger.award_points(
+        user,
+        points,
+        ledger_category,
+        'task_approval',
+        on_date=today,
+        reference=task.task_id,
+        count=1,
     )
-    
-    monthly_incentive.total_points += points
-    
-    if hasattr(monthly_incentive, 'calculate_incentive'):
-        monthly_incentive.calculate_incentive()
-    
-    monthly_incentive.save()
 
 
 @login_required
@@ -658,142 +546,16 @@ def admin_dashboard(request):
         return redirect('dashboard:staff_dashboard')
     
     today = date.today()
-    month_start = today.replace(day=1)
-    days_in_month = monthrange(today.year, today.month)[1]
-    
-    staff_members = User.objects.filter(role='staff', is_active=True)
     
-    branches = [
-        'hq', 'damansara_perdana', 'wangsa_maju', 'shah_alam', 'bangi', 'cheng_melaka',
-        'johor_bahru', 'seremban', 'seri_kembangan', 'usj21', 'ipoh'
-    ]
-    branch_stats = []
-    
-    total_on_track = 0
-    total_needs_improvement = 0
-    total_warning = 0
-    
-    for branch_code in branches:
-        branch_staff = staff_members.filter(branch=branch_code)
-        
-        if branch_staff.exists():
-            branch_points = DailyPoints.objects.filter(
-                user__in=branch_staff,
-                date__year=today.year,
-                date__month=today.month
-            ).aggregate(
-                total=Sum('points'),
-                average=Avg('points')
-            )
-            
-            staff_count = branch_staff.count()
-            total_points = branch_points['total'] or Decimal('0.00')
-            avg_points = total_points / staff_count if staff_count > 0 else Decimal('0.00')
-            
-            on_track_count = 0
-            needs_improvement_count = 0
-            warning_count = 0
-            
-            for staff in branch_staff:
-                staff_total = DailyPoints.objects.filter(
-                    user=staff,
-                    date__year=today.year,
-                    date__month=today.month
-                ).aggregate(total=Sum('points'))['total'] or Decimal('0.00')
-                
-                days_worked = DailyPoints.objects.filter(
-                    user=staff,
-                    date__year=today.year,
-                    date__month=today.month
-                ).count()
-                
-                if days_worked > 0:
-                    daily_avg = staff_total / days_worked
-                    projected = daily_avg * days_in_month
-                    
-                    if projected >= 1200:
-                        on_track_count += 1
-                    elif projected >= 850:
-                        needs_improvement_count += 1
-                    else:
-                        warning_count += 1
-            
-            total_on_track += on_track_count
-            total_needs_improvement += needs_improvement_count
-            total_warning += warning_count
-            
-            branch_stats.append({
-                'name': dict(User.BRANCH_CHOICES)[branch_code],
-                'code': branch_code,
-                'staff_count': staff_count,
-                'total_points': total_points,
-                'average_points': avg_points,
-                'on_track_count': on_track_count,
-                'needs_improvement_count': needs_improvement_count,
-                'warning_count': warning_count,
-            })
-    
-    staff_performance = []
-    
-    for staff in staff_members:
-        month_data = DailyPoints.objects.filter(
-            user=staff,
-            date__year=today.year,
-            date__month=today.month
-        ).aggregate(
-            total=Sum('points'),
-            days_worked=Count('id')
-        )
-        
-        total_points = month_data['total'] or Decimal('0.00')
-        days_worked = month_data['days_worked'] or 0
-        
-        if days_worked > 0:
-            daily_avg = total_points / days_worked
-            projected_total = daily_avg * days_in_month
-        else:
-            daily_avg = Decimal('0.00')
-            projected_total = Decimal('0.00')
-        
-        if projected_total >= 1200:
-            status = 'on_track'
-            status_label = 'On Track'
-            status_class = 'success'
-        elif projected_total >= 850:
-            status = 'needs_improvement'
-            status_label = 'Needs Improvement'
-            status_class = 'warning'
-        else:
-            status = 'warning'
-            status_label = 'Warning Zone'
-            status_class = 'danger'
-        
-        staff_performance.append({
-            'user': staff,
-            'current_points': total_points,
-            'projected_total': projected_total,
-            'daily_average': daily_avg,
-            'days_worked': days_worked,
-            'status': status,
-            'status_label': status_label,
-            'status_class': status_class,
-        })
-    
-    staff_performance.sort(key=lambda x: x['projected_total'], reverse=True)
-    
-    stats = {
-        'on_track_count': total_on_track,
-        'needs_improvement_count': total_needs_improvement,
-        'warning_count': total_warning,
-        'total_staff': staff_members.count(),
-    }
+    # Every active staff member's month in one GROUP BY, branches rolled up from it
+    performance = month_performance(today)
     
     context = {
         'today': today,
-        'branch_stats': branch_stats,
-        'staff_performance': staff_performance,
-        'total_staff': staff_members.count(),
-        'stats': stats,
+        'branch_stats': performance['branch_stats'],
+        'staff_performance': performance['staff_performance'],
+        'total_staff': performance['stats']['total_staff'],
+        'stats': performance['stats'],
     }
     
     return render(request, 'dashboard/admin_dashboard.html', context)
@@ -803,11 +565,10 @@ def admin_dashboard(request):
 def projection_calculator(request):
     """Point projection calculator"""
     today = date.today()
-    days_in_month = monthrange(today.year, today.month)[1]
-    days_remaining = days_in_month - today.day + 1
+    _, days_remaining = month_progress(today.replace(day=1), today)
     
     daily_target = 50
-    monthly_target = 1200
+    monthly_target = MonthlyIncentive.MONTHLY_TARGET
     current_points = 0
     projection = None
     
@@ -820,11 +581,17 @@ def projection_calculator(request):
         else:
             daily_needed = 0
         
+        will_reach = scenario_grid([current_points], days_remaining, [daily_target])[0]
+        incentive, bonus = incentive_payouts(will_reach)
+        
         projection = {
             'current_points': current_points,
             'points_needed': points_needed,
             'daily_needed': round(daily_needed, 1),
-            'will_reach': current_points + (daily_target * days_remaining),
+            'will_reach': float(will_reach[0]),
+            'status': str(STATUS_NAMES[projection_statuses(will_reach)[0]]),
+            'incentive': float(incentive[0]),
+            'bonus': float(bonus[0]),
             'days_remaining': days_remaining,
         }
     
@@ -836,6 +603,10 @@ def projection_calculator(request):
         'projection': projection,
     }
     
+    # Admins also get the month-end forecast for the whole team
+    if request.user.role == 'admin':
+        context['team_forecast'] = forecast_team(today=today)
+    
     return render(request, 'dashboard/projection_calculator.html', context)
 
 
@@ -1317,7 +1088,7 @@ def ajax_reassign_tasks(request, user_id):
         )
         
         count = tasks_to_reassign.count()
-        tasks_to_reassign.update(assigned_staff=to_user)
+        tasks_to_reassign.update(assigned_staff=to_user, updated_at=timezone.now())
         
         from task_management.models import log_admin_action
         log_admin_action(
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import DailyPoints, MonthlyIncentive, PointsProjection, WarningLetter
+from django.utils import timezone
+from .models import DailyPoints, MonthlyIncentive, PointsProjection, WarningLetter, PointsEntry
 
 @admin.register(DailyPoints)
 class DailyPointsAdmin(admin.ModelAdmin):
@@ -19,7 +20,7 @@ class MonthlyIncentiveAdmin(admin.ModelAdmin):
     
     def mark_as_paid(self, request, queryset):
         from datetime import date
-        queryset.update(paid=True, paid_date=date.today())
+        queryset.update(paid=True, paid_date=date.today(), updated_at=timezone.now())
         self.message_user(request, f"{queryset.count()} incentives marked as paid.")
     mark_as_paid.short_description = "Mark selected as paid"
     
@@ -39,4 +40,14 @@ class PointsProjectionAdmin(admin.ModelAdmin):
 class WarningLetterAdmin(admin.ModelAdmin):
     list_display = ['user', 'month', 'reason', 'points_achieved', 'issued_date', 'acknowledged']
     list_filter = ['reason', 'issued_date', 'acknowledged']
-    search_fields = ['user__username', 'description']
\ No newline at end of file
+    search_fields = ['user__username', 'description']
+
+@admin.register(PointsEntry)
+class PointsEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'category', 'points', 'count', 'source', 'reference', 'created_at']
+    list_filter = ['category', 'source', 'date']
+    search_fields = ['user__username', 'reference']
+    date_hierarchy = 'date'
+    
+    def has_change_permission(self, request, obj=None):
+        return False  # Ledger is append-only
@@ -0,0 +1,156 @@
+# performance/aggregation.py
+"""
+Month performance for every active staff member, from one GROUP BY over
+DailyPoints. Branch rollups are derived from the per-staff rows in Python,
+and the combined result is cached so admins loading the dashboard across
+regions share one computation.
+"""
+
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from accounts.models import User
+
+from .models import MonthlyIncentive
+from .rollups import month_bounds
+
+
+PERFORMANCE_CACHE_TTL = 300  # seconds
+
+STATUS_LABELS = {
+    'on_track': ('On Track', 'success'),
+    'needs_improvement': ('Needs Improvement', 'warning'),
+    'warning': ('Warning Zone', 'danger'),
+}
+
+
+def projection_status(projected_total):
+    """Classify a projected month total against the incentive thresholds"""
+    if projected_total >= MonthlyIncentive.MONTHLY_TARGET:
+        return 'on_track'
+    if projected_total >= MonthlyIncentive.WARNING_THRESHOLD:
+        return 'needs_improvement'
+    return 'warning'
+
+
+def staff_performance(month=None):
+    """
+    One row per active staff member for the month:
+    user, current_points, days_worked, daily_average, projected_total,
+    status, status_label, status_class. Sorted by projection, best first.
+    """
+    month = month or date.today()
+    start, end = month_bounds(month)
+    days_in_month = monthrange(start.year, start.month)[1]
+    in_month = Q(daily_points__date__gte=start, daily_points__date__lt=end)
+
+    staff_members = User.objects.filter(
+        role='staff',
+        is_active=True
+    ).annotate(
+        month_total=Sum('daily_points__points', filter=in_month),
+        month_days_worked=Count('daily_points', filter=in_month),
+    )
+
+    rows = []
+    for staff in staff_members:
+        total_points = staff.month_total or Decimal('0.00')
+        days_worked = staff.month_days_worked or 0
+
+        if days_worked > 0:
+            daily_avg = total_points / days_worked
+            projected_total = daily_avg * days_in_month
+        else:
+            daily_avg = Decimal('0.00')
+            projected_total = Decimal('0.00')
+
+        status = projection_status(projected_total)
+        status_label, status_class = STATUS_LABELS[status]
+
+        rows.append({
+            'user': staff,
+            'current_points': total_points,
+            'projected_total': projected_total,
+            'daily_average': daily_avg,
+            'days_worked': days_worked,
+            'status': status,
+            'status_label': status_label,
+            'status_class': status_class,
+        })
+
+    rows.sort(key=lambda x: x['projected_total'], reverse=True)
+    return rows
+
+
+def branch_rollups(rows):
+    """
+    Per-branch totals from staff_performance() rows, in BRANCH_CHOICES order.
+    Only branches with staff are returned; staff with no points yet this
+    month are counted in staff_count but not in any status bucket.
+    """
+    branches = OrderedDict(
+        (code, {
+            'name': name,
+            'code': code,
+            'staff_count': 0,
+            'total_points': Decimal('0.00'),
+            'average_points': Decimal('0.00'),
+            'on_track_count': 0,
+            'needs_improvement_count': 0,
+            'warning_count': 0,
+        })
+        for code, name in User.BRANCH_CHOICES
+    )
+
+    for row in rows:
+        branch = branches.get(row['user'].branch)
+        if branch is None:
+            continue
+
+        branch['staff_count'] += 1
+        branch['total_points'] += row['current_points']
+        if row['days_worked'] > 0:
+            branch[f"{row['status']}_count"] += 1
+
+    result = []
+    for branch in branches.values():
+        if branch['staff_count']:
+            branch['average_points'] = branch['total_points'] / branch['staff_count']
+            result.append(branch)
+    return result
+
+
+def month_performance(month=None, use_cache=True):
+    """
+    Staff rows, branch rollups and overall status counts for the month.
+    Cached per month for PERFORMANCE_CACHE_TTL seconds.
+    """
+    month = (month or date.today()).replace(day=1)
+    key = f"performance:month:{month.strftime('%Y-%m')}"
+
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    rows = staff_performance(month)
+    branches = branch_rollups(rows)
+
+    result = {
+        'staff_performance': rows,
+        'branch_stats': branches,
+        'stats': {
+            'on_track_count': sum(b['on_track_count'] for b in branches),
+            'needs_improvement_count': sum(b['needs_improvement_count'] for b in branches),
+            'warning_count': sum(b['warning_count'] for b in branches),
+            'total_staff': len(rows),
+        },
+    }
+
+    cache.set(key, result, PERFORMANCE_CACHE_TTL)
+    return result
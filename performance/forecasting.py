@@ -0,0 +1,257 @@
+# performance/forecasting.py
+"""
+Team-wide month-end forecasting.
+
+Loads the month's DailyPoints for every active staff member into one
+(staff x day) NumPy matrix and computes weekday-weighted projections,
+flat-average scenario grids and incentive/bonus liability for everyone in
+a single vectorized pass. Tier rules come from MonthlyIncentive so the
+forecast pays out exactly what calculate_incentive() would.
+"""
+
+from calendar import monthrange
+from datetime import date
+
+import numpy as np
+
+from accounts.models import User
+
+from .models import DailyPoints, MonthlyIncentive
+from .rollups import month_bounds
+
+
+SCENARIO_AVERAGES = [30, 35, 40, 45, 50, 55, 60]
+
+STATUS_NAMES = np.array(['on_track', 'needs_improvement', 'warning'])
+
+
+def incentive_payouts(totals):
+    """
+    Vectorized MonthlyIncentive.apply_incentive_tiers().
+    Returns (incentive, bonus) arrays shaped like `totals`.
+    """
+    totals = np.asarray(totals, dtype=float)
+    incentive = np.zeros_like(totals)
+
+    # Tiers are highest first - apply lowest first so higher tiers win
+    for minimum, amount, _ in reversed(MonthlyIncentive.INCENTIVE_TIERS):
+        incentive = np.where(totals >= float(minimum), float(amount), incentive)
+
+    target = float(MonthlyIncentive.MONTHLY_TARGET)
+    bonus = np.where(totals > target, (totals - target) * float(MonthlyIncentive.BONUS_RATE), 0.0)
+
+    return incentive, bonus
+
+
+def projection_statuses(totals):
+    """Index into STATUS_NAMES for each projected total"""
+    totals = np.asarray(totals, dtype=float)
+    return np.select(
+        [
+            totals >= float(MonthlyIncentive.MONTHLY_TARGET),
+            totals >= float(MonthlyIncentive.WARNING_THRESHOLD),
+        ],
+        [0, 1],
+        default=2,
+    )
+
+
+def load_points_matrix(month):
+    """
+    Active staff and a float matrix of their points, shape
+    (len(staff), days_in_month); column d is day d + 1.
+    """
+    start, end = month_bounds(month)
+    days_in_month = monthrange(start.year, start.month)[1]
+
+    staff = list(
+        User.objects.filter(role='staff', is_active=True)
+        .only('id', 'username', 'first_name', 'last_name', 'branch')
+        .order_by('id')
+    )
+    index = {member.id: i for i, member in enumerate(staff)}
+
+    rows = list(
+        DailyPoints.objects.filter(
+            user__role='staff',
+            user__is_active=True,
+            date__gte=start,
+            date__lt=end,
+        ).values_list('user_id', 'date__day', 'points')
+    )
+
+    matrix = np.zeros((len(staff), days_in_month))
+    if rows:
+        user_ids, days, points = zip(*rows)
+        matrix[
+            np.fromiter((index[u] for u in user_ids), dtype=np.intp, count=len(rows)),
+            np.asarray(days, dtype=np.intp) - 1,
+        ] = np.asarray(points, dtype=float)
+
+    return staff, matrix
+
+
+def month_progress(month_start, today):
+    """
+    (elapsed_days, days_remaining) for a month as of `today`. Today is
+    still in progress, so it counts as remaining, not elapsed.
+    """
+    days_in_month = monthrange(month_start.year, month_start.month)[1]
+
+    if (month_start.year, month_start.month) == (today.year, today.month):
+        elapsed_days = today.day - 1
+    elif month_start > today:
+        elapsed_days = 0
+    else:
+        elapsed_days = days_in_month
+
+    return elapsed_days, days_in_month - elapsed_days
+
+
+def weekday_projection(matrix, month_start, elapsed_days):
+    """
+    Project month-end totals from each person's points per calendar weekday.
+
+    For every staff member and weekday, the expected points for a remaining
+    day are the points earned on that weekday over the elapsed (complete)
+    days divided by how many of that weekday have elapsed - so both pace
+    and attendance pattern carry forward. Weekdays not seen yet fall back
+    to the overall per-day rate. Points already recorded on a remaining
+    day (today so far) are a floor for that day.
+    """
+    days_in_month = matrix.shape[1]
+    elapsed_days = min(max(elapsed_days, 0), days_in_month)
+
+    weekdays = (np.arange(days_in_month) + month_start.weekday()) % 7
+    onehot = np.eye(7)[weekdays]  # (days, 7)
+
+    to_date = matrix[:, :elapsed_days].sum(axis=1)
+    if elapsed_days == days_in_month:
+        return to_date
+
+    occurrences = onehot[:elapsed_days].sum(axis=0)  # (7,)
+    weekday_sums = matrix[:, :elapsed_days] @ onehot[:elapsed_days]  # (staff, 7)
+
+    overall_rate = to_date / elapsed_days if elapsed_days else np.zeros_like(to_date)
+    per_day = np.where(
+        occurrences > 0,
+        weekday_sums / np.maximum(occurrences, 1),
+        overall_rate[:, None],
+    )
+
+    expected = per_day[:, weekdays[elapsed_days:]]  # (staff, remaining days)
+    return to_date + np.maximum(expected, matrix[:, elapsed_days:]).sum(axis=1)
+
+
+def scenario_grid(current_totals, days_remaining, averages=SCENARIO_AVERAGES):
+    """Projected totals for every staff member x flat daily average"""
+    averages = np.asarray(averages, dtype=float)
+    return np.asarray(current_totals, dtype=float)[:, None] + averages[None, :] * days_remaining
+
+
+def forecast_team(month=None, today=None, scenario_averages=SCENARIO_AVERAGES):
+    """
+    Forecast month-end outcomes for every active staff member.
+
+    Returns a dict with:
+        staff     - per-person rows sorted by projected total
+        branches  - per-branch status counts and incentive/bonus liability
+        scenarios - per flat-average scenario: status counts and liability
+        totals    - team-wide counts and liability
+    """
+    today = today or date.today()
+    month_start = (month or today).replace(day=1)
+    elapsed_days, days_remaining = month_progress(month_start, today)
+
+    staff, matrix = load_points_matrix(month_start)
+
+    current = matrix.sum(axis=1)
+    projected = weekday_projection(matrix, month_start, elapsed_days)
+    statuses = projection_statuses(projected)
+    incentive, bonus = incentive_payouts(projected)
+
+    # Scenario grid (staff x scenario): the complete days plus a flat
+    # average for every remaining day, today included
+    grid = scenario_grid(matrix[:, :elapsed_days].sum(axis=1), days_remaining, scenario_averages)
+    grid_statuses = projection_statuses(grid)
+    grid_incentive, grid_bonus = incentive_payouts(grid)
+
+    # Branch rollups via bincount over branch indices
+    branch_names = dict(User.BRANCH_CHOICES)
+    known_order = [code for code, _ in User.BRANCH_CHOICES]
+    codes = [member.branch for member in staff]
+    branch_codes = sorted(
+        set(codes),
+        key=lambda code: (known_order.index(code) if code in known_order else len(known_order), code)
+    )
+    position = {code: b for b, code in enumerate(branch_codes)}
+    branch_index = np.array([position[code] for code in codes], dtype=np.intp)
+    n_branches = len(branch_codes)
+
+    def per_branch(weights=None):
+        return np.bincount(branch_index, weights=weights, minlength=n_branches)
+
+    branch_staff = per_branch()
+    branch_status = [per_branch((statuses == s).astype(float)) for s in range(3)]
+    branch_incentive = per_branch(incentive)
+    branch_bonus = per_branch(bonus)
+    branch_projected = per_branch(projected)
+
+    branches = []
+    for b, code in enumerate(branch_codes):
+        branches.append({
+            'code': code,
+            'name': branch_names.get(code, code),
+            'staff_count': int(branch_staff[b]),
+            'projected_points': round(float(branch_projected[b]), 2),
+            'on_track_count': int(branch_status[0][b]),
+            'needs_improvement_count': int(branch_status[1][b]),
+            'warning_count': int(branch_status[2][b]),
+            'incentive_liability': round(float(branch_incentive[b]), 2),
+            'bonus_liability': round(float(branch_bonus[b]), 2),
+            'total_liability': round(float(branch_incentive[b] + branch_bonus[b]), 2),
+        })
+
+    order = np.argsort(-projected, kind='stable')
+    staff_rows = [
+        {
+            'user': staff[i],
+            'branch': staff[i].branch,
+            'current_points': round(float(current[i]), 2),
+            'projected_total': round(float(projected[i]), 2),
+            'status': str(STATUS_NAMES[statuses[i]]),
+            'incentive': round(float(incentive[i]), 2),
+            'bonus': round(float(bonus[i]), 2),
+        }
+        for i in order
+    ]
+
+    scenarios = []
+    for k, average in enumerate(scenario_averages):
+        column = grid_statuses[:, k]
+        scenarios.append({
+            'average': average,
+            'on_track_count': int((column == 0).sum()),
+            'needs_improvement_count': int((column == 1).sum()),
+            'warning_count': int((column == 2).sum()),
+            'incentive_liability': round(float(grid_incentive[:, k].sum()), 2),
+            'bonus_liability': round(float(grid_bonus[:, k].sum()), 2),
+            'total_liability': round(float(grid_incentive[:, k].sum() + grid_bonus[:, k].sum()), 2),
+        })
+
+    return {
+        'month': month_start,
+        'days_remaining': days_remaining,
+        'staff': staff_rows,
+        'branches': branches,
+        'scenarios': scenarios,
+        'totals': {
+            'staff_count': len(staff),
+            'on_track_count': int((statuses == 0).sum()),
+            'needs_improvement_count': int((statuses == 1).sum()),
+            'warning_count': int((statuses == 2).sum()),
+            'incentive_liability': round(float(incentive.sum()), 2),
+            'bonus_liability': round(float(bonus.sum()), 2),
+            'total_liability': round(float(incentive.sum() + bonus.sum()), 2),
+        },
+    }
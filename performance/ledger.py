@@ -0,0 +1,88 @@
+# performance/ledger.py
+"""
+Points ledger - the single write path for staff points.
+
+Every award appends a PointsEntry and hands it to the rollup engine
+(performance.rollups) inside one transaction, so concurrent awards for the
+same staff member never overwrite each other.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import DailyPoints, PointsEntry
+from .rollups import CATEGORY_FIELDS, apply_entry
+
+
+def award_points(user, points, category, source, on_date=None, reference='', count=0, notes=''):
+    """
+    Append one ledger entry and apply it to the daily and monthly rollups.
+
+    Returns the PointsEntry, or None when there is nothing to record
+    (no user, or zero points and zero count).
+    """
+    if user is None:
+        return None
+
+    points = Decimal(str(points or 0))
+    if not points and not count:
+        return None
+
+    if category not in CATEGORY_FIELDS:
+        raise ValueError(f"Unknown points category: {category}")
+
+    on_date = on_date or date.today()
+
+    with transaction.atomic():
+        entry = PointsEntry.objects.create(
+            user=user,
+            date=on_date,
+            category=category,
+            points=points,
+            count=count,
+            source=source,
+            reference=str(reference or '')[:50],
+            notes=notes[:255],
+        )
+        apply_entry(entry)
+
+    return entry
+
+
+def set_daily_breakdown(user, on_date, breakdown, source='manual_record', reference=''):
+    """
+    Bring a day's per-category points/counts to the given absolute values.
+
+    `breakdown` maps category -> (points, count). The difference against the
+    current DailyPoints row is posted as ledger entries, so the monthly
+    rollup moves by exactly the same amount.
+    """
+    with transaction.atomic():
+        current = (
+            DailyPoints.objects
+            .select_for_update()
+            .filter(user=user, date=on_date)
+            .first()
+        )
+
+        entries = []
+        for category, (points, count) in breakdown.items():
+            points_field, count_field = CATEGORY_FIELDS[category]
+            old_points = getattr(current, points_field) if current else Decimal('0.00')
+            old_count = getattr(current, count_field) if current and count_field else 0
+
+            entry = award_points(
+                user,
+                Decimal(str(points)) - old_points,
+                category,
+                source,
+                on_date=on_date,
+                reference=reference,
+                count=(count - old_count) if count_field else 0,
+            )
+            if entry:
+                entries.append(entry)
+
+    return entries
@@ -0,0 +1,61 @@
+# performance/management/commands/rebuild_incentives.py
+
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from performance.rollups import rebuild_month
+
+
+class Command(BaseCommand):
+    help = 'Recompute MonthlyIncentive totals from DailyPoints and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            type=str,
+            default=None,
+            help='Month to rebuild as YYYY-MM (default: current month)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without writing any changes'
+        )
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--month must be in YYYY-MM format')
+        else:
+            month = date.today().replace(day=1)
+
+        dry_run = options['dry_run']
+
+        self.stdout.write(f"📊 Rebuilding incentives for {month.strftime('%B %Y')}"
+                          f"{' (dry run)' if dry_run else ''}...")
+
+        drift = rebuild_month(month, dry_run=dry_run)
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('✓ All monthly totals match DailyPoints'))
+            return
+
+        usernames = dict(
+            User.objects.filter(id__in=[d['user_id'] for d in drift]).values_list('id', 'username')
+        )
+
+        for d in sorted(drift, key=lambda d: abs(d['difference']), reverse=True):
+            stored = d['stored'] if d['stored'] is not None else 'missing'
+            self.stdout.write(
+                self.style.WARNING(
+                    f"✗ {usernames.get(d['user_id'], d['user_id'])}: "
+                    f"stored {stored}, actual {d['actual']} ({d['difference']:+})"
+                )
+            )
+
+        action = 'would be fixed' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'✓ {len(drift)} incentive(s) {action}'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('performance', '0002_delete_tasktype'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Day the points count towards')),
+                ('category', models.CharField(choices=[('grooming', 'Grooming'), ('service', 'Cat Service'), ('booking', 'Booking'), ('bonus', 'Bonus')], max_length=20)),
+                ('points', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('count', models.IntegerField(default=0, help_text="Change to the category's task count")),
+                ('source', models.CharField(choices=[('task_completion', 'Task Completion'), ('task_approval', 'Task Approval'), ('package_award', 'Package Award (Type A)'), ('package_release', 'Held Points Released (Type C)'), ('booking_confirmation', 'Booking Confirmation'), ('point_request', 'Point Request'), ('manual_record', 'Manual Record'), ('adjustment', 'Adjustment')], max_length=30)),
+                ('reference', models.CharField(blank=True, help_text='ID of the object that produced the entry', max_length=50)),
+                ('notes', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Points entries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'date'], name='performance_user_id_bc17df_idx'), models.Index(fields=['source', 'reference'], name='performance_source_39a9a7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('performance', '0003_pointsentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('today_points', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('week_points', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('week_days_worked', models.IntegerField(default=0)),
+                ('month_points', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('month_days_worked', models.IntegerField(default=0)),
+                ('daily_average', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('projected_total', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='points_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0004_pointssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyincentive',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, When, Value, ExpressionWrapper
+from django.db.models.lookups import GreaterThan, GreaterThanOrEqual, LessThan
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from datetime import date, timedelta
@@ -88,6 +90,20 @@ class MonthlyIncentive(models.Model):
     paid = models.BooleanField(default=False)
     paid_date = models.DateField(null=True, blank=True)
     
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    MONTHLY_TARGET = Decimal('1200.00')
+    WARNING_THRESHOLD = Decimal('850.00')
+    
+    # (minimum points, incentive earned, milestone reached) - highest tier first
+    INCENTIVE_TIERS = [
+        (Decimal('1200.00'), Decimal('1000.00'), 1000),
+        (Decimal('900.00'), Decimal('600.00'), 600),
+        (Decimal('600.00'), Decimal('400.00'), 400),
+        (Decimal('300.00'), Decimal('200.00'), 200),
+    ]
+    BONUS_RATE = Decimal('0.50')
+    
     class Meta:
         ordering = ['-month']
         unique_together = ['user', 'month']
@@ -98,42 +114,78 @@ class MonthlyIncentive(models.Model):
     
     @property
     def monthly_target(self):
-        return Decimal('1200.00')
+        return self.MONTHLY_TARGET
     
     @property
     def warning_threshold(self):
-        return Decimal('850.00')
+        return self.WARNING_THRESHOLD
     
     @property
     def progress_percentage(self):
         return (self.total_points / self.monthly_target) * 100 if self.monthly_target > 0 else 0
     
-    def calculate_incentive(self):
-        """Calculate incentive based on points"""
-        if self.total_points >= 1200:
-            self.incentive_earned = Decimal('1000.00')
-            self.milestone_reached = 1000
-            # Bonus for exceeding
-            if self.total_points > 1200:
-                excess = self.total_points - 1200
-                self.bonus_earned = excess * Decimal('0.50')
-        elif self.total_points >= 900:
-            self.incentive_earned = Decimal('600.00')
-            self.milestone_reached = 600
-        elif self.total_points >= 600:
-            self.incentive_earned = Decimal('400.00')
-            self.milestone_reached = 400
-        elif self.total_points >= 300:
-            self.incentive_earned = Decimal('200.00')
-            self.milestone_reached = 200
+    def apply_incentive_tiers(self):
+        """Set incentive, bonus, milestone and warning fields from total_points (no save)"""
+        self.incentive_earned = Decimal('0.00')
+        self.milestone_reached = None
+        for minimum, incentive, milestone in self.INCENTIVE_TIERS:
+            if self.total_points >= minimum:
+                self.incentive_earned = incentive
+                self.milestone_reached = milestone
+                break
+        
+        # Bonus for exceeding
+        if self.total_points > self.monthly_target:
+            self.bonus_earned = (self.total_points - self.monthly_target) * self.BONUS_RATE
         else:
-            self.incentive_earned = 0
-            self.milestone_reached = None
+            self.bonus_earned = Decimal('0.00')
         
         # Check warning threshold
-        if self.total_points < self.warning_threshold:
-            self.is_below_warning_threshold = True
+        self.is_below_warning_threshold = self.total_points < self.warning_threshold
+    
+    @classmethod
+    def incentive_expressions(cls, total):
+        """
+        Database-side equivalent of apply_incentive_tiers().
+        `total` is an expression for the new total_points, so the tiers can be
+        recomputed inside the same UPDATE that increments the total.
+        """
+        decimal_field = models.DecimalField(max_digits=7, decimal_places=2)
         
+        return {
+            'incentive_earned': Case(
+                *[When(GreaterThanOrEqual(total, minimum), then=Value(incentive))
+                  for minimum, incentive, _ in cls.INCENTIVE_TIERS],
+                default=Value(Decimal('0.00')),
+                output_field=decimal_field,
+            ),
+            'milestone_reached': Case(
+                *[When(GreaterThanOrEqual(total, minimum), then=Value(milestone))
+                  for minimum, _, milestone in cls.INCENTIVE_TIERS],
+                default=None,
+                output_field=models.IntegerField(),
+            ),
+            'bonus_earned': Case(
+                When(
+                    GreaterThan(total, cls.MONTHLY_TARGET),
+                    then=ExpressionWrapper(
+                        (total - cls.MONTHLY_TARGET) * cls.BONUS_RATE,
+                        output_field=decimal_field,
+                    ),
+                ),
+                default=Value(Decimal('0.00')),
+                output_field=decimal_field,
+            ),
+            'is_below_warning_threshold': Case(
+                When(LessThan(total, cls.WARNING_THRESHOLD), then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+        }
+    
+    def calculate_incentive(self):
+        """Calculate incentive based on points"""
+        self.apply_incentive_tiers()
         self.save()
 
 
@@ -204,4 +256,85 @@ class WarningLetter(models.Model):
         ordering = ['-issued_date']
     
     def __str__(self):
-        return f"Warning: {self.user.username} - {self.get_reason_display()} - {self.month.strftime('%B %Y')}"
\ No newline at end of file
+        return f"Warning: {self.user.username} - {self.get_reason_display()} - {self.month.strftime('%B %Y')}"
+
+
+class PointsEntry(models.Model):
+    """
+    Append-only points ledger - every award/adjustment is one row.
+    DailyPoints and MonthlyIncentive are rollups of these entries and are
+    only ever changed through performance.ledger.
+    """
+    CATEGORY_CHOICES = [
+        ('grooming', 'Grooming'),
+        ('service', 'Cat Service'),
+        ('booking', 'Booking'),
+        ('bonus', 'Bonus'),
+    ]
+    
+    SOURCE_CHOICES = [
+        ('task_completion', 'Task Completion'),
+        ('task_approval', 'Task Approval'),
+        ('package_award', 'Package Award (Type A)'),
+        ('package_release', 'Held Points Released (Type C)'),
+        ('booking_confirmation', 'Booking Confirmation'),
+        ('point_request', 'Point Request'),
+        ('manual_record', 'Manual Record'),
+        ('adjustment', 'Adjustment'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='points_entries')
+    date = models.DateField(help_text="Day the points count towards")
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    points = models.DecimalField(max_digits=7, decimal_places=2)
+    count = models.IntegerField(default=0, help_text="Change to the category's task count")
+    
+    source = models.CharField(max_length=30, choices=SOURCE_CHOICES)
+    reference = models.CharField(max_length=50, blank=True, help_text="ID of the object that produced the entry")
+    notes = models.CharField(max_length=255, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = "Points entries"
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['source', 'reference']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.date} - {self.points:+} pts ({self.get_source_display()})"
+
+
+class PointsSnapshot(models.Model):
+    """
+    Denormalized per-user points summary for the dashboards.
+    Refreshed by the rollup engine on every ledger write; `as_of` is the day
+    the today/week/month figures were computed for.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='points_snapshot')
+    as_of = models.DateField()
+    
+    today_points = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    
+    week_points = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    week_days_worked = models.IntegerField(default=0)
+    
+    month_points = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    month_days_worked = models.IntegerField(default=0)
+    
+    # Projection
+    daily_average = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    projected_total = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.as_of} - {self.month_points} pts this month"
+    
+    @property
+    def week_average(self):
+        if self.week_days_worked > 0:
+            return self.week_points / self.week_days_worked
+        return Decimal('0.00')
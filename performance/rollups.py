@@ -0,0 +1,253 @@
+# performance/rollups.py
+"""
+Rollup engine for the points ledger.
+
+apply_entry() folds one PointsEntry into DailyPoints and MonthlyIncentive
+incrementally (F() expressions, no read-modify-write) and refreshes the
+user's PointsSnapshot; get_snapshot() rolls a snapshot from an earlier day
+forward on first read. rebuild_month() recomputes a whole month from
+DailyPoints in one grouped query and reports any drift between the stored
+and recomputed totals.
+"""
+
+from calendar import monthrange
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import DailyPoints, MonthlyIncentive, PointsSnapshot
+
+
+# Category -> (DailyPoints points field, DailyPoints count field)
+CATEGORY_FIELDS = {
+    'grooming': ('grooming_points', 'grooming_count'),
+    'service': ('service_points', 'cat_service_count'),
+    'booking': ('booking_points', 'booking_count'),
+    'bonus': ('bonus_points', None),
+}
+
+
+def month_bounds(month):
+    """Return (first day, first day of next month) for any date in the month"""
+    start = month.replace(day=1)
+    if start.month == 12:
+        end = date(start.year + 1, 1, 1)
+    else:
+        end = date(start.year, start.month + 1, 1)
+    return start, end
+
+
+def apply_entry(entry):
+    """Apply one ledger entry to the daily and monthly rollups"""
+    apply_daily(entry.user, entry.date, entry.category, entry.points, entry.count)
+    apply_monthly(entry.user, entry.date.replace(day=1), entry.points)
+    refresh_snapshot(entry.user)
+
+
+def apply_daily(user, on_date, category, points, count=0):
+    points_field, count_field = CATEGORY_FIELDS[category]
+
+    increments = {
+        'points': F('points') + points,
+        points_field: F(points_field) + points,
+        'updated_at': timezone.now(),  # update() skips auto_now
+    }
+    if count_field and count:
+        increments[count_field] = F(count_field) + count
+
+    def bump():
+        return DailyPoints.objects.filter(user=user, date=on_date).update(**increments)
+
+    if bump():
+        return
+
+    initial = {'points': points, points_field: points}
+    if count_field and count:
+        initial[count_field] = count
+
+    try:
+        with transaction.atomic():
+            DailyPoints.objects.create(user=user, date=on_date, **initial)
+    except IntegrityError:
+        # Another award created the row first - increment it instead
+        bump()
+
+
+def apply_monthly(user, month, points):
+    new_total = F('total_points') + points
+
+    def bump():
+        return MonthlyIncentive.objects.filter(user=user, month=month).update(
+            total_points=new_total,
+            updated_at=timezone.now(),  # update() skips auto_now
+            **MonthlyIncentive.incentive_expressions(new_total),
+        )
+
+    if bump():
+        return
+
+    monthly = MonthlyIncentive(user=user, month=month, total_points=points)
+    monthly.apply_incentive_tiers()
+
+    try:
+        with transaction.atomic():
+            monthly.save()
+    except IntegrityError:
+        bump()
+
+
+def rebuild_month(month, dry_run=False):
+    """
+    Recompute every user's MonthlyIncentive for `month` from DailyPoints.
+
+    Returns a list of drift dicts (user_id, stored, actual, difference) for
+    rows whose stored total didn't match. Unless dry_run, changed rows are
+    bulk-updated and missing rows bulk-created.
+    """
+    start, end = month_bounds(month)
+
+    actual_totals = {
+        row['user']: row['total'] or Decimal('0.00')
+        for row in DailyPoints.objects.filter(
+            date__gte=start,
+            date__lt=end
+        ).values('user').annotate(total=Sum('points'))
+    }
+
+    existing = {
+        incentive.user_id: incentive
+        for incentive in MonthlyIncentive.objects.filter(month=start)
+    }
+
+    drift = []
+    to_update = []
+    to_create = []
+    now = timezone.now()
+
+    for user_id in set(actual_totals) | set(existing):
+        actual = actual_totals.get(user_id, Decimal('0.00'))
+        incentive = existing.get(user_id)
+        stored = incentive.total_points if incentive else None
+
+        if incentive is None and not actual:
+            continue
+        if incentive is not None and stored == actual:
+            continue
+
+        drift.append({
+            'user_id': user_id,
+            'stored': stored,
+            'actual': actual,
+            'difference': actual - (stored or Decimal('0.00')),
+        })
+
+        if incentive is None:
+            incentive = MonthlyIncentive(user_id=user_id, month=start, total_points=actual)
+            incentive.apply_incentive_tiers()
+            to_create.append(incentive)
+        else:
+            incentive.total_points = actual
+            incentive.apply_incentive_tiers()
+            incentive.updated_at = now  # bulk_update skips auto_now
+            to_update.append(incentive)
+
+    if not dry_run:
+        with transaction.atomic():
+            MonthlyIncentive.objects.bulk_update(
+                to_update,
+                [
+                    'total_points',
+                    'incentive_earned',
+                    'bonus_earned',
+                    'milestone_reached',
+                    'is_below_warning_threshold',
+                    'updated_at',
+                ],
+                batch_size=500,
+            )
+            MonthlyIncentive.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+
+    return drift
+
+
+def build_snapshot(user, today=None):
+    """
+    Compute an (unsaved) PointsSnapshot for `user` from DailyPoints.
+    Today, this week and this month come from one conditional aggregate.
+    """
+    today = today or date.today()
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=6)
+    month_start, month_end = month_bounds(today)
+
+    in_week = Q(date__range=[week_start, week_end])
+    in_month = Q(date__gte=month_start, date__lt=month_end)
+
+    totals = DailyPoints.objects.filter(
+        user=user,
+        date__gte=min(week_start, month_start),
+        date__lte=max(week_end, month_end),
+    ).aggregate(
+        today_points=Sum('points', filter=Q(date=today)),
+        week_points=Sum('points', filter=in_week),
+        week_days_worked=Count('id', filter=in_week),
+        month_points=Sum('points', filter=in_month),
+        month_days_worked=Count('id', filter=in_month),
+    )
+
+    month_points = totals['month_points'] or Decimal('0.00')
+    month_days_worked = totals['month_days_worked'] or 0
+
+    if month_days_worked > 0:
+        daily_average = month_points / month_days_worked
+        projected_total = daily_average * monthrange(today.year, today.month)[1]
+    else:
+        daily_average = Decimal('0.00')
+        projected_total = Decimal('0.00')
+
+    return PointsSnapshot(
+        user=user,
+        as_of=today,
+        today_points=totals['today_points'] or Decimal('0.00'),
+        week_points=totals['week_points'] or Decimal('0.00'),
+        week_days_worked=totals['week_days_worked'] or 0,
+        month_points=month_points,
+        month_days_worked=month_days_worked,
+        daily_average=daily_average.quantize(Decimal('0.01')),
+        projected_total=projected_total.quantize(Decimal('0.01')),
+    )
+
+
+def refresh_snapshot(user, today=None):
+    """Recompute and store the user's PointsSnapshot"""
+    snapshot = build_snapshot(user, today)
+    fields = {
+        field.name: getattr(snapshot, field.name)
+        for field in PointsSnapshot._meta.concrete_fields
+        if field.name not in ('id', 'user', 'updated_at')
+    }
+    fields['updated_at'] = timezone.now()
+
+    if PointsSnapshot.objects.filter(user=user).update(**fields):
+        return snapshot
+
+    try:
+        with transaction.atomic():
+            snapshot.save()
+    except IntegrityError:
+        PointsSnapshot.objects.filter(user=user).update(**fields)
+    return snapshot
+
+
+def get_snapshot(user, today=None):
+    """
+    Read the user's snapshot (one query). If it is missing or was computed
+    on an earlier day the windows have moved, so roll it forward and store
+    it; later reads that day are a single query again.
+    """
+    today = today or date.today()
+    snapshot = PointsSnapshot.objects.filter(user=user, as_of=today).first()
+    return snapshot or refresh_snapshot(user, today)
@@ -1,3 +1,212 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+
+from .forecasting import forecast_team, incentive_payouts, month_progress, weekday_projection
+from . import ledger
+from .models import DailyPoints, MonthlyIncentive, PointsEntry, PointsSnapshot
+from .rollups import get_snapshot, rebuild_month, refresh_snapshot
+
+
+class ForecastingTests(TestCase):
+    # Wednesday 11 March 2026: ten complete days, today is the 11th
+    TODAY = date(2026, 3, 11)
+    MONTH = date(2026, 3, 1)
+
+    def test_month_progress_counts_today_as_remaining(self):
+        self.assertEqual(month_progress(self.MONTH, self.TODAY), (10, 21))
+        self.assertEqual(month_progress(self.MONTH, date(2026, 3, 1)), (0, 31))
+        self.assertEqual(month_progress(self.MONTH, date(2026, 3, 31)), (30, 1))
+        self.assertEqual(month_progress(date(2026, 4, 1), self.TODAY), (0, 30))
+        self.assertEqual(month_progress(date(2026, 2, 1), self.TODAY), (28, 0))
+
+    def test_weekday_projection_ignores_today_so_far(self):
+        matrix = np.zeros((2, 31))
+        matrix[:, :10] = 40
+        matrix[0, 10] = 5    # a slow start to today doesn't drag the rate down
+        matrix[1, 10] = 60   # ...and points already earned today are kept
+
+        projected = weekday_projection(matrix, self.MONTH, 10)
+
+        self.assertEqual(projected[0], 40 * 31)
+        self.assertEqual(projected[1], 40 * 30 + 60)
+
+    def test_forecast_matches_calculate_incentive(self):
+        staff = User.objects.create_user(username='groomer', email='groomer@example.com', password='x')
+        DailyPoints.objects.bulk_create(
+            DailyPoints(user=staff, date=self.MONTH + timedelta(days=d), points=50)
+            for d in range(10)
+        )
+
+        forecast = forecast_team(today=self.TODAY)
+        row = forecast['staff'][0]
+
+        self.assertEqual(forecast['days_remaining'], 21)
+        self.assertEqual(row['current_points'], 500)
+        self.assertEqual(row['projected_total'], 50 * 31)
+
+        incentive = MonthlyIncentive(user=staff, month=self.MONTH, total_points=Decimal(row['projected_total']))
+        incentive.apply_incentive_tiers()
+        self.assertEqual(row['incentive'], float(incentive.incentive_earned))
+        self.assertEqual(row['bonus'], float(incentive.bonus_earned))
+
+        amounts, bonuses = incentive_payouts([row['projected_total']])
+        self.assertEqual((amounts[0], bonuses[0]), (row['incentive'], row['bonus']))
+
+
+class ForecastingBenchmarkTests(TestCase):
+    STAFF = 500
+    TODAY = date(2026, 3, 20)
+
+    @classmethod
+    def setUpTestData(cls):
+        branches = [code for code, _ in User.BRANCH_CHOICES]
+        User.objects.bulk_create(
+            User(
+                username=f'staff{n}', email=f'staff{n}@example.com', employee_id=f'CTZ{n + 1:03d}',
+                branch=branches[n % len(branches)],
+            )
+            for n in range(cls.STAFF)
+        )
+        month = cls.TODAY.replace(day=1)
+        DailyPoints.objects.bulk_create(
+            (
+                DailyPoints(user=user, date=month + timedelta(days=d), points=20 + (user.id * 7 + d * 13) % 60)
+                for user in User.objects.all()
+                for d in range(cls.TODAY.day)
+                if (user.id + d) % 7  # a day off a week
+            ),
+            batch_size=2000,
+        )
+
+    def test_500_staff_in_well_under_a_second(self):
+        started = time.perf_counter()
+        forecast = forecast_team(today=self.TODAY)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(forecast['totals']['staff_count'], self.STAFF)
+        self.assertEqual(sum(b['staff_count'] for b in forecast['branches']), self.STAFF)
+        self.assertAlmostEqual(
+            sum(b['total_liability'] for b in forecast['branches']),
+            forecast['totals']['total_liability'],
+            places=2,
+        )
+        self.assertLess(elapsed, 1.0, f'forecast_team took {elapsed:.3f}s for {self.STAFF} staff')
+
+
+class SnapshotTests(TestCase):
+    MONDAY = date(2026, 3, 9)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='groomer', email='groomer@example.com', password='x')
+        DailyPoints.objects.bulk_create([
+            DailyPoints(user=cls.user, date=cls.MONDAY - timedelta(days=1), points=30),
+            DailyPoints(user=cls.user, date=cls.MONDAY, points=45),
+        ])
+
+    def test_stale_snapshot_rolls_forward_on_read(self):
+        refresh_snapshot(self.user, today=self.MONDAY - timedelta(days=1))
+
+        snapshot = get_snapshot(self.user, today=self.MONDAY)
+
+        self.assertEqual(snapshot.as_of, self.MONDAY)
+        self.assertEqual(snapshot.today_points, 45)
+        self.assertEqual(snapshot.week_points, 45)  # Sunday was last week
+        self.assertEqual(snapshot.month_points, 75)
+        self.assertEqual(PointsSnapshot.objects.get(user=self.user).as_of, self.MONDAY)
+
+        # Stored, so the rest of the day is a single read
+        with self.assertNumQueries(1):
+            self.assertEqual(get_snapshot(self.user, today=self.MONDAY).today_points, 45)
+
+    def test_missing_snapshot_is_created_on_read(self):
+        self.assertEqual(get_snapshot(self.user, today=self.MONDAY).month_points, 75)
+        self.assertTrue(PointsSnapshot.objects.filter(user=self.user, as_of=self.MONDAY).exists())
+
+
+class LedgerRollupTests(TestCase):
+    DAY = date(2026, 3, 10)
+    MONTH = date(2026, 3, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='groomer', email='groomer@example.com', password='x')
+        cls.other = User.objects.create_user(username='bather', email='bather@example.com', password='x')
+
+    def incentive_fields(self, user):
+        return MonthlyIncentive.objects.filter(user=user, month=self.MONTH).values(
+            'total_points', 'incentive_earned', 'bonus_earned', 'milestone_reached', 'is_below_warning_threshold',
+        ).get()
+
+    def test_repeated_awards_sum_without_lost_updates(self):
+        # Each award works from whatever it last read, like concurrent requests
+        stale_user = User.objects.get(id=self.user.id)
+        for n in range(20):
+            ledger.award_points(self.user if n % 2 else stale_user, 35, 'grooming', 'task_completion',
+                                on_date=self.DAY, count=1)
+            ledger.award_points(self.user, '12.50', 'service', 'task_completion', on_date=self.DAY, count=1)
+        ledger.award_points(self.user, 5, 'bonus', 'adjustment', on_date=self.DAY)
+
+        daily = DailyPoints.objects.get(user=self.user, date=self.DAY)
+        self.assertEqual(daily.points, Decimal('955.00'))
+        self.assertEqual(daily.grooming_points, Decimal('700.00'))
+        self.assertEqual(daily.grooming_count, 20)
+        self.assertEqual(daily.service_points, Decimal('250.00'))
+        self.assertEqual(daily.cat_service_count, 20)
+        self.assertEqual(daily.bonus_points, Decimal('5.00'))
+        self.assertEqual(PointsEntry.objects.filter(user=self.user).count(), 41)
+
+        incentive = self.incentive_fields(self.user)
+        self.assertEqual(incentive['total_points'], Decimal('955.00'))
+        self.assertEqual(incentive['incentive_earned'], Decimal('600.00'))
+        self.assertEqual(incentive['milestone_reached'], 600)
+        self.assertEqual(incentive['bonus_earned'], Decimal('0.00'))
+        self.assertFalse(incentive['is_below_warning_threshold'])
+
+    def test_tiers_follow_the_total_across_thresholds(self):
+        for n in range(26):
+            ledger.award_points(self.user, 50, 'grooming', 'task_completion',
+                                on_date=self.MONTH + timedelta(days=n))
+            total = Decimal(50 * (n + 1))
+
+            expected = MonthlyIncentive(total_points=total)
+            expected.apply_incentive_tiers()
+            stored = self.incentive_fields(self.user)
+            self.assertEqual(stored['total_points'], total)
+            self.assertEqual(stored['incentive_earned'], expected.incentive_earned, total)
+            self.assertEqual(stored['milestone_reached'], expected.milestone_reached, total)
+            self.assertEqual(stored['bonus_earned'], expected.bonus_earned, total)
+            self.assertEqual(stored['is_below_warning_threshold'], expected.is_below_warning_threshold, total)
+
+    def test_rebuild_month_reproduces_incremental_rollups(self):
+        for n in range(28):
+            ledger.award_points(self.user, 47 + n % 5, 'grooming', 'task_completion',
+                                on_date=self.MONTH + timedelta(days=n))
+            ledger.award_points(self.other, 20, 'booking', 'booking_confirmation',
+                                on_date=self.MONTH + timedelta(days=n), count=1)
+        # Next month's points stay out of this month's rebuild
+        ledger.award_points(self.user, 100, 'grooming', 'task_completion', on_date=date(2026, 4, 1))
+
+        incremental = {user: self.incentive_fields(user) for user in (self.user, self.other)}
+        self.assertEqual(rebuild_month(self.MONTH, dry_run=True), [])
+
+        # Drift in one row, the other row lost entirely
+        MonthlyIncentive.objects.filter(user=self.user, month=self.MONTH).update(
+            total_points=Decimal('10.00'), incentive_earned=Decimal('0.00'), bonus_earned=Decimal('0.00'),
+        )
+        MonthlyIncentive.objects.filter(user=self.other, month=self.MONTH).delete()
+
+        drift = {row['user_id']: row for row in rebuild_month(self.MONTH)}
+
+        self.assertEqual(set(drift), {self.user.id, self.other.id})
+        self.assertEqual(drift[self.user.id]['difference'], incremental[self.user]['total_points'] - 10)
+        self.assertIsNone(drift[self.other.id]['stored'])
+        for user in (self.user, self.other):
+            self.assertEqual(self.incentive_fields(user), incremental[user])
+        self.assertEqual(rebuild_month(self.MONTH, dry_run=True), [])
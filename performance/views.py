@@ -9,6 +9,7 @@ from datetime import date
 from calendar import monthrange
 from decimal import Decimal
 from .models import DailyPoints, MonthlyIncentive
+from . import ledger
 from accounts.models import User
 
 @login_required
@@ -147,6 +148,11 @@ def projection_calculator(request):
         'custom_average': custom_average,
     }
     
+    # Admins also get the month-end forecast for the whole team
+    if user.role == 'admin':
+        from .forecasting import forecast_team
+        context['team_forecast'] = forecast_team(today=today, scenario_averages=scenario_averages)
+    
     return render(request, 'performance/projection_calculator.html', context)
 
 
@@ -159,21 +165,6 @@ def record_points(request):
     user = request.user
     today = date.today()
     
-    # Get or create today's points
-    daily_points, created = DailyPoints.objects.get_or_create(
-        user=user,
-        date=today,
-        defaults={
-            'grooming_count': 0,
-            'cat_service_count': 0,
-            'booking_count': 0,
-            'grooming_points': 0,
-            'service_points': 0,
-            'booking_points': 0,
-            'points': 0,
-        }
-    )
-    
     if request.method == 'POST':
         # Get counts from form
         grooming_count = int(request.POST.get('grooming_count', 0))
@@ -185,24 +176,23 @@ def record_points(request):
         service_points = service_count * 15
         booking_points = booking_count * 15
         
-        # Update counts
-        daily_points.grooming_count = grooming_count
-        daily_points.cat_service_count = service_count
-        daily_points.booking_count = booking_count
-        
-        # Update individual points
-        daily_points.grooming_points = grooming_points
-        daily_points.service_points = service_points
-        daily_points.booking_points = booking_points
-        
-        # Calculate total points
-        daily_points.points = grooming_points + service_points + booking_points
+        # Post the difference against today's figures to the ledger
+        ledger.set_daily_breakdown(user, today, {
+            'grooming': (grooming_points, grooming_count),
+            'service': (service_points, service_count),
+            'booking': (booking_points, booking_count),
+        })
         
-        daily_points.save()
+        total_today = DailyPoints.objects.filter(
+            user=user,
+            date=today
+        ).values_list('points', flat=True).first() or 0
         
-        messages.success(request, f'Points recorded! Total today: {daily_points.points} points')
+        messages.success(request, f'Points recorded! Total today: {total_today} points')
         return redirect('record_points')
     
+    daily_points = DailyPoints.objects.filter(user=user, date=today).first() or DailyPoints(user=user, date=today)
+    
     context = {
         'daily_points': daily_points,
         'today': today,
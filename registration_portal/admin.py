@@ -2,7 +2,7 @@
 # Admin interface for registration portal
 
 from django.contrib import admin
-from .models import RegistrationSession
+from .models import OcrCacheEntry, OcrJob, RegistrationSession
 
 
 @admin.register(RegistrationSession)
@@ -19,4 +19,19 @@ class RegistrationSessionAdmin(admin.ModelAdmin):
         ('Statistics', {
             'fields': ('customers_registered', 'cats_registered', 'service_requests_created')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(OcrJob)
+class OcrJobAdmin(admin.ModelAdmin):
+    list_display = ['job_id', 'uploaded_by', 'filename', 'status', 'confidence', 'extract_ms', 'parse_ms', 'validate_ms', 'created_at']
+    list_filter = ['status', 'is_valid', 'from_cache', 'created_at']
+    search_fields = ['job_id', 'filename', 'uploaded_by__username', 'cache_key']
+    readonly_fields = ['job_id', 'created_at', 'started_at', 'finished_at', 'extract_ms', 'parse_ms', 'validate_ms']
+    exclude = ['image']
+
+
+@admin.register(OcrCacheEntry)
+class OcrCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['key', 'hits', 'created_at', 'last_used_at']
+    search_fields = ['key']
+    readonly_fields = ['key', 'hits', 'created_at', 'last_used_at']
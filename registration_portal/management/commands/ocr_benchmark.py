@@ -0,0 +1,221 @@
+# registration_portal/management/commands/ocr_benchmark.py
+
+import contextlib
+import io
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageDraw, ImageFont
+
+from registration_portal.ocr_preprocess import preprocessing_config
+from registration_portal.ocr_utils import extract_text_from_image, parse_portal_collar_data
+
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+REQUIRED_FIELDS = ('name', 'phone', 'cat_name')
+
+# Synthetic corpus values
+NAMES = ['AHMAD FAIZAL', 'TAN MEI LING', 'PRIYA RAJAN', 'NURUL AISYAH', 'LIM WEI JIE', 'SITI HAJAR']
+CAT_NAMES = ['MOCHI', 'OREO', 'SIMBA', 'LUNA', 'MILO', 'COCO']
+BREEDS = ['Persian', 'British Shorthair', 'Maine Coon', 'Ragdoll', 'Siamese']
+COLORS = ['Orange', 'Black White', 'Grey', 'Calico', 'Cream']
+
+
+class Command(BaseCommand):
+    help = 'Compare OCR latency and field accuracy with and without image preprocessing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'corpus',
+            help='Folder of screenshots, each with a <name>.json of the expected parsed fields'
+        )
+        parser.add_argument(
+            '--generate',
+            type=int,
+            metavar='N',
+            help='First write N synthetic 1080x2400 Collar-style screenshots into the folder'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='OCR each image this many times per mode and keep the fastest (default: 1)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1,
+            help='Random seed for --generate (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        corpus = Path(options['corpus'])
+
+        if options['generate']:
+            corpus.mkdir(parents=True, exist_ok=True)
+            generate_corpus(corpus, options['generate'], random.Random(options['seed']))
+            self.stdout.write(f"🖼️  Wrote {options['generate']} synthetic screenshot(s) to {corpus}")
+
+        if not corpus.is_dir():
+            raise CommandError(f'{corpus} is not a folder')
+
+        cases = []
+        for image_path in sorted(corpus.iterdir()):
+            golden = image_path.with_suffix('.json')
+            if image_path.suffix.lower() in IMAGE_SUFFIXES and golden.exists():
+                cases.append((image_path, json.loads(golden.read_text())))
+
+        if not cases:
+            raise CommandError(f'No screenshots with a matching .json found in {corpus}')
+
+        modes = {
+            'raw': {'enabled': False},
+            'preprocessed': preprocessing_config({'enabled': True}),
+        }
+        self.stdout.write(f"📊 Benchmarking {len(cases)} image(s), best of {options['repeat']} per mode...")
+
+        results = {mode: {'latency': [], 'fields': 0, 'matched': 0, 'complete': 0} for mode in modes}
+        for image_path, expected in cases:
+            content = image_path.read_bytes()
+            line = [image_path.name]
+
+            for mode, config in modes.items():
+                try:
+                    latency, parsed = run_case(content, config, options['repeat'])
+                except Exception as e:
+                    raise CommandError(f'OCR failed on {image_path.name} ({mode}): {e}')
+                matched = [field for field, value in expected.items() if normalize(parsed.get(field)) == normalize(value)]
+
+                stats = results[mode]
+                stats['latency'].append(latency)
+                stats['fields'] += len(expected)
+                stats['matched'] += len(matched)
+                stats['complete'] += all(parsed.get(field) for field in REQUIRED_FIELDS)
+                line.append(f'{mode} {latency:.0f} ms {len(matched)}/{len(expected)}')
+
+            if options['verbosity'] >= 2:
+                self.stdout.write('  ' + ' | '.join(line))
+
+        self.stdout.write('')
+        self.stdout.write(f"{'':22}{'raw':>14}{'preprocessed':>16}")
+        rows = [
+            ('OCR latency mean', lambda s: f"{statistics.mean(s['latency']):.0f} ms"),
+            ('OCR latency p50', lambda s: f"{percentile(s['latency'], 50):.0f} ms"),
+            ('OCR latency p95', lambda s: f"{percentile(s['latency'], 95):.0f} ms"),
+            ('Field accuracy', lambda s: f"{s['matched'] / s['fields']:.1%}"),
+            ('Required fields found', lambda s: f"{s['complete']}/{len(cases)}"),
+        ]
+        for label, render in rows:
+            self.stdout.write(f"{label:22}{render(results['raw']):>14}{render(results['preprocessed']):>16}")
+
+        speedup = statistics.mean(results['raw']['latency']) / max(statistics.mean(results['preprocessed']['latency']), 0.001)
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Preprocessing speedup: x{speedup:.2f}"))
+
+
+def run_case(content, config, repeat):
+    """Fastest OCR time in ms over `repeat` runs, and the parsed fields"""
+    best = None
+    text = ''
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            text = extract_text_from_image(io.BytesIO(content), config)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, parse_portal_collar_data(text)
+
+
+def normalize(value):
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ============================================
+# SYNTHETIC CORPUS
+# ============================================
+
+def generate_corpus(folder, count, rng):
+    """Collar-style profile screenshots (light and dark theme) with their expected fields"""
+    for i in range(count):
+        expected = {
+            'name': rng.choice(NAMES),
+            'phone': f"01{rng.randint(0, 9)}-{rng.randint(1000000, 9999999)}",
+            'email': f"customer{i}@example.com",
+            'ic_number': f"{rng.randint(700101, 991231)}-{rng.randint(10, 14)}-{rng.randint(1000, 9999)}",
+            'cat_name': rng.choice(CAT_NAMES),
+            'breed': rng.choice(BREEDS),
+            'age': str(rng.randint(2, 120)),
+            'gender': rng.choice(['male', 'female']),
+            'color': rng.choice(COLORS),
+            'weight': f"{rng.randint(20, 70) / 10:.1f}",
+        }
+        dark = i % 3 == 2
+        image = render_screenshot(expected, dark, rng)
+
+        stem = f'collar_{i:03d}'
+        if i % 2:
+            image.save(folder / f'{stem}.jpg', quality=85)
+        else:
+            image.save(folder / f'{stem}.png')
+        (folder / f'{stem}.json').write_text(json.dumps(expected, indent=2))
+
+
+def render_screenshot(expected, dark, rng):
+    background, card, ink, accent = (
+        ((18, 18, 20), (38, 38, 42), (235, 235, 240), (255, 159, 10)) if dark
+        else ((242, 242, 247), (255, 255, 255), (28, 28, 30), (0, 122, 255))
+    )
+    image = Image.new('RGB', (1080, 2400), background)
+    draw = ImageDraw.Draw(image)
+    body = ImageFont.load_default(size=40)
+    title = ImageFont.load_default(size=52)
+
+    # Status bar and app bar
+    draw.text((48, 30), f"{rng.randint(8, 11)}:{rng.randint(10, 59)}", font=body, fill=ink)
+    draw.rectangle((0, 110, 1080, 260), fill=accent)
+    draw.text((48, 155), 'Collar', font=title, fill=(255, 255, 255))
+
+    sections = [
+        ('CUSTOMER INFORMATION', [
+            f"Customer Name: {expected['name']}",
+            f"Phone: {expected['phone']}",
+            f"Email: {expected['email']}",
+            f"IC Number: {expected['ic_number']}",
+        ]),
+        ('CAT INFORMATION', [
+            f"Cat Name: {expected['cat_name']}",
+            f"Breed: {expected['breed']}",
+            f"Age: {expected['age']} months",
+            f"Gender: {expected['gender'].title()}",
+            f"Colour: {expected['color']}",
+            f"Weight: {expected['weight']} kg",
+        ]),
+    ]
+
+    y = 320
+    for heading, lines in sections:
+        draw.text((48, y), heading, font=body, fill=accent)
+        y += 70
+        draw.rounded_rectangle((32, y, 1048, y + 40 + 80 * len(lines)), radius=28, fill=card)
+        y += 30
+        for text in lines:
+            draw.text((72, y), text, font=body, fill=ink)
+            y += 80
+        y += 70
+
+    # Bottom navigation bar
+    draw.rectangle((0, 2250, 1080, 2400), fill=card)
+    for x, label in ((90, 'Home'), (440, 'Pets'), (790, 'Profile')):
+        draw.text((x, 2300), label, font=body, fill=ink)
+
+    return image
@@ -0,0 +1,204 @@
+# registration_portal/management/commands/ocr_ingest.py
+
+import os
+import statistics
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User
+from registration_portal.models import OcrJob
+from registration_portal.ocr_cache import get_cached_results, store_results
+from registration_portal.ocr_jobs import make_executor
+from registration_portal.ocr_utils import OcrError, file_cache_key, run_ocr_file
+
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+STAGES = ('extract_ms', 'parse_ms', 'validate_ms')
+
+# Results are written in batches of this many rows
+WRITE_BATCH = 50
+
+
+class Command(BaseCommand):
+    help = 'OCR a folder of Collar app screenshots into the registration review queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('folder', help='Folder of screenshots')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='OCR worker processes (default: one per core)'
+        )
+        parser.add_argument(
+            '--branch',
+            help="Branch whose review queue gets the drafts (default: --user's branch)"
+        )
+        parser.add_argument(
+            '--user',
+            help='Username to record as the uploader'
+        )
+        parser.add_argument(
+            '--recursive',
+            action='store_true',
+            help='Include screenshots in subfolders'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-ingest files already in the queue'
+        )
+
+    def handle(self, *args, **options):
+        folder = Path(options['folder']).resolve()
+        if not folder.is_dir():
+            raise CommandError(f'{folder} is not a folder')
+
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found")
+        branch = options['branch'] or (user.branch if user else '')
+
+        pattern = '**/*' if options['recursive'] else '*'
+        paths = sorted(
+            str(path) for path in folder.glob(pattern)
+            if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES
+        )
+
+        earlier = OcrJob.objects.filter(source='batch', source_path__in=paths)
+        if options['force']:
+            # Replace earlier drafts nobody has reviewed yet
+            earlier.filter(review_status='pending').delete()
+        else:
+            # Failed files are retried (and their old rows replaced)
+            earlier.filter(status='failed').delete()
+            seen = set(earlier.values_list('source_path', flat=True))
+            if seen:
+                self.stdout.write(f"⏭️  Skipping {len(seen)} file(s) already ingested (use --force to redo)")
+            paths = [path for path in paths if path not in seen]
+
+        if not paths:
+            self.stdout.write(self.style.WARNING('No new screenshots to ingest.'))
+            return
+
+        workers = max(1, min(options['workers'], len(paths)))
+        self.stdout.write(f"🔍 Ingesting {len(paths)} screenshot(s) with {workers} worker process(es)...")
+
+        started = time.perf_counter()
+        jobs = []
+        cache_items = []
+        timings = {stage: [] for stage in STAGES}
+        failed = 0
+
+        def new_job(path, key):
+            return OcrJob(
+                source='batch',
+                source_path=path,
+                filename=os.path.basename(path)[:255],
+                branch=branch,
+                uploaded_by=user,
+                cache_key=key,
+                attempts=1,
+                finished_at=timezone.now(),
+            )
+
+        def flush():
+            OcrJob.objects.bulk_create(jobs)
+            store_results(cache_items)
+            jobs.clear()
+            cache_items.clear()
+
+        with make_executor(workers, quiet=True) as executor:
+            # Hashing decodes every screenshot, so it runs on the pool too
+            keys = dict(zip(paths, executor.map(file_cache_key, paths, chunksize=8)))
+            cached = get_cached_results(keys.values())
+
+            # One OCR run per distinct screenshot ('' = undecodable, each runs alone)
+            groups = {}
+            for path in paths:
+                key = keys[path]
+                if key in cached:
+                    job = new_job(path, key)
+                    job.status, job.message = 'done', 'Ready for review (same screenshot as before)'
+                    job.result = cached[key]
+                    job.is_valid = cached[key]['is_valid']
+                    job.confidence = cached[key]['confidence']
+                    job.from_cache = True
+                    jobs.append(job)
+                else:
+                    groups.setdefault(key or path, []).append(path)
+
+            if cached:
+                self.stdout.write(f"♻️  {len(paths) - sum(map(len, groups.values()))} screenshot(s) already in the OCR cache")
+
+            futures = {executor.submit(run_ocr_file, group[0]): group for group in groups.values()}
+
+            for future in as_completed(futures):
+                group = futures[future]
+                group_jobs = [new_job(path, keys[path]) for path in group]
+
+                try:
+                    data, stage_ms = future.result()
+                except OcrError as e:
+                    outcome = {'status': 'failed', 'message': str(e)[:255], 'error': getattr(e, 'detail', '')[-4000:]}
+                except Exception as e:
+                    outcome = {'status': 'failed', 'message': f'OCR Error: {e}'[:255]}
+                else:
+                    outcome = {
+                        'status': 'done',
+                        'message': 'Ready for review',
+                        'result': data,
+                        'is_valid': data['is_valid'],
+                        'confidence': data['confidence'],
+                    }
+                    # Timings belong to the file that was OCRed; copies reuse its result
+                    for stage, value in stage_ms.items():
+                        setattr(group_jobs[0], stage, value)
+                        timings[stage].append(value)
+                    for job in group_jobs[1:]:
+                        job.from_cache = True
+                    cache_items.append((keys[group[0]], data))
+
+                for job in group_jobs:
+                    for field, value in outcome.items():
+                        setattr(job, field, value)
+
+                    if job.status == 'failed':
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f"  ✗ {job.filename}: {job.message}"))
+                    elif options['verbosity'] >= 2:
+                        self.stdout.write(f"  ✓ {job.filename}: {job.confidence:.0%}")
+
+                jobs.extend(group_jobs)
+                if len(jobs) >= WRITE_BATCH:
+                    flush()
+
+        flush()
+        elapsed = time.perf_counter() - started
+
+        done = len(paths) - failed
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ {done} draft(s) queued for review{f' ({branch})' if branch else ''}, {failed} failed"
+        ))
+        self.stdout.write(
+            f"⏱️  {elapsed:.1f}s total, {len(paths) / elapsed:.2f} screenshot(s)/s "
+            f"with {workers} worker(s)"
+        )
+        for stage in STAGES:
+            values = timings[stage]
+            if values:
+                self.stdout.write(
+                    f"   {stage[:-3]:<9} mean {statistics.mean(values):7.0f} ms   "
+                    f"max {max(values):7.0f} ms"
+                )
+
+        if done:
+            valid = OcrJob.objects.filter(source='batch', source_path__in=paths, status='done', is_valid=True).count()
+            self.stdout.write(f"📋 {valid}/{done} draft(s) have every required field")
@@ -0,0 +1,83 @@
+# registration_portal/management/commands/ocr_parse_benchmark.py
+
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from registration_portal.ocr_utils import OCR_RESULT_VERSION, parse_portal_collar_data
+
+
+GOLDEN_FILE = Path(__file__).resolve().parents[2] / 'ocr_corpus' / 'parse_golden.jsonl'
+
+
+class Command(BaseCommand):
+    help = 'Time parse_portal_collar_data over the golden OCR text corpus (correctness is checked by the tests)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--golden',
+            default=str(GOLDEN_FILE),
+            help='JSON lines of {"text": ..., "expected": {...}} (default: the bundled corpus)'
+        )
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=200,
+            help='Parse the whole corpus this many times per round (default: 200)'
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Timing rounds; the fastest is reported (default: 5)'
+        )
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Rewrite the expected fields from the current parser (after an intended change)'
+        )
+
+    def handle(self, *args, **options):
+        golden = Path(options['golden'])
+        if not golden.exists():
+            raise CommandError(f'{golden} not found')
+
+        cases = [json.loads(line) for line in golden.read_text(encoding='utf-8').splitlines() if line.strip()]
+        if not cases:
+            raise CommandError(f'No cases in {golden}')
+
+        if options['update']:
+            with golden.open('w', encoding='utf-8') as f:
+                for case in cases:
+                    case['expected'] = parsed_fields(case['text'])
+                    f.write(json.dumps(case, ensure_ascii=False) + '\n')
+            self.stdout.write(self.style.WARNING(
+                f"✏️  Rewrote {len(cases)} expected result(s) in {golden}. "
+                f"Bump OCR_RESULT_VERSION (now {OCR_RESULT_VERSION}) so cached results are not reused."
+            ))
+            return
+
+        texts = [case['text'] for case in cases]
+        lines = sum(len(text.split('\n')) for text in texts)
+        rounds = []
+        for _ in range(max(1, options['rounds'])):
+            started = time.perf_counter()
+            for _ in range(options['number']):
+                for text in texts:
+                    parse_portal_collar_data(text)
+            rounds.append((time.perf_counter() - started) / (options['number'] * len(texts)))
+
+        self.stdout.write(
+            f"⏱️  parse_portal_collar_data: {min(rounds) * 1e6:.1f} µs/call best, "
+            f"{statistics.median(rounds) * 1e6:.1f} µs/call median "
+            f"({len(texts)} texts, {lines / len(texts):.1f} lines each)"
+        )
+
+
+def parsed_fields(text):
+    parsed = parse_portal_collar_data(text)
+    parsed.pop('raw_text')
+    return parsed
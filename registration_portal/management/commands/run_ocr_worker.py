@@ -0,0 +1,68 @@
+# registration_portal/management/commands/run_ocr_worker.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from concurrent.futures.process import BrokenProcessPool
+
+from registration_portal.ocr_jobs import (
+    HOUSEKEEPING_INTERVAL, OCR_POOL_SIZE, make_executor, process_pending_jobs, purge_old_jobs,
+    requeue_stale_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run OCR on uploaded registration screenshots with a local process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=OCR_POOL_SIZE,
+            help=f'OCR worker processes (default: OCR_POOL_SIZE = {OCR_POOL_SIZE})'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the current queue and exit instead of polling'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.stdout.write(f"🔍 OCR worker started ({workers} process(es))")
+
+        executor = make_executor(workers)
+        last_housekeeping = 0
+        try:
+            while True:
+                if time.monotonic() - last_housekeeping >= HOUSEKEEPING_INTERVAL:
+                    requeued = requeue_stale_jobs()
+                    purged = purge_old_jobs()
+                    if requeued or purged:
+                        self.stdout.write(f"🧹 {requeued} stale job(s) requeued, {purged} old job(s) deleted")
+                    last_housekeeping = time.monotonic()
+
+                try:
+                    processed = process_pending_jobs(executor, workers)
+                except BrokenProcessPool:
+                    self.stdout.write(self.style.WARNING("⚠️ OCR pool died - restarting it"))
+                    executor = make_executor(workers)
+                    continue
+
+                if processed:
+                    self.stdout.write(self.style.SUCCESS(f"✓ {processed} screenshot(s) processed"))
+
+                if options['once']:
+                    break
+                if not processed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("👋 OCR worker stopped")
+        finally:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('registration_portal', '0002_ocrjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrjob',
+            name='branch',
+            field=models.CharField(blank=True, help_text='Branch whose review queue this belongs to', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='review_status',
+            field=models.CharField(choices=[('pending', 'Pending review'), ('confirmed', 'Confirmed'), ('discarded', 'Discarded')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='reviewed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='reviewed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ocr_jobs_reviewed', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='source',
+            field=models.CharField(choices=[('upload', 'Upload'), ('batch', 'Batch ingest')], default='upload', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='source_path',
+            field=models.CharField(blank=True, help_text='File path for batch ingests', max_length=500),
+        ),
+        migrations.AddIndex(
+            model_name='ocrjob',
+            index=models.Index(fields=['review_status', 'status', 'branch'], name='registratio_review__f1f809_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ocrjob',
+            index=models.Index(fields=['source', 'source_path'], name='registratio_source_d67c89_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:37
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration_portal', '0003_ocrjob_review_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OcrCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('result', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'OCR cache entries',
+            },
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='cache_key',
+            field=models.CharField(blank=True, help_text='ocr_utils.image_cache_key() of the upload', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='from_cache',
+            field=models.BooleanField(default=False, help_text='Result reused from an identical earlier screenshot'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('registration_portal', '0004_ocr_result_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrjob',
+            name='review_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ocrjob',
+            name='reviewing_by',
+            field=models.ForeignKey(blank=True, help_text='Staff member who has the draft open', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ocr_jobs_reviewing', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
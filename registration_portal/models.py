@@ -2,9 +2,12 @@
 # Simple session tracking for registration portal
 
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from django.utils import timezone
+from datetime import timedelta
 import json
+import uuid
 
 class RegistrationSession(models.Model):
     """Track registration portal login sessions"""
@@ -32,4 +35,161 @@ class RegistrationSession(models.Model):
         """Mark session as ended"""
         self.is_active = False
         self.logout_time = timezone.now()
-        self.save()
\ No newline at end of file
+        self.save()
+
+class OcrJob(models.Model):
+    """
+    A registration screenshot waiting for / done with OCR. The upload view
+    only stores the image; the OCR worker pool extracts, parses and
+    validates it and records how long each stage took. Finished jobs are
+    drafts in the review queue until staff confirm or discard them.
+    
+    Whoever has a draft open holds its review claim (an upload's uploader
+    from the start), so nobody else can register the same customer from
+    it; a claim left idle for REVIEW_CLAIM_TIMEOUT lapses.
+    """
+    
+    REVIEW_CLAIM_TIMEOUT = timedelta(minutes=30)
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    SOURCE_CHOICES = [
+        ('upload', 'Upload'),
+        ('batch', 'Batch ingest'),
+    ]
+    
+    REVIEW_STATUS_CHOICES = [
+        ('pending', 'Pending review'),
+        ('confirmed', 'Confirmed'),
+        ('discarded', 'Discarded'),
+    ]
+    
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='ocr_jobs'
+    )
+    
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='upload')
+    source_path = models.CharField(max_length=500, blank=True, help_text="File path for batch ingests")
+    branch = models.CharField(max_length=50, blank=True, help_text="Branch whose review queue this belongs to")
+    
+    # Upload (cleared once OCR succeeds)
+    filename = models.CharField(max_length=255, blank=True)
+    image = models.BinaryField(null=True, blank=True, editable=False)
+    cache_key = models.CharField(max_length=64, blank=True, help_text="ocr_utils.image_cache_key() of the upload")
+    from_cache = models.BooleanField(default=False, help_text="Result reused from an identical earlier screenshot")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    message = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    # Result: parse_portal_collar_data() output plus validation
+    result = models.JSONField(null=True, blank=True)
+    is_valid = models.BooleanField(default=False)
+    confidence = models.FloatField(null=True, blank=True)
+    
+    # Stage timings (milliseconds)
+    extract_ms = models.PositiveIntegerField(null=True, blank=True)
+    parse_ms = models.PositiveIntegerField(null=True, blank=True)
+    validate_ms = models.PositiveIntegerField(null=True, blank=True)
+    
+    # Review queue
+    review_status = models.CharField(max_length=20, choices=REVIEW_STATUS_CHOICES, default='pending')
+    reviewed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ocr_jobs_reviewed'
+    )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewing_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ocr_jobs_reviewing',
+        help_text="Staff member who has the draft open"
+    )
+    review_claimed_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['review_status', 'status', 'branch']),
+            models.Index(fields=['source', 'source_path']),
+        ]
+    
+    def __str__(self):
+        return f"OCR {self.job_id} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+    
+    @property
+    def queue_ms(self):
+        """Time spent waiting for a worker"""
+        if self.started_at:
+            return int((self.started_at - self.created_at).total_seconds() * 1000)
+        return None
+    
+    @classmethod
+    def claimable_by(cls, user):
+        """Q for drafts `user` may open: unclaimed, claimed by them, or claim lapsed"""
+        return (
+            Q(reviewing_by__isnull=True) |
+            Q(reviewing_by=user) |
+            Q(review_claimed_at__lt=timezone.now() - cls.REVIEW_CLAIM_TIMEOUT)
+        )
+    
+    def claim_review(self, user):
+        """Reserve (or refresh) the pending draft for `user`; False if someone else holds it"""
+        return bool(OcrJob.objects.filter(
+            OcrJob.claimable_by(user),
+            id=self.id,
+            review_status='pending',
+        ).update(reviewing_by=user, review_claimed_at=timezone.now()))
+    
+    def mark_reviewed(self, user, review_status):
+        """Take the draft out of the review queue (confirmed or discarded)"""
+        OcrJob.objects.filter(OcrJob.claimable_by(user), id=self.id, review_status='pending').update(
+            review_status=review_status,
+            reviewed_by=user,
+            reviewed_at=timezone.now(),
+        )
+
+
+class OcrCacheEntry(models.Model):
+    """
+    OCR result (parsed, validated data) for one screenshot content hash,
+    so the same image uploaded again skips tesseract. Kept to
+    OCR_CACHE_SIZE rows, least recently used evicted first.
+    """
+    
+    key = models.CharField(max_length=64, unique=True)
+    result = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        verbose_name_plural = 'OCR cache entries'
+    
+    def __str__(self):
+        return f"OCR cache {self.key[:12]} ({self.hits} hits)"
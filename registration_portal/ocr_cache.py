@@ -0,0 +1,75 @@
+# registration_portal/ocr_cache.py
+"""
+OCR results cached by screenshot content.
+
+Staff re-upload the same screenshot after discarding a review, and
+several staff upload the same customer's image. image_cache_key() hashes
+the decoded pixels together with the preprocessing and tesseract
+settings; when the key is already here the stored (parsed and validated)
+result is reused and tesseract and the parser don't run at all.
+
+Entries live in the database so the web process, run_ocr_worker and
+ocr_ingest share them. The table is held at OCR_CACHE_SIZE rows by
+evicting the least recently used; OCR_CACHE_SIZE = 0 turns caching off.
+"""
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OcrCacheEntry
+
+
+OCR_CACHE_SIZE = getattr(settings, 'OCR_CACHE_SIZE', 500)
+
+
+def get_cached_results(keys):
+    """{key: result} for the keys that are cached; marks them recently used"""
+    keys = {key for key in keys if key}
+    if OCR_CACHE_SIZE <= 0 or not keys:
+        return {}
+
+    results = dict(OcrCacheEntry.objects.filter(key__in=keys).values_list('key', 'result'))
+    if results:
+        OcrCacheEntry.objects.filter(key__in=results).update(
+            hits=F('hits') + 1,
+            last_used_at=timezone.now(),
+        )
+    return results
+
+
+def get_cached_result(key):
+    """The cached result for `key`, or None"""
+    return get_cached_results([key]).get(key)
+
+
+def store_results(items):
+    """Cache (key, result) pairs, then evict down to OCR_CACHE_SIZE"""
+    # Last one wins for a key given twice (a single upsert can't touch a row twice)
+    results = {key: result for key, result in items if key}
+    if OCR_CACHE_SIZE <= 0 or not results:
+        return
+
+    now = timezone.now()
+    OcrCacheEntry.objects.bulk_create(
+        [OcrCacheEntry(key=key, result=result, last_used_at=now) for key, result in results.items()],
+        update_conflicts=True,
+        unique_fields=['key'],
+        update_fields=['result', 'last_used_at'],
+    )
+    evict()
+
+
+def store_result(key, result):
+    store_results([(key, result)])
+
+
+def evict(size=None):
+    """Delete all but the `size` (default OCR_CACHE_SIZE) most recently used entries"""
+    size = OCR_CACHE_SIZE if size is None else size
+    stale = list(
+        OcrCacheEntry.objects.order_by('-last_used_at', '-id').values_list('id', flat=True)[size:]
+    )
+    if stale:
+        OcrCacheEntry.objects.filter(id__in=stale).delete()
+    return len(stale)
@@ -0,0 +1,309 @@
+# registration_portal/ocr_jobs.py
+"""
+Background OCR for registration screenshots.
+
+upload_screenshot() stores the image as an OcrJob and returns straight
+away. A dispatcher claims queued jobs with a conditional UPDATE (so any
+number of processes can share the queue without a broker) and runs
+run_ocr_job() on a local ProcessPoolExecutor, keeping tesseract off
+the request threads:
+
+- OCR_WORKER_MODE = 'inline' (default): the web process starts a
+  dispatcher thread on upload, feeding its own pool of OCR_POOL_SIZE
+  worker processes;
+- OCR_WORKER_MODE = 'process': only `manage.py run_ocr_worker` does.
+  Set this wherever that command runs (the Procfile sets it for `web`),
+  otherwise every web process also runs its own OCR pool.
+
+A screenshot whose content hash is in the OCR cache (ocr_cache) is done
+as soon as it is uploaded, or as soon as it is claimed if an identical
+one finished while it was queued.
+
+The review page polls ocr_job_status until the job is done or failed.
+Finished jobs wait in the branch's review queue (ocr_review_queue) until
+staff confirm or discard the draft; `manage.py ocr_ingest` fills the same
+queue from a folder of screenshots.
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OcrJob
+from .ocr_cache import get_cached_result, store_result
+from .ocr_utils import OcrError, image_cache_key, quiet_worker, run_ocr_job
+
+
+logger = logging.getLogger(__name__)
+
+OCR_WORKER_MODE = getattr(settings, 'OCR_WORKER_MODE', 'inline')
+OCR_POOL_SIZE = getattr(settings, 'OCR_POOL_SIZE', 2)
+
+# A job running longer than this is assumed dead (worker restarted)
+STALE_AFTER = timedelta(minutes=5)
+MAX_ATTEMPTS = 2
+
+# Failed and reviewed job rows are deleted after this long...
+KEEP_FINISHED_FOR = timedelta(days=2)
+# ...drafts nobody reviewed after this long
+KEEP_DRAFTS_FOR = timedelta(days=30)
+
+# Housekeeping (stale/old jobs) runs at most every this many seconds per worker
+HOUSEKEEPING_INTERVAL = 300
+
+
+def pool_context():
+    """
+    Worker processes only run the database-free pipeline. forkserver/spawn
+    keep them from inheriting the web process's threads and connections.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def make_executor(workers=None, quiet=False):
+    return ProcessPoolExecutor(
+        max_workers=workers or OCR_POOL_SIZE,
+        mp_context=pool_context(),
+        initializer=quiet_worker if quiet else None,
+    )
+
+
+# ============================================
+# SUBMIT
+# ============================================
+
+def submit_ocr_job(upload, user):
+    """Store an uploaded screenshot for OCR and return the OcrJob"""
+    image = upload.read()
+    job = OcrJob(
+        uploaded_by=user,
+        branch=user.branch or '',
+        filename=upload.name[:255],
+        cache_key=image_cache_key(image),
+        # The uploader reviews it; it only shows in the queue if they abandon it
+        reviewing_by=user,
+        review_claimed_at=timezone.now(),
+    )
+
+    cached = get_cached_result(job.cache_key)
+    if cached is not None:
+        _set_cached_result(job, cached)
+        job.save()
+        return job
+
+    job.image = image
+    job.message = 'Waiting for OCR worker'
+    job.save()
+
+    if OCR_WORKER_MODE == 'inline':
+        transaction.on_commit(start_inline_dispatcher)
+
+    return job
+
+
+# ============================================
+# WORKER
+# ============================================
+
+def _set_cached_result(job, data):
+    """Fill in a job (not yet saved) from a cached result"""
+    now = timezone.now()
+    job.status = 'done'
+    job.message = 'Ready for review (same screenshot as before)'
+    job.result = data
+    job.is_valid = data['is_valid']
+    job.confidence = data['confidence']
+    job.from_cache = True
+    job.started_at = job.finished_at = now
+
+
+def finish_from_cache(job, data):
+    """Complete a claimed job with a cached result instead of running OCR"""
+    _set_cached_result(job, data)
+    job.image = None
+    job.save(update_fields=[
+        'status', 'message', 'result', 'is_valid', 'confidence',
+        'from_cache', 'started_at', 'finished_at', 'image',
+    ])
+
+
+def claim_next_job():
+    """Claim the oldest queued job; the conditional UPDATE makes the claim exclusive"""
+    candidates = OcrJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True)[:10]
+
+    for job_id in candidates:
+        claimed = OcrJob.objects.filter(id=job_id, status='queued').update(
+            status='running',
+            started_at=timezone.now(),
+            message='Reading screenshot',
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return OcrJob.objects.get(id=job_id)
+
+    return None
+
+
+def _retry_or_fail(job, message):
+    """Put a job whose worker died back on the queue, or fail it after MAX_ATTEMPTS"""
+    if job.attempts < MAX_ATTEMPTS:
+        OcrJob.objects.filter(id=job.id).update(status='queued', message='Retrying')
+    else:
+        OcrJob.objects.filter(id=job.id).update(
+            status='failed',
+            message=message,
+            image=None,
+            finished_at=timezone.now(),
+        )
+
+
+def finish_job(job, future):
+    """Store the outcome of one pipeline run"""
+    try:
+        data, timings = future.result()
+    except BrokenProcessPool:
+        _retry_or_fail(job, 'OCR worker crashed while reading this screenshot')
+        return False
+    except OcrError as e:
+        OcrJob.objects.filter(id=job.id).update(
+            status='failed',
+            message=str(e)[:255],
+            error=getattr(e, 'detail', '')[-4000:],
+            image=None,
+            finished_at=timezone.now(),
+        )
+        return False
+    except Exception as e:
+        OcrJob.objects.filter(id=job.id).update(
+            status='failed',
+            message=f'OCR Error: {e}'[:255],
+            error=traceback.format_exc()[-4000:],
+            image=None,
+            finished_at=timezone.now(),
+        )
+        logger.exception('OCR job %s failed', job.job_id)
+        return False
+
+    OcrJob.objects.filter(id=job.id).update(
+        status='done',
+        message='Ready for review',
+        result=data,
+        is_valid=data['is_valid'],
+        confidence=data['confidence'],
+        image=None,  # not needed once the text is out
+        finished_at=timezone.now(),
+        **timings,
+    )
+    store_result(job.cache_key, data)
+    return True
+
+
+def process_pending_jobs(executor, slots, limit=None):
+    """
+    Keep up to `slots` queued jobs running on `executor` until the queue
+    is empty (or `limit` jobs finished). Returns how many finished.
+    Raises BrokenProcessPool if the pool died; the caller makes a new one.
+    """
+    in_flight = {}
+    finished = 0
+
+    while True:
+        while len(in_flight) < slots and (limit is None or finished + len(in_flight) < limit):
+            job = claim_next_job()
+            if job is None:
+                break
+            # An identical screenshot may have finished while this one was queued
+            cached = get_cached_result(job.cache_key)
+            if cached is not None:
+                finish_from_cache(job, cached)
+                finished += 1
+                continue
+            try:
+                future = executor.submit(run_ocr_job, bytes(job.image))
+            except BrokenProcessPool:
+                # Never reached a worker, so it doesn't count as an attempt
+                OcrJob.objects.filter(id=job.id).update(status='queued', attempts=F('attempts') - 1)
+                raise
+            in_flight[future] = job
+
+        if not in_flight:
+            return finished
+
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            finish_job(in_flight.pop(future), future)
+            finished += 1
+
+
+def requeue_stale_jobs():
+    """Put jobs whose worker died back on the queue (or fail them after MAX_ATTEMPTS)"""
+    cutoff = timezone.now() - STALE_AFTER
+    stale = OcrJob.objects.filter(status='running', started_at__lt=cutoff)
+
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='queued', message='Retrying')
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed',
+        message='OCR timed out',
+        image=None,
+        finished_at=timezone.now(),
+    )
+    return requeued
+
+
+def purge_old_jobs():
+    """Delete failed/reviewed job rows past KEEP_FINISHED_FOR and stale drafts past KEEP_DRAFTS_FOR"""
+    now = timezone.now()
+    deleted, _ = OcrJob.objects.filter(
+        Q(status='failed') | Q(status='done', review_status__in=['confirmed', 'discarded']),
+        created_at__lt=now - KEEP_FINISHED_FOR,
+    ).delete()
+    drafts, _ = OcrJob.objects.filter(status='done', created_at__lt=now - KEEP_DRAFTS_FOR).delete()
+    return deleted + drafts
+
+
+_inline_lock = threading.Lock()
+_inline_executor = None
+_last_inline_housekeeping = None
+
+
+def start_inline_dispatcher():
+    """Drain the queue through this process's pool on a daemon thread (one at a time)"""
+    if not _inline_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_drain_inline, name='ocr-dispatcher', daemon=True).start()
+
+
+def _drain_inline():
+    global _inline_executor, _last_inline_housekeeping
+    try:
+        close_old_connections()
+        # Inline deployments have no run_ocr_worker to do this
+        now = time.monotonic()
+        if _last_inline_housekeeping is None or now - _last_inline_housekeeping >= HOUSEKEEPING_INTERVAL:
+            _last_inline_housekeeping = now
+            requeue_stale_jobs()
+            purge_old_jobs()
+        if _inline_executor is None:
+            _inline_executor = make_executor()
+        try:
+            process_pending_jobs(_inline_executor, OCR_POOL_SIZE)
+        except BrokenProcessPool:
+            _inline_executor = None
+    finally:
+        _inline_lock.release()
+        # A job queued while we were finishing up would otherwise wait
+        pending = OcrJob.objects.filter(status='queued').exists()
+        connection.close()
+        if pending:
+            start_inline_dispatcher()
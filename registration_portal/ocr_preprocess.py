@@ -0,0 +1,139 @@
+# registration_portal/ocr_preprocess.py
+"""
+Image clean-up ahead of tesseract.
+
+Collar app screenshots arrive as 1080x2400 colour PNGs, far more pixels
+than tesseract needs. When settings.OCR_PREPROCESSING enables it,
+preprocess_image() runs the enabled steps in this order:
+
+1. grayscale;
+2. downscale from the screenshot's (assumed) DPI to `target_dpi`, never up;
+3. crop to the content area (bounding box of everything that differs
+   from the background, plus a margin);
+4. adaptive binarization: a pixel is ink when it is `binarize_offset`
+   darker than the mean of its `binarize_window` square (a box filter,
+   so O(pixels) whatever the window); dark-mode screenshots come out
+   black-on-white too.
+
+preprocessing_signature() identifies the effective settings, so anything
+keyed on OCR output can tell when the steps changed.
+"""
+
+import json
+
+import numpy as np
+from PIL import Image, ImageFilter
+from django.conf import settings
+
+
+# Bump when a step's behaviour changes without its settings changing
+PREPROCESS_VERSION = 1
+
+DEFAULT_PREPROCESSING = {
+    # Opt-in (OCR_PREPROCESS=True) until ocr_benchmark numbers on real
+    # screenshots show better accuracy/latency than raw images
+    'enabled': False,
+    'grayscale': True,
+    # Phone screenshots carry no real DPI; treat them as an xxhdpi screen
+    'assumed_dpi': 420,
+    'target_dpi': 300,
+    'crop': True,
+    'crop_margin': 12,         # px, after downscaling
+    'crop_tolerance': 24,      # grey levels away from the background that count as content
+    'binarize': True,
+    'binarize_window': 41,     # px, after downscaling
+    'binarize_offset': 0.15,   # fraction below the local mean
+}
+
+
+def preprocessing_config(overrides=None):
+    """DEFAULT_PREPROCESSING, then settings.OCR_PREPROCESSING, then `overrides`"""
+    config = dict(DEFAULT_PREPROCESSING)
+    config.update(getattr(settings, 'OCR_PREPROCESSING', {}))
+    if overrides:
+        config.update(overrides)
+    return config
+
+
+def preprocessing_signature(config=None):
+    config = config or preprocessing_config()
+    if not config['enabled']:
+        return 'raw'
+    return f"v{PREPROCESS_VERSION}:" + json.dumps(config, sort_keys=True, separators=(',', ':'))
+
+
+def preprocess_image(img, config=None):
+    """Return `img` prepared for tesseract according to `config` (default: settings)"""
+    config = config or preprocessing_config()
+
+    if not config['enabled']:
+        return img if img.mode == 'RGB' else img.convert('RGB')
+
+    if config['grayscale'] or config['binarize']:
+        img = img.convert('L')
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img = downscale(img, config)
+
+    if config['crop']:
+        img = crop_to_content(img, config['crop_tolerance'], config['crop_margin'])
+
+    if config['binarize']:
+        img = binarize(img, config['binarize_window'], config['binarize_offset'])
+
+    return img
+
+
+def downscale(img, config):
+    source_dpi = config['assumed_dpi']
+    dpi = img.info.get('dpi')
+    if dpi and dpi[0] > 72:  # 72 is what most tools write when they don't know
+        source_dpi = dpi[0]
+
+    scale = config['target_dpi'] / source_dpi
+    if scale >= 1:
+        return img
+
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def _background_level(pixels):
+    """Most common grey level along the border"""
+    border = np.concatenate([pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]])
+    return int(np.bincount(border).argmax())
+
+
+def crop_to_content(img, tolerance, margin):
+    pixels = np.asarray(img if img.mode == 'L' else img.convert('L'))
+    content = np.abs(pixels.astype(np.int16) - _background_level(pixels)) > tolerance
+
+    rows = np.flatnonzero(content.any(axis=1))
+    cols = np.flatnonzero(content.any(axis=0))
+    if not len(rows):
+        return img
+
+    return img.crop((
+        max(0, cols[0] - margin),
+        max(0, rows[0] - margin),
+        min(img.width, cols[-1] + 1 + margin),
+        min(img.height, rows[-1] + 1 + margin),
+    ))
+
+
+def binarize(img, window, offset):
+    """Bradley-Roth adaptive threshold; returns black text on white ('L' mode)"""
+    pixels = np.asarray(img, dtype=np.int32)
+    # BoxBlur is a running-sum box filter in C: the local mean in O(pixels)
+    local_mean = np.asarray(img.filter(ImageFilter.BoxBlur(window // 2)), dtype=np.int32)
+
+    # Integer form of pixel <= mean * (1 - offset), in thousandths
+    factor = round(offset * 1000)
+    if _background_level(pixels) < 128:
+        # Dark mode: light text is what stands out from its surroundings
+        ink = pixels * 1000 >= local_mean * (1000 + factor)
+    else:
+        ink = pixels * 1000 <= local_mean * (1000 - factor)
+
+    return Image.fromarray(np.where(ink, 0, 255).astype(np.uint8), mode='L')
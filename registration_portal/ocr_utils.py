@@ -1,22 +1,40 @@
 # registration_portal/ocr_utils.py
-# FIXED - Debug print AFTER data dictionary created
+# Tesseract OCR for Collar app screenshots: extract, parse, validate
 
+import hashlib
+import os
 import re
+import sys
+import time
+import traceback
+from collections import namedtuple
+from io import BytesIO
+
 from PIL import Image
 import pytesseract
 from django.conf import settings
 
-def extract_text_from_image(image_file):
-    """Extract text from uploaded image using Tesseract OCR"""
+from .ocr_preprocess import preprocess_image, preprocessing_config, preprocessing_signature
+
+TESSERACT_CONFIG = '--psm 6'
+
+# Bump when parsing or validation changes, so cached results are not reused
+OCR_RESULT_VERSION = 1
+
+
+def extract_text_from_image(image_file, preprocessing=None):
+    """
+    Extract text from uploaded image using Tesseract OCR.
+    `preprocessing` overrides settings.OCR_PREPROCESSING for this call.
+    """
     try:
         img = Image.open(image_file)
         
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
+        img = preprocess_image(img, preprocessing_config(preprocessing))
         
         pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
         
-        text = pytesseract.image_to_string(img, config='--psm 6')
+        text = pytesseract.image_to_string(img, config=TESSERACT_CONFIG)
         
         print(f"✓ OCR: Extracted {len(text)} characters")
         
@@ -27,13 +45,213 @@ def extract_text_from_image(image_file):
         raise
 
 
+# ============================================
+# FIELD EXTRACTION
+# ============================================
+# Each field takes the first line that contains one of its keywords
+# (lowercased) and yields a value. Block fields read the lines around the
+# first keyword line and stop there even if nothing usable was found.
+
+FieldSpec = namedtuple('FieldSpec', ['field', 'keywords', 'extract', 'block'])
+
+NAME_VALUE = re.compile(r'name[:\s]+([A-Z\s]+)', re.IGNORECASE)
+CUSTOMER_NAME_NOISE = re.compile(r'\b(CUSTOMER|INFORMATION|NAME)\b', re.IGNORECASE)
+CAT_NAME_NOISE = re.compile(r'\b(CAT|INFORMATION|NAME)\b', re.IGNORECASE)
+
+PHONE_VALUES = [
+    re.compile(r'(\d{3}[-\s]?\d{7,8})'),                          # 012-3456789 / 012 3456789
+    re.compile(r'(0\d{9,10})'),                                    # 0123456789
+    re.compile(r'phone[:\s]+(\d[\d\s-]{8,})', re.IGNORECASE),      # anything phone-like after "Phone:"
+]
+NON_DIGITS = re.compile(r'[^\d]')
+
+EMAIL_VALUE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+IC_VALUE = re.compile(r'(\d{6}[-\s]?\d{2}[-\s]?\d{4})')             # 123456-12-1234
+
+BREED_VALUE = re.compile(r'breed[:\s]+([A-Za-z\s]+)', re.IGNORECASE)
+BREED_NOISE = re.compile(r'\b(BREED|CAT|INFORMATION)\b', re.IGNORECASE)
+AGE_VALUE = re.compile(r'age[:\s]+(\d+)', re.IGNORECASE)
+COLOR_VALUE = re.compile(r'colou?r[:\s]+([A-Za-z\s]+)', re.IGNORECASE)
+COLOR_NOISE = re.compile(r'\b(COLOR|COLOUR|CAT)\b', re.IGNORECASE)
+WEIGHT_VALUE = re.compile(r'weight[:\s]+([\d.]+)', re.IGNORECASE)
+
+ADDRESS_STOP_WORDS = ('cat', 'phone', 'email', 'ic', 'service')
+MEDICAL_KEYWORDS = ('medical', 'health', 'allerg', 'condition', 'illness', 'disease')
+MEDICAL_LABELS = re.compile(rf"\b(?:{'|'.join(MEDICAL_KEYWORDS)})\w*\b[:\s]*", re.IGNORECASE)
+SPECIAL_KEYWORDS = ('special', 'note', 'requirement', 'behavior', 'temperament')
+SPECIAL_LABELS = re.compile(rf"\b(?:{'|'.join(SPECIAL_KEYWORDS)})s?\b[:\s]*", re.IGNORECASE)
+SPECIAL_STOP_WORDS = ('customer', 'service', 'appointment')
+
+
+def _cleaned_name(line, noise, min_length):
+    match = NAME_VALUE.search(line)
+    if match:
+        name = noise.sub('', match.group(1).strip()).strip()
+        if len(name) > min_length:
+            return name.upper()
+    return ''
+
+
+def _extract_name(lines, i, lowered):
+    # "Name:" on a cat line is the cat's name
+    if 'customer name' not in lowered and 'cat' in lowered:
+        return ''
+    return _cleaned_name(lines[i], CUSTOMER_NAME_NOISE, 2)
+
+
+def _extract_phone(lines, i, lowered):
+    for pattern in PHONE_VALUES:
+        match = pattern.search(lines[i])
+        if match:
+            phone = NON_DIGITS.sub('', match.group(1))
+            # Malaysian numbers: leading 0, 10-11 digits
+            if phone.startswith('0') and 10 <= len(phone) <= 11:
+                return f"{phone[:3]}-{phone[3:]}"
+            return ''
+    return ''
+
+
+def _extract_email(lines, i, lowered):
+    match = EMAIL_VALUE.search(lines[i])
+    return match.group(0).lower() if match else ''
+
+
+def _extract_ic_number(lines, i, lowered):
+    match = IC_VALUE.search(lines[i])
+    if not match:
+        return ''
+    ic = match.group(1).replace(' ', '')
+    return f"{ic[:6]}-{ic[6:8]}-{ic[8:]}" if len(ic) == 12 else ic
+
+
+def _extract_address(lines, i, lowered):
+    # Usually multi-line: up to three lines after "Address", until another section starts
+    address_lines = []
+    for line in lines[i + 1:i + 4]:
+        line = line.strip()
+        if line and len(line) > 5:
+            if any(word in line.lower() for word in ADDRESS_STOP_WORDS):
+                break
+            address_lines.append(line)
+    return ', '.join(address_lines)
+
+
+def _extract_cat_name(lines, i, lowered):
+    return _cleaned_name(lines[i], CAT_NAME_NOISE, 1)
+
+
+def _extract_breed(lines, i, lowered):
+    match = BREED_VALUE.search(lines[i])
+    if match:
+        breed = BREED_NOISE.sub('', match.group(1).strip()).strip()
+        if len(breed) > 2:
+            return breed.title()
+    return ''
+
+
+def _extract_age(lines, i, lowered):
+    match = AGE_VALUE.search(lines[i])
+    return match.group(1) if match else ''
+
+
+def _extract_gender(lines, i, lowered):
+    if 'female' in lowered:
+        return 'female'
+    if 'male' in lowered:
+        return 'male'
+    return ''
+
+
+def _extract_color(lines, i, lowered):
+    match = COLOR_VALUE.search(lines[i])
+    if match:
+        color = COLOR_NOISE.sub('', match.group(1).strip()).strip()
+        if len(color) > 2:
+            return color.title()
+    return ''
+
+
+def _extract_weight(lines, i, lowered):
+    match = WEIGHT_VALUE.search(lines[i])
+    return match.group(1) if match else ''
+
+
+def _extract_vaccination_status(lines, i, lowered):
+    if 'up to date' in lowered or 'updated' in lowered or 'complete' in lowered:
+        return 'up_to_date'
+    if 'partial' in lowered:
+        return 'partial'
+    if 'none' in lowered or 'not vaccinated' in lowered:
+        return 'none'
+    return 'unknown'
+
+
+def _extract_medical_notes(lines, i, lowered):
+    # The keyword line and the two after it, labels removed
+    notes = []
+    for line in lines[i:i + 3]:
+        line = line.strip()
+        if line and len(line) > 5:
+            line = MEDICAL_LABELS.sub('', line).strip()
+            if line:
+                notes.append(line)
+    return ' '.join(notes)
+
+
+def _extract_special_requirements(lines, i, lowered):
+    notes = []
+    for line in lines[i:i + 3]:
+        line = line.strip()
+        if line and len(line) > 5:
+            if any(word in line.lower() for word in SPECIAL_STOP_WORDS):
+                break
+            line = SPECIAL_LABELS.sub('', line).strip()
+            if line:
+                notes.append(line)
+    return ' '.join(notes)
+
+
+FIELD_SPECS = [
+    # Customer
+    FieldSpec('name', ('customer name', 'name:'), _extract_name, False),
+    FieldSpec('phone', ('phone',), _extract_phone, False),
+    FieldSpec('email', ('email',), _extract_email, False),
+    FieldSpec('ic_number', ('ic', 'nric'), _extract_ic_number, False),
+    FieldSpec('address', ('address',), _extract_address, True),
+    # Cat
+    FieldSpec('cat_name', ('cat name',), _extract_cat_name, False),
+    FieldSpec('breed', ('breed',), _extract_breed, False),
+    FieldSpec('age', ('age',), _extract_age, False),
+    FieldSpec('gender', ('gender',), _extract_gender, False),
+    FieldSpec('color', ('color', 'colour'), _extract_color, False),
+    FieldSpec('weight', ('weight',), _extract_weight, False),
+    FieldSpec('vaccination_status', ('vaccination', 'vaccine'), _extract_vaccination_status, True),
+    FieldSpec('medical_notes', MEDICAL_KEYWORDS, _extract_medical_notes, True),
+    FieldSpec('special_requirements', SPECIAL_KEYWORDS, _extract_special_requirements, True),
+]
+
+_KEYWORDS = sorted({keyword for spec in FIELD_SPECS for keyword in spec.keywords}, key=len, reverse=True)
+
+# One scan per line finds every keyword in it; the lookahead makes matches
+# overlap, so 'medical' doesn't hide the 'ic' inside it
+FIELD_KEYWORDS = re.compile('(?=(' + '|'.join(map(re.escape, _KEYWORDS)) + '))')
+
+# Keyword -> fields it triggers. A keyword also triggers the fields of any
+# keyword it contains, which covers a shorter keyword starting at the same
+# position as a longer one (the scan only reports the longer)
+KEYWORD_FIELDS = {
+    keyword: [spec for spec in FIELD_SPECS if any(other in keyword for other in spec.keywords)]
+    for keyword in _KEYWORDS
+}
+
+
 def parse_portal_collar_data(raw_text):
     """
     Parse ONLY Customer and Cat data from extracted text
-    Based on Customer and Cat models only
+    Based on Customer and Cat models only.
+    Single pass over the lines, driven by FIELD_SPECS.
     """
     
-    # ✅ FIXED: Create data dictionary FIRST before any debug prints
     data = {
         # ===== CUSTOMER MODEL FIELDS =====
         'name': '',              # Customer.name (required)
@@ -57,230 +275,27 @@ def parse_portal_collar_data(raw_text):
         'raw_text': raw_text,
     }
     
-    # ✅ NOW we can debug print AFTER data is created
-    print("="*50)
-    print("DATA DICTIONARY INITIALIZED")
-    print("="*50)
-    
     lines = raw_text.split('\n')
+    found = set()
     
-    # ============================================
-    # EXTRACT CUSTOMER INFORMATION
-    # ============================================
-    
-    # Customer Name
-    for line in lines:
-        if 'customer name' in line.lower() or ('name:' in line.lower() and 'cat' not in line.lower()):
-            match = re.search(r'name[:\s]+([A-Z\s]+)', line, re.IGNORECASE)
-            if match:
-                name = match.group(1).strip()
-                name = re.sub(r'\b(CUSTOMER|INFORMATION|NAME)\b', '', name, flags=re.IGNORECASE).strip()
-                if len(name) > 2:
-                    data['name'] = name.upper()
-                    print(f"✓ Customer Name: {data['name']}")
-                    break
-    
-    # Phone Number - Malaysian format (more flexible)
-    for line in lines:
-        if 'phone' in line.lower():
-            # Try multiple patterns
-            # Pattern 1: 012-3456789 or 012 3456789
-            match = re.search(r'(\d{3}[-\s]?\d{7,8})', line)
-            if not match:
-                # Pattern 2: 0123456789 (no separator)
-                match = re.search(r'(0\d{9,10})', line)
-            if not match:
-                # Pattern 3: Just any phone-like number after "Phone:"
-                match = re.search(r'phone[:\s]+(\d[\d\s-]{8,})', line, re.IGNORECASE)
-            
-            if match:
-                phone = match.group(1).replace(' ', '').replace('-', '')
-                # Remove leading zeros and non-digits
-                phone = re.sub(r'[^\d]', '', phone)
-                # Ensure starts with 0 and has 10-11 digits
-                if phone.startswith('0') and 10 <= len(phone) <= 11:
-                    data['phone'] = f"{phone[:3]}-{phone[3:]}"
-                    print(f"✓ Phone: {data['phone']}")
-                    break
-    
-    # Email
-    for line in lines:
-        if 'email' in line.lower():
-            match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', line)
-            if match:
-                data['email'] = match.group(0).lower()
-                print(f"✓ Email: {data['email']}")
-                break
-    
-    # IC Number - Malaysian format: 123456-12-1234
-    for line in lines:
-        if 'ic' in line.lower() or 'nric' in line.lower():
-            match = re.search(r'(\d{6}[-\s]?\d{2}[-\s]?\d{4})', line)
-            if match:
-                ic = match.group(1).replace(' ', '')
-                if len(ic) == 12:
-                    data['ic_number'] = f"{ic[:6]}-{ic[6:8]}-{ic[8:]}"
-                else:
-                    data['ic_number'] = ic
-                print(f"✓ IC: {data['ic_number']}")
-                break
-    
-    # Address - usually multi-line, look for keywords
-    address_lines = []
     for i, line in enumerate(lines):
-        if 'address' in line.lower():
-            # Get lines after "address" keyword
-            for j in range(i+1, min(i+4, len(lines))):
-                addr_line = lines[j].strip()
-                if addr_line and len(addr_line) > 5:
-                    # Stop if we hit another section
-                    if any(keyword in addr_line.lower() for keyword in ['cat', 'phone', 'email', 'ic', 'service']):
-                        break
-                    address_lines.append(addr_line)
-            break
-    
-    if address_lines:
-        data['address'] = ', '.join(address_lines)
-        print(f"✓ Address: {data['address'][:50]}...")
-    
-    # ============================================
-    # EXTRACT CAT INFORMATION
-    # ============================================
-    
-    # Cat Name
-    for line in lines:
-        if 'cat name' in line.lower():
-            match = re.search(r'name[:\s]+([A-Z\s]+)', line, re.IGNORECASE)
-            if match:
-                cat_name = match.group(1).strip()
-                cat_name = re.sub(r'\b(CAT|INFORMATION|NAME)\b', '', cat_name, flags=re.IGNORECASE).strip()
-                if len(cat_name) > 1:
-                    data['cat_name'] = cat_name.upper()
-                    print(f"✓ Cat Name: {data['cat_name']}")
-                    break
-    
-    # Breed
-    for line in lines:
-        if 'breed' in line.lower():
-            match = re.search(r'breed[:\s]+([A-Za-z\s]+)', line, re.IGNORECASE)
-            if match:
-                breed = match.group(1).strip()
-                breed = re.sub(r'\b(BREED|CAT|INFORMATION)\b', '', breed, flags=re.IGNORECASE).strip()
-                if len(breed) > 2:
-                    data['breed'] = breed.title()
-                    print(f"✓ Breed: {data['breed']}")
-                    break
-    
-    # Age (in months)
-    for line in lines:
-        if 'age' in line.lower():
-            match = re.search(r'age[:\s]+(\d+)', line, re.IGNORECASE)
-            if match:
-                data['age'] = match.group(1)
-                print(f"✓ Age: {data['age']} months")
-                break
-    
-    # Gender
-    for line in lines:
-        if 'gender' in line.lower():
-            if 'female' in line.lower():
-                data['gender'] = 'female'
-            elif 'male' in line.lower():
-                data['gender'] = 'male'
-            if data['gender']:
-                print(f"✓ Gender: {data['gender']}")
-                break
-    
-    # Color
-    for line in lines:
-        if 'color' in line.lower() or 'colour' in line.lower():
-            match = re.search(r'colou?r[:\s]+([A-Za-z\s]+)', line, re.IGNORECASE)
-            if match:
-                color = match.group(1).strip()
-                color = re.sub(r'\b(COLOR|COLOUR|CAT)\b', '', color, flags=re.IGNORECASE).strip()
-                if len(color) > 2:
-                    data['color'] = color.title()
-                    print(f"✓ Color: {data['color']}")
-                    break
-    
-    # Weight (in kg)
-    for line in lines:
-        if 'weight' in line.lower():
-            match = re.search(r'weight[:\s]+([\d.]+)', line, re.IGNORECASE)
-            if match:
-                data['weight'] = match.group(1)
-                print(f"✓ Weight: {data['weight']} kg")
-                break
-    
-    # Vaccination Status
-    for line in lines:
-        if 'vaccination' in line.lower() or 'vaccine' in line.lower():
-            if 'up to date' in line.lower() or 'updated' in line.lower() or 'complete' in line.lower():
-                data['vaccination_status'] = 'up_to_date'
-            elif 'partial' in line.lower():
-                data['vaccination_status'] = 'partial'
-            elif 'none' in line.lower() or 'not vaccinated' in line.lower():
-                data['vaccination_status'] = 'none'
-            else:
-                data['vaccination_status'] = 'unknown'
-            
-            if data['vaccination_status']:
-                print(f"✓ Vaccination: {data['vaccination_status']}")
-                break
-    
-    # Medical Notes - look for health, medical, allergies
-    medical_keywords = ['medical', 'health', 'allerg', 'condition', 'illness', 'disease']
-    medical_lines = []
-    
-    for i, line in enumerate(lines):
-        if any(keyword in line.lower() for keyword in medical_keywords):
-            # Get this line and next few
-            for j in range(i, min(i+3, len(lines))):
-                med_line = lines[j].strip()
-                if med_line and len(med_line) > 5:
-                    # Clean up
-                    for keyword in medical_keywords:
-                        med_line = re.sub(rf'\b{keyword}\w*\b[:\s]*', '', med_line, flags=re.IGNORECASE)
-                    if med_line.strip():
-                        medical_lines.append(med_line.strip())
-            break
-    
-    if medical_lines:
-        data['medical_notes'] = ' '.join(medical_lines)
-        print(f"✓ Medical Notes: {data['medical_notes'][:50]}...")
-    
-    # Special Requirements/Notes
-    special_keywords = ['special', 'note', 'requirement', 'behavior', 'temperament']
-    special_lines = []
-    
-    for i, line in enumerate(lines):
-        if any(keyword in line.lower() for keyword in special_keywords):
-            # Get lines after keyword
-            for j in range(i, min(i+3, len(lines))):
-                spec_line = lines[j].strip()
-                if spec_line and len(spec_line) > 5:
-                    # Skip if it's another section header
-                    if any(skip in spec_line.lower() for skip in ['customer', 'service', 'appointment']):
-                        break
-                    # Clean up
-                    for keyword in special_keywords:
-                        spec_line = re.sub(rf'\b{keyword}s?\b[:\s]*', '', spec_line, flags=re.IGNORECASE)
-                    if spec_line.strip():
-                        special_lines.append(spec_line.strip())
+        lowered = line.lower()
+        tried = set()
+        
+        for keyword in FIELD_KEYWORDS.findall(lowered):
+            for spec in KEYWORD_FIELDS[keyword]:
+                if spec.field in found or spec.field in tried:
+                    continue
+                tried.add(spec.field)
+                
+                value = spec.extract(lines, i, lowered)
+                if value or spec.block:
+                    data[spec.field] = value
+                    found.add(spec.field)
+        
+        if len(found) == len(FIELD_SPECS):
             break
     
-    if special_lines:
-        data['special_requirements'] = ' '.join(special_lines)
-        print(f"✓ Special Requirements: {data['special_requirements'][:50]}...")
-    
-    # Debug: Print final extracted data
-    print("="*50)
-    print("EXTRACTION COMPLETE - FINAL DATA:")
-    for key, value in data.items():
-        if key != 'raw_text':
-            print(f"  {key}: {value}")
-    print("="*50)
-    
     return data
 
 
@@ -348,4 +363,101 @@ def validate_extracted_data(data):
     print(f"Valid: {is_valid}")
     print(f"{'='*50}\n")
     
-    return is_valid, confidence, all_messages
\ No newline at end of file
+    return is_valid, confidence, all_messages
+
+
+class OcrError(Exception):
+    """The screenshot could not be turned into usable text"""
+
+
+def run_ocr_pipeline(image_bytes, preprocessing=None):
+    """
+    Extract, parse and validate one screenshot. Touches no database, so it
+    can run in a worker process. Returns (data, timings): the parsed data
+    with is_valid/confidence/errors added, and milliseconds per stage.
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    raw_text = extract_text_from_image(BytesIO(image_bytes), preprocessing)
+    timings['extract_ms'] = int((time.perf_counter() - started) * 1000)
+
+    if not raw_text or len(raw_text) < 10:
+        raise OcrError('Could not extract text from image. Please ensure the image is clear and contains readable text.')
+
+    started = time.perf_counter()
+    data = parse_portal_collar_data(raw_text)
+    timings['parse_ms'] = int((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    is_valid, confidence, messages_list = validate_extracted_data(data)
+    timings['validate_ms'] = int((time.perf_counter() - started) * 1000)
+
+    data['is_valid'] = is_valid
+    data['confidence'] = confidence
+    data['errors'] = messages_list
+
+    return data, timings
+
+
+def run_ocr_job(image_bytes):
+    """
+    run_ocr_pipeline() for pool workers. Any other failure is re-raised as
+    an OcrError holding only strings (traceback in `detail`): an exception
+    the parent can't unpickle, such as pytesseract.TesseractNotFoundError,
+    would otherwise break the whole pool.
+    """
+    try:
+        return run_ocr_pipeline(image_bytes)
+    except OcrError:
+        raise
+    except Exception as e:
+        error = OcrError(f'OCR Error: {e}')
+        error.detail = traceback.format_exc()
+        raise error from None
+
+
+def run_ocr_file(path):
+    """run_ocr_job() on an image file, for pool workers handed a path"""
+    with open(path, 'rb') as f:
+        return run_ocr_job(f.read())
+
+
+def quiet_worker():
+    """Pool initializer: drop the per-image debug prints in worker processes"""
+    sys.stdout = open(os.devnull, 'w')
+
+
+def image_cache_key(image_bytes, preprocessing=None):
+    """
+    SHA-256 of what OCR would see: the decoded pixels (so a re-saved copy
+    with different metadata still matches) and the DPI preprocessing reads,
+    salted with the preprocessing signature, TESSERACT_CONFIG and
+    OCR_RESULT_VERSION. '' if the image can't be decoded; the pipeline
+    reports that.
+    """
+    try:
+        img = Image.open(BytesIO(image_bytes))
+        dpi = img.info.get('dpi')
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        pixels = img.tobytes()
+    except Exception:
+        return ''
+
+    salt = '|'.join([
+        str(OCR_RESULT_VERSION),
+        preprocessing_signature(preprocessing_config(preprocessing)),
+        TESSERACT_CONFIG,
+        f'{img.width}x{img.height}',
+        str(dpi),
+    ])
+    digest = hashlib.sha256(salt.encode())
+    digest.update(pixels)
+    return digest.hexdigest()
+
+
+def file_cache_key(path):
+    """image_cache_key() of an image file, for pool workers handed a path"""
+    with open(path, 'rb') as f:
+        return image_cache_key(f.read())
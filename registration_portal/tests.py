@@ -1,3 +1,95 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import count
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from . import ocr_cache
+from .models import OcrCacheEntry
+from .ocr_utils import parse_portal_collar_data
+
+
+GOLDEN_FILE = Path(__file__).resolve().parent / 'ocr_corpus' / 'parse_golden.jsonl'
+
+
+class ParsePortalCollarDataGoldenTests(SimpleTestCase):
+    """
+    parse_portal_collar_data against the bundled OCR text corpus.
+    After an intended parser change, regenerate the expectations with
+    `manage.py ocr_parse_benchmark --update` and review the diff.
+    """
+
+    def test_golden_corpus(self):
+        lines = GOLDEN_FILE.read_text(encoding='utf-8').splitlines()
+        cases = [json.loads(line) for line in lines if line.strip()]
+        self.assertTrue(cases, f'No cases in {GOLDEN_FILE}')
+
+        for number, case in enumerate(cases, 1):
+            with self.subTest(case=number):
+                parsed = parse_portal_collar_data(case['text'])
+                self.assertEqual(parsed.pop('raw_text'), case['text'])
+                self.assertEqual(parsed, case['expected'])
+
+
+class OcrCacheTests(TestCase):
+    def setUp(self):
+        # A clock that moves one second per call, so LRU order is unambiguous
+        start = datetime(2026, 3, 9, 9, tzinfo=dt_timezone.utc)
+        ticks = count()
+        patcher = mock.patch(
+            'registration_portal.ocr_cache.timezone.now',
+            side_effect=lambda: start + timedelta(seconds=next(ticks)),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        size = mock.patch.object(ocr_cache, 'OCR_CACHE_SIZE', 3)
+        size.start()
+        self.addCleanup(size.stop)
+
+    def keys(self):
+        return set(OcrCacheEntry.objects.values_list('key', flat=True))
+
+    def test_least_recently_used_are_evicted_first(self):
+        for key in 'abc':
+            ocr_cache.store_result(key, {'name': key})
+
+        # A hit makes 'a' the most recently used
+        self.assertEqual(ocr_cache.get_cached_result('a'), {'name': 'a'})
+        ocr_cache.store_result('d', {'name': 'd'})
+        self.assertEqual(self.keys(), {'a', 'c', 'd'})
+
+        ocr_cache.store_results([('e', {'name': 'e'}), ('f', {'name': 'f'})])
+        self.assertEqual(self.keys(), {'d', 'e', 'f'})
+        self.assertIsNone(ocr_cache.get_cached_result('a'))
+
+    def test_hit_refreshes_last_used_and_counts(self):
+        ocr_cache.store_result('a', {'name': 'a'})
+        stored = OcrCacheEntry.objects.get(key='a')
+
+        ocr_cache.get_cached_results(['a', 'missing', ''])
+
+        hit = OcrCacheEntry.objects.get(key='a')
+        self.assertGreater(hit.last_used_at, stored.last_used_at)
+        self.assertEqual(hit.hits, stored.hits + 1)
+
+    def test_storing_a_key_again_replaces_it_in_place(self):
+        ocr_cache.store_result('a', {'name': 'old'})
+        ocr_cache.store_result('b', {'name': 'b'})
+        ocr_cache.store_result('a', {'name': 'new'})
+        ocr_cache.store_results([('c', {'name': 'first'}), ('c', {'name': 'last'})])
+
+        self.assertEqual(OcrCacheEntry.objects.count(), 3)
+        self.assertEqual(ocr_cache.get_cached_results(['a', 'c']), {'a': {'name': 'new'}, 'c': {'name': 'last'}})
+
+        # The upsert also counts as a use: 'b' is now the oldest
+        ocr_cache.store_result('d', {'name': 'd'})
+        self.assertEqual(self.keys(), {'a', 'c', 'd'})
+
+    def test_size_zero_turns_caching_off(self):
+        with mock.patch.object(ocr_cache, 'OCR_CACHE_SIZE', 0):
+            ocr_cache.store_result('a', {'name': 'a'})
+            self.assertIsNone(ocr_cache.get_cached_result('a'))
+        self.assertFalse(OcrCacheEntry.objects.exists())
@@ -37,6 +37,9 @@ urlpatterns = [
     # OCR Screenshot Upload
     path('upload-screenshot/', views.upload_screenshot, name='upload_screenshot'),
     path('review-ocr/', views.review_ocr_data, name='review_ocr_data'),
+    path('ocr-jobs/<uuid:job_id>/status/', views.ocr_job_status, name='ocr_job_status'),
+    path('ocr-queue/', views.ocr_review_queue, name='ocr_review_queue'),
+    path('ocr-queue/<uuid:job_id>/', views.ocr_review_draft, name='ocr_review_draft'),
     
     # Manager Arrivals
     path('manager/arrivals/', views.manager_arrivals, name='manager_arrivals'),
@@ -4,7 +4,9 @@ import re
 from django.contrib import messages
 from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 
 from accounts.models import User
@@ -14,7 +16,9 @@ from task_management.models import (
     TaskPackage, Task, ComboPackageOwnership, PendingBooking
 )
 
-from .models import RegistrationSession
+from task_management.utils.package_builder import PackageBuilder
+
+from .models import OcrJob, RegistrationSession
 
 
 # ============================================
@@ -119,6 +123,8 @@ def dashboard(request):
         created_by=request.registration_user
     ).count()
     
+    ocr_drafts_count = _review_queue(request.registration_user).count()
+    
     session_id = request.session.get('registration_session_id')
     session_stats = {
         'customers_registered': 0,
@@ -156,6 +162,7 @@ def dashboard(request):
         'today_cats': today_cats,
         'today_requests': today_packages,
         'pending_bookings_count': pending_bookings_count,
+        'ocr_drafts_count': ocr_drafts_count,
         'session': session_stats,
         'recent_customers': recent_customers,
         'recent_requests': recent_packages,
@@ -408,43 +415,40 @@ def create_service_request(request, customer_id=None):
                 
                 # ============ NEW BOOKING - KEY DECISION POINT ============
                 else:
-                    for cat in cats:
-                        task_types = TaskType.objects.filter(id__in=selected_tasks)
-                        package_points = sum(tt.points for tt in task_types)
-                        
-                        is_combo_front = any('Combo Front' in tt.name for tt in task_types)
-                        
-                        # ========================================
-                        # FIXED LOGIC: Check payment_proof first
-                        # ========================================
+                    task_types = list(TaskType.objects.filter(id__in=selected_tasks))
+                    package_points = sum(tt.points for tt in task_types)
+                    
+                    is_combo_front = any('Combo Front' in tt.name for tt in task_types)
+                    
+                    scheduled_date = preferred_date if preferred_date else timezone.now().date()
+                    scheduled_time = preferred_time if preferred_time else '09:00'
+                    
+                    # ========================================
+                    # FIXED LOGIC: Check payment_proof first
+                    # ========================================
+                    
+                    if payment_proof:
+                        # ✅ HAS PAYMENT PROOF → Create TaskPackages + Award Points NOW
                         
-                        if payment_proof:
-                            # ✅ HAS PAYMENT PROOF → Create TaskPackage + Award Points NOW
-                            
-                            task_package = TaskPackage.objects.create(
-                                cat=cat,
+                        # One bulk write for every cat's package and tasks
+                        builder = PackageBuilder()
+                        for cat in cats:
+                            task_package = builder.add_package(
+                                cat,
                                 created_by=request.registration_user,
                                 status='pending',
                                 notes=notes or f'Service request for {cat.name}',
                                 branch=request.registration_user.branch,
                                 booking_type='type_a',  # Type A: Got proof
                                 payment_proof=payment_proof,
-                                scheduled_date=preferred_date if preferred_date else timezone.now().date(),
+                                scheduled_date=scheduled_date,
                                 arrival_status='arrived',  # Already confirmed
                                 points_awarded=False,  # Will be set to True below
-                                total_points=package_points,
                             )
-                            
-                            # Create tasks
-                            for task_type in task_types:
-                                Task.objects.create(
-                                    package=task_package,
-                                    task_type=task_type,
-                                    points=task_type.points,
-                                    scheduled_date=preferred_date if preferred_date else timezone.now().date(),
-                                    scheduled_time=preferred_time if preferred_time else '09:00',
-                                    status='pending',
-                                )
+                            builder.add_tasks(task_package, task_types, scheduled_date, scheduled_time)
+                        
+                        for task_package in builder.save():
+                            cat = task_package.cat
                             
                             # ✅ AWARD POINTS IMMEDIATELY
                             success = task_package.award_points_immediately()
@@ -484,16 +488,17 @@ def create_service_request(request, customer_id=None):
                                     request,
                                     f'⚠️ {task_package.package_id} created but points not awarded'
                                 )
-                        
-                        else:
+                    
+                    else:
+                        for cat in cats:
                             # ❌ NO PAYMENT PROOF → Create PendingBooking
                             # This will appear on the pending bookings page
                             
-                            pending_booking = PendingBooking.objects.create(
+                            pending_booking = PendingBooking(
                                 customer=customer,
                                 cat=cat,
-                                scheduled_date=preferred_date if preferred_date else timezone.now().date(),
-                                scheduled_time=preferred_time if preferred_time else '09:00',
+                                scheduled_date=scheduled_date,
+                                scheduled_time=scheduled_time,
                                 notes=notes or f'Pending booking for {cat.name}',
                                 created_by=request.registration_user,
                                 branch=request.registration_user.branch,
@@ -871,7 +876,7 @@ def confirm_pending_booking(request, booking_id):
 # ============================================
 
 try:
-    from .ocr_utils import extract_text_from_image, parse_portal_collar_data, validate_extracted_data
+    from .ocr_jobs import submit_ocr_job
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
@@ -893,66 +898,17 @@ def upload_screenshot(request):
             messages.error(request, '❌ Invalid file type. Please upload an image (PNG, JPG, etc.)')
             return redirect('registration_portal:upload_screenshot')
         
-        try:
-            # Extract text from image
-            print(f"DEBUG: Starting OCR processing for {screenshot.name}")
-            raw_text = extract_text_from_image(screenshot)
-            
-            if not raw_text or len(raw_text) < 10:
-                messages.error(request, '❌ Could not extract text from image. Please ensure the image is clear and contains readable text.')
-                return redirect('registration_portal:upload_screenshot')
-            
-            print(f"DEBUG: Raw text extracted, length: {len(raw_text)}")
-            
-            # Parse the extracted text
-            data = parse_portal_collar_data(raw_text)
-            
-            print(f"DEBUG: Data parsed, keys: {list(data.keys())}")
-            
-            # Validate the data
-            is_valid, confidence, messages_list = validate_extracted_data(data)
-            
-            # Add validation results to data
-            data['is_valid'] = is_valid
-            data['confidence'] = confidence
-            data['errors'] = messages_list
-            
-            print(f"DEBUG: Validation complete - Valid: {is_valid}, Confidence: {confidence:.1%}")
-            
-            # Save to session - FORCE SAVE
-            request.session['ocr_data'] = data
-            request.session.modified = True
-            
-            print(f"✓ Session data saved with {len(data)} fields")
-            print(f"✓ Session key: {request.session.session_key}")
-            
-            # Verify session was saved
-            saved_data = request.session.get('ocr_data')
-            if not saved_data:
-                print("✗ ERROR: Session data not saved!")
-                messages.error(request, '❌ Failed to save OCR data to session')
-                return redirect('registration_portal:upload_screenshot')
-            
-            print(f"✓ Verified: Session contains {len(saved_data)} fields")
-            
-            messages.success(request, f'✅ OCR Complete! Extracted {confidence:.0%} of data. Please review below.')
-            return redirect('registration_portal:review_ocr_data')
-        
-        except KeyError as e:
-            # THIS IS THE ERROR YOU'RE GETTING
-            print(f"✗ KeyError: Missing key '{e}' in data dictionary")
-            print(f"✗ Available keys: {list(data.keys()) if 'data' in locals() else 'data not created'}")
-            import traceback
-            print(traceback.format_exc())
-            messages.error(request, f'❌ OCR Error: Missing expected field "{e}". Please try a different screenshot.')
+        if not OCR_AVAILABLE:
+            messages.error(request, '❌ OCR is not available on this server')
             return redirect('registration_portal:upload_screenshot')
         
-        except Exception as e:
-            print(f"✗ OCR Error: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            messages.error(request, f'❌ OCR Error: {str(e)}')
-            return redirect('registration_portal:upload_screenshot')
+        # OCR runs in the worker pool; the review page waits for it
+        job = submit_ocr_job(screenshot, request.registration_user)
+        
+        request.session['ocr_job_id'] = str(job.job_id)
+        request.session.pop('ocr_data', None)
+        
+        return redirect('registration_portal:review_ocr_data')
     
     # GET request - show upload form
     context = {
@@ -960,11 +916,70 @@ def upload_screenshot(request):
     }
     
     return render(request, 'registration_portal/upload_screenshot.html', context)
+def _hold_ocr_review(request):
+    """
+    Refresh the review claim on the draft in the session (if it came from
+    an OcrJob). False, with the draft dropped from the session, when
+    someone else took it over.
+    """
+    job_id = request.session.get('ocr_review_job_id')
+    if not job_id:
+        return True
+    
+    job = OcrJob.objects.defer('image', 'result').filter(job_id=job_id).first()
+    if job is None or job.claim_review(request.registration_user):
+        return True
+    
+    request.session.pop('ocr_review_job_id', None)
+    request.session.pop('ocr_data', None)
+    messages.warning(request, '⚠️ This draft was reviewed or taken over by someone else')
+    return False
+
+
+def _finish_ocr_review(request, review_status):
+    """Take the draft being reviewed (if it came from an OcrJob) out of the review queue"""
+    job_id = request.session.pop('ocr_review_job_id', None)
+    if job_id:
+        job = OcrJob.objects.defer('image', 'result').filter(job_id=job_id).first()
+        if job:
+            job.mark_reviewed(request.registration_user, review_status)
+
+
 @registration_login_required
 def review_ocr_data(request):
     """Review OCR data and create customer + cat"""
     
     ocr_data = request.session.get('ocr_data')
+    job_id = request.session.get('ocr_job_id')
+    
+    # Screenshot uploaded but not picked up from its OCR job yet
+    if not ocr_data and job_id:
+        job = OcrJob.objects.defer('image').filter(
+            job_id=job_id,
+            uploaded_by=request.registration_user,
+        ).first()
+        
+        if job is None:
+            request.session.pop('ocr_job_id', None)
+        elif job.status == 'failed':
+            request.session.pop('ocr_job_id', None)
+            messages.error(request, f'❌ {job.message}')
+            return redirect('registration_portal:upload_screenshot')
+        elif job.status != 'done':
+            return render(request, 'registration_portal/review_ocr_data.html', {
+                'user': request.registration_user,
+                'processing': True,
+                'job': job,
+            })
+        else:
+            request.session.pop('ocr_job_id', None)
+            if not job.claim_review(request.registration_user):
+                messages.warning(request, '⚠️ This draft was reviewed or taken over by someone else')
+                return redirect('registration_portal:ocr_review_queue')
+            ocr_data = job.result
+            request.session['ocr_data'] = ocr_data
+            request.session['ocr_review_job_id'] = str(job.job_id)
+            messages.success(request, f'✅ OCR Complete! Extracted {job.confidence:.0%} of data. Please review below.')
     
     if not ocr_data:
         messages.warning(request, '⚠️ No OCR data found. Please upload a screenshot first.')
@@ -985,8 +1000,12 @@ def review_ocr_data(request):
         print(f"DEBUG: POST received, action={action}")
         print(f"DEBUG: All POST keys: {list(request.POST.keys())}")
         
+        if not _hold_ocr_review(request):
+            return redirect('registration_portal:ocr_review_queue')
+        
         if action == 'cancel':
             request.session.pop('ocr_data', None)
+            _finish_ocr_review(request, 'discarded')
             messages.info(request, 'OCR data discarded')
             return redirect('registration_portal:upload_screenshot')
         
@@ -1120,6 +1139,7 @@ def review_ocr_data(request):
                     
                     # Clear OCR data from session
                     request.session.pop('ocr_data', None)
+                    _finish_ocr_review(request, 'confirmed')
                     
                     messages.success(
                         request,
@@ -1156,4 +1176,81 @@ def review_ocr_data(request):
         'ocr_data': ocr_data,
     }
     
-    return render(request, 'registration_portal/review_ocr_data.html', context)
\ No newline at end of file
+    return render(request, 'registration_portal/review_ocr_data.html', context)
+
+
+@registration_login_required
+def ocr_job_status(request, job_id):
+    """JSON status of an uploaded screenshot's OCR job (polled by the review page)"""
+    job = OcrJob.objects.defer('image', 'result').filter(
+        job_id=job_id,
+        uploaded_by=request.registration_user,
+    ).first()
+    
+    if job is None:
+        return JsonResponse({'error': 'OCR job not found'}, status=404)
+    
+    return JsonResponse({
+        'job_id': str(job.job_id),
+        'status': job.status,
+        'finished': job.is_finished,
+        'message': job.message,
+        'confidence': job.confidence,
+        'is_valid': job.is_valid,
+        'timings_ms': {
+            'queue': job.queue_ms,
+            'extract': job.extract_ms,
+            'parse': job.parse_ms,
+            'validate': job.validate_ms,
+        },
+        'review_url': reverse('registration_portal:review_ocr_data'),
+    })
+
+
+def _review_queue(user):
+    """Finished OCR drafts awaiting review for the user's branch (unassigned ones too)"""
+    drafts = OcrJob.objects.filter(OcrJob.claimable_by(user), status='done', review_status='pending')
+    if user.role != 'admin':
+        drafts = drafts.filter(Q(branch=user.branch) | Q(branch=''))
+    return drafts
+
+
+@registration_login_required
+def ocr_review_queue(request):
+    """OCR drafts (uploads and batch ingests) waiting for staff to confirm"""
+    
+    drafts = _review_queue(request.registration_user).defer('image').select_related('uploaded_by').order_by(
+        '-is_valid', '-confidence', 'created_at'
+    )
+    
+    context = {
+        'user': request.registration_user,
+        'drafts': drafts[:200],
+        'draft_count': drafts.count(),
+    }
+    
+    return render(request, 'registration_portal/ocr_review_queue.html', context)
+
+
+@registration_login_required
+def ocr_review_draft(request, job_id):
+    """Open a queued OCR draft in the review form"""
+    
+    job = _review_queue(request.registration_user).defer('image').filter(job_id=job_id).first()
+    if job is None or not job.claim_review(request.registration_user):
+        messages.warning(request, '⚠️ This draft was already reviewed or is not in your queue')
+        return redirect('registration_portal:ocr_review_queue')
+    
+    # Switching drafts hands the previous one back to the queue
+    previous = request.session.get('ocr_review_job_id')
+    if previous and previous != str(job.job_id):
+        OcrJob.objects.filter(job_id=previous, reviewing_by=request.registration_user).update(
+            reviewing_by=None,
+            review_claimed_at=None,
+        )
+    
+    request.session['ocr_data'] = job.result
+    request.session['ocr_review_job_id'] = str(job.job_id)
+    request.session.pop('ocr_job_id', None)
+    
+    return redirect('registration_portal:review_ocr_data')
@@ -0,0 +1,140 @@
+# schedule/bulk.py
+"""
+Bulk schedule creation.
+
+bulk_schedule() takes the cells (staff x date x shift) a bulk form asks
+for, loads the existing schedules and approved leave for the whole range
+once, resolves conflicts in memory against a set of (staff_id, date), and
+inserts what's left with one bulk_create(ignore_conflicts=True). The
+result says, per cell, whether it was created or why it was skipped.
+"""
+
+from collections import Counter, namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .leave_index import LeaveIndex
+from .models import Schedule
+
+
+ScheduleCell = namedtuple(
+    'ScheduleCell',
+    ['staff_id', 'date', 'shift_type', 'start_time', 'end_time', 'branch', 'notes'],
+    defaults=[''],
+)
+
+SKIP_REASONS = {
+    'duplicate': 'Requested more than once',
+    'scheduled': 'Already scheduled',
+    'leave': 'On approved leave',
+    'missing_times': 'Working shift without start/end time',
+    'conflict': 'Scheduled by someone else meanwhile',
+}
+
+
+class BulkResult:
+    """Created cells and (cell, reason) pairs for skipped ones"""
+
+    def __init__(self):
+        self.created = []
+        self.skipped = []
+
+    @property
+    def created_count(self):
+        return len(self.created)
+
+    def skip(self, cell, reason):
+        self.skipped.append((cell, reason))
+
+    def skipped_summary(self):
+        """{reason label: count}, most common first"""
+        counts = Counter(reason for _, reason in self.skipped)
+        return {SKIP_REASONS[reason]: count for reason, count in counts.most_common()}
+
+
+def load_conflicts(staff_ids, start, end):
+    """
+    (set of (staff_id, date) already scheduled, LeaveIndex of approved leave)
+    for the range, in two queries.
+    """
+    scheduled = set(
+        Schedule.objects.filter(
+            staff_id__in=staff_ids,
+            date__range=[start, end],
+        ).values_list('staff_id', 'date')
+    )
+
+    return scheduled, LeaveIndex.load(start, end, staff=staff_ids)
+
+
+def bulk_schedule(cells, creator):
+    """Create schedules for `cells` (ScheduleCell) and return a BulkResult"""
+    cells = list(cells)
+    result = BulkResult()
+    if not cells:
+        return result
+
+    staff_ids = {cell.staff_id for cell in cells}
+    start = min(cell.date for cell in cells)
+    end = max(cell.date for cell in cells)
+
+    scheduled, leave_index = load_conflicts(staff_ids, start, end)
+
+    planned = set()
+    to_create = []
+    for cell in cells:
+        key = (cell.staff_id, cell.date)
+        if key in planned:
+            result.skip(cell, 'duplicate')
+        elif key in scheduled:
+            result.skip(cell, 'scheduled')
+        elif leave_index.covers(cell.staff_id, cell.date):
+            result.skip(cell, 'leave')
+        elif cell.shift_type != 'off' and not (cell.start_time and cell.end_time):
+            result.skip(cell, 'missing_times')
+        else:
+            if cell.shift_type == 'off':
+                cell = cell._replace(start_time=None, end_time=None)
+            to_create.append(cell)
+            planned.add(key)
+
+    if not to_create:
+        return result
+
+    started = timezone.now()
+    with transaction.atomic():
+        Schedule.objects.bulk_create(
+            [
+                Schedule(
+                    staff_id=cell.staff_id,
+                    date=cell.date,
+                    shift_type=cell.shift_type,
+                    start_time=cell.start_time,
+                    end_time=cell.end_time,
+                    branch=cell.branch,
+                    notes=cell.notes,
+                    created_by=creator,
+                )
+                for cell in to_create
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+    # ignore_conflicts doesn't say which rows lost a race; read back ours
+    inserted = set(
+        Schedule.objects.filter(
+            staff_id__in=staff_ids,
+            date__range=[start, end],
+            created_by=creator,
+            created_at__gte=started,
+        ).values_list('staff_id', 'date')
+    )
+    for cell in to_create:
+        if (cell.staff_id, cell.date) in inserted:
+            result.created.append(cell)
+        else:
+            result.skip(cell, 'conflict')
+
+    return result
@@ -3,9 +3,10 @@
 
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Schedule, LeaveRequest, ShiftSwapRequest
+from .models import Schedule, LeaveRequest, ShiftSwapRequest, RosterTemplate
 from accounts.models import User
 from datetime import datetime, timedelta
+from .roster_templates import MAX_TEMPLATE_WEEKS
 
 class ScheduleForm(forms.ModelForm):
     """Form for creating/editing single schedule"""
@@ -289,4 +290,67 @@ class ShiftSwapRequestForm(forms.ModelForm):
             self.fields['counterpart_schedule'].queryset = Schedule.objects.filter(
                 date=requester_schedule.date,
                 branch=user.branch
-            ).exclude(staff=user).exclude(shift_type='off')
\ No newline at end of file
+            ).exclude(staff=user).exclude(shift_type='off')
+
+class RosterTemplateCaptureForm(forms.Form):
+    """Save existing weeks of a branch's schedule as a roster template"""
+    
+    name = forms.CharField(
+        max_length=100,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g. Standard 2-week rota'})
+    )
+    branch = forms.ChoiceField(
+        choices=User.BRANCH_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    source_start = forms.DateField(
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        help_text="First week to copy (its Monday is used)"
+    )
+    weeks = forms.IntegerField(
+        min_value=1,
+        max_value=MAX_TEMPLATE_WEEKS,
+        initial=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+        help_text="Number of weeks in the repeating cycle"
+    )
+    notes = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 2})
+    )
+
+
+class RosterTemplateProjectForm(forms.Form):
+    """Roll roster templates forward over a date range"""
+    
+    templates = forms.ModelMultipleChoiceField(
+        queryset=None,
+        widget=forms.CheckboxSelectMultiple(attrs={'class': 'template-checkbox'}),
+        help_text="Templates to apply"
+    )
+    start_date = forms.DateField(
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    end_date = forms.DateField(
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    cycle_start = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        help_text="Week that counts as week 1 of the cycle (default: start date)"
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['templates'].queryset = RosterTemplate.objects.filter(is_active=True)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start_date')
+        end = cleaned_data.get('end_date')
+        if start and end:
+            if end < start:
+                raise ValidationError("End date cannot be before start date.")
+            if (end - start).days > 366:
+                raise ValidationError("Project at most one year at a time.")
+        return cleaned_data
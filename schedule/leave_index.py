@@ -0,0 +1,112 @@
+# schedule/leave_index.py
+"""
+Leave coverage for a date window, loaded once per request.
+
+LeaveIndex.load() pulls every leave overlapping the window in one query
+and keeps two structures:
+
+- per staff, the leave intervals sorted and merged, so covers() is a
+  bisect instead of a scan over every leave;
+- a (staff_id, date) -> LeaveRequest map over the window, built by
+  expanding each leave once (the most recently created leave wins where
+  two overlap), so leave_on() is a dict lookup.
+
+Calendar views, Schedule.clean() and bulk_schedule() all go through it,
+so a month view costs one leave query and O(staff x days) work however
+many leaves there are.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+
+
+APPROVED_STATUSES = ('approved',)
+# What the calendars show: approved leave plus requests still in the workflow
+CALENDAR_STATUSES = ('pending_manager', 'manager_approved', 'approved')
+
+
+class LeaveIndex:
+    """Leave lookups for the window [start, end]"""
+
+    def __init__(self, leaves, start, end):
+        self.start = start
+        self.end = end
+
+        intervals = defaultdict(list)
+        self._by_day = {}
+
+        # Oldest first, so a newer overlapping leave overwrites the older one
+        for leave in sorted(leaves, key=lambda l: (l.created_at, l.pk or 0)):
+            intervals[leave.staff_id].append((leave.start_date, leave.end_date))
+
+            day = max(leave.start_date, start)
+            last = min(leave.end_date, end)
+            while day <= last:
+                self._by_day[(leave.staff_id, day)] = leave
+                day += timedelta(days=1)
+
+        self._starts = {}
+        self._ends = {}
+        for staff_id, spans in intervals.items():
+            starts, ends = [], []
+            for span_start, span_end in sorted(spans):
+                # Merge overlapping and back-to-back leaves
+                if ends and span_start <= ends[-1] + timedelta(days=1):
+                    ends[-1] = max(ends[-1], span_end)
+                else:
+                    starts.append(span_start)
+                    ends.append(span_end)
+            self._starts[staff_id] = starts
+            self._ends[staff_id] = ends
+
+    @classmethod
+    def load(cls, start, end, staff=None, branch=None, statuses=APPROVED_STATUSES):
+        """
+        Index the leaves with `statuses` overlapping [start, end]. `staff`
+        (ids or a User queryset) and `branch` narrow it down; one query.
+        """
+        from schedule.models import LeaveRequest
+
+        leaves = LeaveRequest.objects.filter(
+            status__in=statuses,
+            start_date__lte=end,
+            end_date__gte=start,
+        )
+        if staff is not None:
+            leaves = leaves.filter(staff__in=staff)
+        if branch is not None:
+            leaves = leaves.filter(staff__branch=branch)
+
+        return cls(leaves, start, end)
+
+    def covers(self, staff_id, day):
+        """Whether `staff_id` is on leave on `day`"""
+        starts = self._starts.get(staff_id)
+        if not starts:
+            return False
+        i = bisect_right(starts, day) - 1
+        return i >= 0 and day <= self._ends[staff_id][i]
+
+    def leave_on(self, staff_id, day):
+        """The LeaveRequest covering `day` for `staff_id` (within the window), or None"""
+        return self._by_day.get((staff_id, day))
+
+    def day_counts(self):
+        """{date: number of staff on leave} over the window, via a sweep over the merged intervals"""
+        deltas = defaultdict(int)
+        for staff_id, starts in self._starts.items():
+            for span_start, span_end in zip(starts, self._ends[staff_id]):
+                if span_end < self.start or span_start > self.end:
+                    continue
+                deltas[max(span_start, self.start)] += 1
+                deltas[min(span_end, self.end) + timedelta(days=1)] -= 1
+
+        counts = {}
+        running = 0
+        day = self.start
+        while day <= self.end:
+            running += deltas.get(day, 0)
+            counts[day] = running
+            day += timedelta(days=1)
+        return counts
@@ -0,0 +1,63 @@
+# schedule/management/commands/project_roster_templates.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schedule.models import RosterTemplate
+from schedule.roster_templates import project_templates
+
+
+class Command(BaseCommand):
+    help = 'Create schedules from active roster templates over a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start', help='First date to schedule (YYYY-MM-DD)')
+        parser.add_argument('end', help='Last date to schedule (YYYY-MM-DD)')
+        parser.add_argument(
+            '--branch',
+            action='append',
+            help='Only templates for this branch (repeatable; default: all branches)'
+        )
+        parser.add_argument(
+            '--template',
+            type=int,
+            action='append',
+            help='Only this template id (repeatable)'
+        )
+        parser.add_argument(
+            '--cycle-start',
+            help='Date in the week that counts as week 1 of each cycle (default: start)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date()
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date()
+            cycle_start = (
+                datetime.strptime(options['cycle_start'], '%Y-%m-%d').date()
+                if options['cycle_start'] else None
+            )
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        if end < start:
+            raise CommandError('End date cannot be before start date.')
+
+        templates = RosterTemplate.objects.filter(is_active=True)
+        if options['branch']:
+            templates = templates.filter(branch__in=options['branch'])
+        if options['template']:
+            templates = templates.filter(id__in=options['template'])
+
+        if not templates.exists():
+            self.stdout.write(self.style.WARNING('No matching active templates.'))
+            return
+
+        self.stdout.write(f"🗓️  Projecting {templates.count()} template(s) from {start} to {end}...")
+
+        result = project_templates(templates, start, end, creator=None, cycle_start=cycle_start)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {result.created_count} schedule(s) created'))
+        for reason, count in result.skipped_summary().items():
+            self.stdout.write(f'  ⏭️  {count} skipped: {reason}')
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('schedule', '0003_leaverequest_schedule_shiftswaprequest_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('branch', models.CharField(max_length=50)),
+                ('weeks', models.PositiveSmallIntegerField(default=1, help_text='Length of the repeating cycle in weeks')),
+                ('is_active', models.BooleanField(default=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='roster_templates_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['branch', 'name'],
+                'unique_together': {('branch', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RosterTemplateShift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.PositiveSmallIntegerField(help_text='Week within the cycle, starting at 0')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('shift_type', models.CharField(choices=[('morning', 'Morning'), ('afternoon', 'Afternoon'), ('evening', 'Evening'), ('night', 'Night'), ('full_day', 'Full Day'), ('off', 'OFF/Rest Day')], max_length=20)),
+                ('start_time', models.TimeField(blank=True, null=True)),
+                ('end_time', models.TimeField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_template_shifts', to=settings.AUTH_USER_MODEL)),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shifts', to='schedule.rostertemplate')),
+            ],
+            options={
+                'ordering': ['template', 'week', 'weekday', 'staff'],
+                'unique_together': {('template', 'staff', 'week', 'weekday')},
+            },
+        ),
+    ]
@@ -108,15 +108,10 @@ class Schedule(models.Model):
             )
         
         # Check if staff has approved leave on this date
-        from schedule.models import LeaveRequest
-        has_leave = LeaveRequest.objects.filter(
-            staff=self.staff,
-            start_date__lte=self.date,
-            end_date__gte=self.date,
-            status='approved'
-        ).exists()
+        from schedule.leave_index import LeaveIndex
+        leave_index = LeaveIndex.load(self.date, self.date, staff=[self.staff_id])
         
-        if has_leave:
+        if leave_index.covers(self.staff_id, self.date):
             raise ValidationError(
                 f"{self.staff.username} has approved leave on {self.date}. "
                 "Cannot create schedule."
@@ -414,4 +409,74 @@ class ShiftSwapRequest(models.Model):
     
     @property
     def is_pending(self):
-        return self.status in ['pending_counterpart', 'pending_manager']
\ No newline at end of file
+        return self.status in ['pending_counterpart', 'pending_manager']
+
+class RosterTemplate(models.Model):
+    """
+    A saved multi-week rota for one branch. Each RosterTemplateShift says
+    who works what in week N (of `weeks`) on a weekday; projecting the
+    template repeats that cycle over any date range.
+    """
+    
+    name = models.CharField(max_length=100)
+    branch = models.CharField(max_length=50)
+    weeks = models.PositiveSmallIntegerField(
+        default=1,
+        help_text="Length of the repeating cycle in weeks"
+    )
+    is_active = models.BooleanField(default=True)
+    notes = models.TextField(blank=True)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='roster_templates_created'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['branch', 'name']
+        unique_together = ['branch', 'name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.branch}, {self.weeks} week{'s' if self.weeks != 1 else ''})"
+
+
+class RosterTemplateShift(models.Model):
+    """One staff member's shift on one weekday of one week of a RosterTemplate"""
+    
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    
+    template = models.ForeignKey(
+        RosterTemplate,
+        on_delete=models.CASCADE,
+        related_name='shifts'
+    )
+    staff = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='roster_template_shifts'
+    )
+    week = models.PositiveSmallIntegerField(help_text="Week within the cycle, starting at 0")
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    shift_type = models.CharField(max_length=20, choices=Schedule.SHIFT_TYPE_CHOICES)
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['template', 'week', 'weekday', 'staff']
+        unique_together = ['template', 'staff', 'week', 'weekday']
+    
+    def __str__(self):
+        return f"{self.template.name} W{self.week + 1} {self.get_weekday_display()} - {self.staff.username}"
@@ -0,0 +1,199 @@
+# schedule/roster.py
+"""
+Schedule rosters for the PDF exports.
+
+load_roster() fetches the staff and the schedules for a date range in two
+queries and lays them out as staff x date rows in memory, so rendering a
+month for every branch never goes back to the database.
+
+schedule_fingerprint() summarises the schedules in a range with one
+aggregate query (per-branch max(updated_at) and row count), so any save,
+bulk insert or delete changes it in every process. Rendered PDFs are
+cached under a key built from it and the roster's staff list, so
+re-downloading an unchanged week skips WeasyPrint entirely.
+
+roster_payload() encodes a Roster as the compact matrix served by the
+roster API, and roster_etag() fingerprints it the same way so unchanged
+polls get a 304 before any schedule is loaded.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.db.models import Count, Max
+
+from accounts.models import User
+from .models import Schedule
+
+
+PDF_CACHE_TIMEOUT = 24 * 3600  # seconds
+
+
+class RosterRow:
+    """One staff member's schedules, one slot per roster date (None = not scheduled)"""
+
+    def __init__(self, staff, size):
+        self.staff = staff
+        self.days = [None] * size
+
+    @property
+    def schedules(self):
+        return [schedule for schedule in self.days if schedule is not None]
+
+
+class Roster:
+    """Rows of staff x dates for [start, end], grouped by the staff member's branch"""
+
+    def __init__(self, start, end, staff, schedules):
+        self.start = start
+        self.end = end
+        self.dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+        self.rows = [RosterRow(member, len(self.dates)) for member in staff]
+        by_key = {(row.staff.branch, row.staff.id): row for row in self.rows}
+
+        # A schedule shows on the row of its staff member's home branch only
+        for schedule in schedules:
+            row = by_key.get((schedule.branch, schedule.staff_id))
+            if row is None:
+                continue
+            schedule.staff = row.staff  # avoid a lazy load per schedule
+            row.days[(schedule.date - start).days] = schedule
+
+    @property
+    def branches(self):
+        """Branch codes in BRANCH_CHOICES order, then any others alphabetically"""
+        present = {row.staff.branch for row in self.rows}
+        ordered = [code for code, _ in User.BRANCH_CHOICES if code in present]
+        return ordered + sorted(present - set(ordered))
+
+    def rows_for(self, branch):
+        return [row for row in self.rows if row.staff.branch == branch]
+
+    def staff_schedules(self, branch=None):
+        """{staff: [schedules]} in username order, as the PDF templates expect"""
+        rows = self.rows if branch is None else self.rows_for(branch)
+        return {row.staff: row.schedules for row in rows}
+
+
+def load_roster_staff(branches=None, roles=('staff', 'manager')):
+    """Active staff with `roles` in `branches` (None = every branch), by username"""
+    staff = User.objects.filter(role__in=roles, is_active=True).exclude(branch__isnull=True).exclude(branch='')
+    if branches is not None:
+        staff = staff.filter(branch__in=branches)
+    return list(staff.order_by('username'))
+
+
+def roster_schedules(start, end, branches=None):
+    schedules = Schedule.objects.filter(date__range=[start, end])
+    if branches is not None:
+        schedules = schedules.filter(branch__in=branches)
+    return schedules.order_by('date')
+
+
+def schedule_fingerprint(start, end, branches=None):
+    """
+    'branch:max updated_at:count' per branch for the schedules in
+    [start, end]. Changes when one is saved (max updated_at) or deleted
+    (count); one aggregate query.
+    """
+    stats = (
+        roster_schedules(start, end, branches)
+        .order_by()
+        .values('branch')
+        .annotate(last_change=Max('updated_at'), total=Count('id'))
+        .order_by('branch')
+    )
+    return [f"{row['branch']}:{row['last_change'].isoformat()}:{row['total']}" for row in stats]
+
+
+def load_roster(start, end, branches=None, roles=('staff', 'manager')):
+    """
+    Active staff with `roles` in `branches` (None = every branch) and their
+    schedules between start and end, in two queries.
+    """
+    staff = load_roster_staff(branches, roles)
+    return Roster(start, end, staff, list(roster_schedules(start, end, branches)))
+
+
+# ============================================
+# ROSTER API
+# ============================================
+
+# 0 = not scheduled, then SHIFT_TYPE_CHOICES order
+SHIFT_CODES = [None] + [code for code, _ in Schedule.SHIFT_TYPE_CHOICES]
+_SHIFT_INDEX = {code: i for i, code in enumerate(SHIFT_CODES) if code}
+
+
+def roster_etag(start, end, branches, staff):
+    """
+    Weak ETag for the roster of `staff` over [start, end]. Changes with
+    schedule_fingerprint() or the staff list.
+    """
+    digest = hashlib.sha256(f'{start}|{end}|'.encode())
+    for part in schedule_fingerprint(start, end, branches):
+        digest.update(f'{part}|'.encode())
+    for member in staff:
+        digest.update(f'{member.id}:{member.username}:{member.get_full_name()}:{member.branch}|'.encode())
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def _hhmm(value):
+    return value.strftime('%H:%M') if value else None
+
+
+def roster_payload(roster):
+    """
+    The roster as index-based arrays:
+
+    - staff:  [[id, username, full name, branch, role], ...] (row index)
+    - dates:  ISO dates (column index)
+    - shift_codes: code for each value in `matrix`, 0 = not scheduled
+    - matrix: one list of shift codes per staff row
+    - shifts: [[row, column, schedule id, start, end, notes], ...]
+    """
+    matrix = []
+    shifts = []
+    for row_index, row in enumerate(roster.rows):
+        codes = [0] * len(roster.dates)
+        for column, schedule in enumerate(row.days):
+            if schedule is None:
+                continue
+            codes[column] = _SHIFT_INDEX.get(schedule.shift_type, 0)
+            shifts.append([
+                row_index, column, schedule.id,
+                _hhmm(schedule.start_time), _hhmm(schedule.end_time), schedule.notes,
+            ])
+        matrix.append(codes)
+
+    return {
+        'start': roster.start.isoformat(),
+        'end': roster.end.isoformat(),
+        'staff': [
+            [row.staff.id, row.staff.username, row.staff.get_full_name(), row.staff.branch, row.staff.role]
+            for row in roster.rows
+        ],
+        'dates': [day.isoformat() for day in roster.dates],
+        'shift_codes': SHIFT_CODES,
+        'matrix': matrix,
+        'shifts': shifts,
+    }
+
+
+# ============================================
+# PDF CACHE
+# ============================================
+
+def roster_cache_key(roster, *parts):
+    """Cache key for a rendered export of `roster` (plus any distinguishing `parts`)"""
+    digest = hashlib.sha256()
+    for part in (roster.start, roster.end, *parts):
+        digest.update(f'{part}|'.encode())
+    # From the database, so a save in any process (web worker, export
+    # worker) changes the key everywhere
+    for part in schedule_fingerprint(roster.start, roster.end, roster.branches):
+        digest.update(f'{part}|'.encode())
+    for row in roster.rows:
+        staff = row.staff
+        digest.update(f'{staff.id}:{staff.username}:{staff.get_full_name()}:{staff.role}|'.encode())
+    return f'schedule:pdf:{digest.hexdigest()}'
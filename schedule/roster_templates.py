@@ -0,0 +1,98 @@
+# schedule/roster_templates.py
+"""
+Recurring roster templates.
+
+capture_template() saves N existing weeks of a branch's schedule as a
+RosterTemplate. project_templates() repeats one or more templates over a
+date range: every week is expanded in memory and handed to
+bulk_schedule(), which drops cells on leave or already scheduled and
+writes the rest in one bulk insert.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+
+from .bulk import ScheduleCell, bulk_schedule
+from .models import RosterTemplate, RosterTemplateShift, Schedule
+
+
+MAX_TEMPLATE_WEEKS = 12
+
+
+def week_start(day):
+    """Monday of the week containing `day`"""
+    return day - timedelta(days=day.weekday())
+
+
+@transaction.atomic
+def capture_template(name, branch, source_start, weeks, creator, notes=''):
+    """
+    Save `weeks` weeks of `branch`'s schedule (from the Monday of
+    source_start) as a template, replacing any template with that name.
+    """
+    source_start = week_start(source_start)
+    source_end = source_start + timedelta(days=weeks * 7 - 1)
+
+    template, _ = RosterTemplate.objects.update_or_create(
+        branch=branch,
+        name=name,
+        defaults={'weeks': weeks, 'notes': notes, 'is_active': True, 'created_by': creator},
+    )
+    template.shifts.all().delete()
+
+    shifts = [
+        RosterTemplateShift(
+            template=template,
+            staff_id=staff_id,
+            week=(day - source_start).days // 7,
+            weekday=day.weekday(),
+            shift_type=shift_type,
+            start_time=start_time,
+            end_time=end_time,
+            notes=schedule_notes,
+        )
+        for staff_id, day, shift_type, start_time, end_time, schedule_notes in Schedule.objects.filter(
+            branch=branch,
+            date__range=[source_start, source_end],
+        ).values_list('staff_id', 'date', 'shift_type', 'start_time', 'end_time', 'notes')
+    ]
+    RosterTemplateShift.objects.bulk_create(shifts, batch_size=500)
+
+    return template, len(shifts)
+
+
+def expand_templates(templates, start_date, end_date, cycle_start=None):
+    """
+    Yield a ScheduleCell for every template shift falling in
+    [start_date, end_date]. Week 0 of each cycle is the week of
+    `cycle_start` (default: start_date).
+    """
+    cycle_start = week_start(cycle_start or start_date)
+
+    for template in templates:
+        # (week, weekday) -> shifts, so each day is one dict lookup
+        by_slot = {}
+        for shift in template.shifts.all():
+            by_slot.setdefault((shift.week, shift.weekday), []).append(shift)
+
+        day = start_date
+        while day <= end_date:
+            week = ((day - cycle_start).days // 7) % template.weeks
+            for shift in by_slot.get((week, day.weekday()), ()):
+                yield ScheduleCell(
+                    staff_id=shift.staff_id,
+                    date=day,
+                    shift_type=shift.shift_type,
+                    start_time=shift.start_time,
+                    end_time=shift.end_time,
+                    branch=template.branch,
+                    notes=shift.notes,
+                )
+            day += timedelta(days=1)
+
+
+def project_templates(templates, start_date, end_date, creator, cycle_start=None):
+    """Create schedules from a RosterTemplate queryset over the range; returns the BulkResult"""
+    templates = list(templates.prefetch_related('shifts'))
+    return bulk_schedule(expand_templates(templates, start_date, end_date, cycle_start), creator)
@@ -1,3 +1,294 @@
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.urls import reverse
+
+from .bulk import ScheduleCell, bulk_schedule, load_conflicts
+from .leave_index import LeaveIndex
+from .views import MAX_ROSTER_API_DAYS
+from .models import LeaveRequest, Schedule
+
+
+User = get_user_model()
+
+
+def make_user(username, **fields):
+    return User.objects.create_user(username=username, email=f'{username}@example.com', password='x', **fields)
+
+
+class BulkScheduleTests(TestCase):
+    DAY = date(2026, 3, 9)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = make_user('manager', role='manager', branch='damansara_perdana')
+        cls.alice = make_user('alice', branch='damansara_perdana')
+        cls.bob = make_user('bob', branch='damansara_perdana')
+
+    def cell(self, staff, offset=0, shift_type='morning', start=time(9), end=time(17)):
+        return ScheduleCell(staff.id, self.DAY + timedelta(days=offset), shift_type, start, end, staff.branch)
+
+    def test_creates_every_free_cell(self):
+        cells = [self.cell(staff, offset) for staff in (self.alice, self.bob) for offset in range(3)]
+
+        result = bulk_schedule(cells, self.manager)
+
+        self.assertEqual(result.created, cells)
+        self.assertEqual(result.skipped, [])
+        self.assertEqual(Schedule.objects.filter(created_by=self.manager).count(), 6)
+
+    def test_skip_reasons(self):
+        Schedule.objects.create(
+            staff=self.alice, date=self.DAY, shift_type='morning',
+            start_time=time(9), end_time=time(17), branch=self.alice.branch,
+        )
+        LeaveRequest.objects.create(
+            staff=self.bob, leave_type='annual', start_date=self.DAY, end_date=self.DAY + timedelta(days=1),
+            reason='Holiday', status='approved',
+        )
+        scheduled = self.cell(self.alice, 0)
+        first = self.cell(self.alice, 1)
+        duplicate = self.cell(self.alice, 1, shift_type='evening', start=time(14), end=time(22))
+        no_times = self.cell(self.alice, 2, start=None)
+        on_leave = self.cell(self.bob, 1)
+        after_leave = self.cell(self.bob, 2)
+
+        result = bulk_schedule([scheduled, first, duplicate, no_times, on_leave, after_leave], self.manager)
+
+        self.assertEqual(result.created, [first, after_leave])
+        self.assertEqual(result.skipped, [
+            (scheduled, 'scheduled'),
+            (duplicate, 'duplicate'),
+            (no_times, 'missing_times'),
+            (on_leave, 'leave'),
+        ])
+        self.assertEqual(result.skipped_summary(), {
+            'Already scheduled': 1,
+            'Requested more than once': 1,
+            'Working shift without start/end time': 1,
+            'On approved leave': 1,
+        })
+        # The first request for a cell wins
+        self.assertEqual(Schedule.objects.get(staff=self.alice, date=first.date).shift_type, 'morning')
+
+    def test_off_days_drop_their_times(self):
+        off = self.cell(self.alice, shift_type='off')
+
+        result = bulk_schedule([off], self.manager)
+
+        self.assertEqual(result.created_count, 1)
+        schedule = Schedule.objects.get(staff=self.alice, date=self.DAY)
+        self.assertIsNone(schedule.start_time)
+        self.assertIsNone(schedule.end_time)
+
+    def test_rows_lost_to_a_concurrent_insert_are_reported(self):
+        raced = self.cell(self.alice, 0)
+        ours = self.cell(self.alice, 1)
+        stale = load_conflicts({self.alice.id}, raced.date, ours.date)
+        # Another manager schedules the same cell after our conflicts were loaded
+        Schedule.objects.create(
+            staff=self.alice, date=raced.date, shift_type='evening',
+            start_time=time(14), end_time=time(22), branch=self.alice.branch, created_by=self.bob,
+        )
+
+        with mock.patch('schedule.bulk.load_conflicts', return_value=stale):
+            result = bulk_schedule([raced, ours], self.manager)
+
+        self.assertEqual(result.created, [ours])
+        self.assertEqual(result.skipped, [(raced, 'conflict')])
+        self.assertEqual(Schedule.objects.get(staff=self.alice, date=raced.date).created_by, self.bob)
+
+    def test_nothing_to_do(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(bulk_schedule([], self.manager).created, [])
+
+
+class LeaveIndexTests(TestCase):
+    """covers() and day_counts() against the per-day queries they replaced"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = [make_user(f'staff{n}') for n in range(6)]
+        a, b, c, d, e, f = cls.staff
+
+        def leave(staff, start, end, status='approved'):
+            return LeaveRequest(
+                staff=staff, leave_type='annual', start_date=start, end_date=end, reason='-', status=status,
+            )
+
+        # bulk_create skips clean(), which would refuse the overlapping rows
+        LeaveRequest.objects.bulk_create([
+            # Overlapping, and one nested inside another
+            leave(a, date(2026, 3, 3), date(2026, 3, 8)),
+            leave(a, date(2026, 3, 6), date(2026, 3, 12)),
+            leave(a, date(2026, 3, 7), date(2026, 3, 9)),
+            # Back to back, then a one-day gap
+            leave(b, date(2026, 3, 10), date(2026, 3, 11)),
+            leave(b, date(2026, 3, 12), date(2026, 3, 12)),
+            leave(b, date(2026, 3, 14), date(2026, 3, 15)),
+            # Single days, including the first and last day of the month
+            leave(c, date(2026, 3, 1), date(2026, 3, 1)),
+            leave(c, date(2026, 3, 20), date(2026, 3, 20)),
+            leave(c, date(2026, 3, 31), date(2026, 3, 31)),
+            # Across both month edges
+            leave(d, date(2026, 2, 25), date(2026, 3, 2)),
+            leave(d, date(2026, 3, 30), date(2026, 4, 3)),
+            leave(e, date(2026, 2, 1), date(2026, 4, 30)),
+            # Not approved: never counts
+            leave(f, date(2026, 3, 5), date(2026, 3, 25), status='pending_manager'),
+            leave(f, date(2026, 3, 26), date(2026, 3, 28), status='rejected'),
+        ])
+
+    def days(self, start, end):
+        return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+    def on_leave(self, staff, day):
+        return LeaveRequest.objects.filter(
+            staff=staff, status='approved', start_date__lte=day, end_date__gte=day,
+        ).exists()
+
+    def staff_on_leave(self, day):
+        return LeaveRequest.objects.filter(
+            status='approved', start_date__lte=day, end_date__gte=day,
+        ).values('staff').distinct().count()
+
+    def assert_matches_queries(self, start, end):
+        index = LeaveIndex.load(start, end)
+        for day in self.days(start, end):
+            for staff in self.staff:
+                self.assertEqual(index.covers(staff.id, day), self.on_leave(staff, day), (staff.username, day))
+        self.assertEqual(index.day_counts(), {day: self.staff_on_leave(day) for day in self.days(start, end)})
+
+    def test_month(self):
+        self.assert_matches_queries(date(2026, 3, 1), date(2026, 3, 31))
+
+    def test_windows_cut_through_leaves(self):
+        self.assert_matches_queries(date(2026, 2, 28), date(2026, 3, 1))
+        self.assert_matches_queries(date(2026, 3, 7), date(2026, 3, 13))
+        self.assert_matches_queries(date(2026, 3, 31), date(2026, 4, 1))
+
+    def test_single_day_window(self):
+        for day in (date(2026, 3, 1), date(2026, 3, 12), date(2026, 3, 13), date(2026, 3, 20)):
+            self.assert_matches_queries(day, day)
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            index = LeaveIndex.load(date(2026, 3, 1), date(2026, 3, 31))
+        with self.assertNumQueries(0):
+            index.day_counts()
+            index.covers(self.staff[0].id, date(2026, 3, 10))
+
+    def test_newest_leave_wins_where_two_overlap(self):
+        index = LeaveIndex.load(date(2026, 3, 1), date(2026, 3, 31))
+        a = self.staff[0]
+        newest = LeaveRequest.objects.filter(staff=a).order_by('-created_at', '-pk').first()
+
+        self.assertEqual(index.leave_on(a.id, date(2026, 3, 8)), newest)
+        self.assertIsNone(index.leave_on(a.id, date(2026, 3, 13)))
+
+    def test_schedule_clean_refuses_leave_days(self):
+        a = self.staff[0]
+        for day, refused in ((date(2026, 3, 2), False), (date(2026, 3, 3), True),
+                             (date(2026, 3, 12), True), (date(2026, 3, 13), False)):
+            schedule = Schedule(staff=a, date=day, shift_type='morning', start_time=time(9), end_time=time(17))
+            if refused:
+                with self.assertRaises(ValidationError):
+                    schedule.clean()
+            else:
+                schedule.clean()
+
+
+class RosterApiTests(TestCase):
+    START = date(2026, 3, 9)
+    END = date(2026, 3, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', role='admin', branch='hq')
+        cls.manager = make_user('manager', role='manager', branch='damansara_perdana')
+        cls.alice = make_user('alice', branch='damansara_perdana')
+        cls.bob = make_user('bob', branch='wangsa_maju')
+        cls.schedule = Schedule.objects.create(
+            staff=cls.alice, date=cls.START, shift_type='morning',
+            start_time=time(9), end_time=time(17), branch=cls.alice.branch,
+        )
+        Schedule.objects.create(
+            staff=cls.bob, date=cls.START, shift_type='off', branch=cls.bob.branch,
+        )
+
+    def get(self, user, headers=None, **params):
+        self.client.force_login(user)
+        params.setdefault('start', self.START.isoformat())
+        params.setdefault('end', self.END.isoformat())
+        return self.client.get(reverse('schedule:roster_api'), params, headers=headers or {})
+
+    def usernames(self, response):
+        return [row[1] for row in response.json()['staff']]
+
+    def test_admin_sees_every_branch_or_one(self):
+        response = self.get(self.admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.usernames(response), ['alice', 'bob', 'manager'])
+
+        self.assertEqual(self.usernames(self.get(self.admin, branch='wangsa_maju')), ['bob'])
+
+    def test_manager_only_sees_own_branch_staff(self):
+        response = self.get(self.manager, branch='wangsa_maju')
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(self.usernames(response), ['alice'])
+        self.assertEqual(len(payload['dates']), 7)
+        self.assertEqual(payload['shift_codes'][payload['matrix'][0][0]], 'morning')
+        self.assertEqual(payload['shifts'], [[0, 0, self.schedule.id, '09:00', '17:00', '']])
+
+    def test_staff_are_refused(self):
+        self.assertEqual(self.get(self.alice).status_code, 403)
+
+    def test_unchanged_roster_answers_304(self):
+        first = self.get(self.manager)
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        again = self.get(self.manager, headers={'If-None-Match': etag})
+        self.assertEqual(again.status_code, 304)
+
+        # Another branch changing doesn't matter to this manager...
+        Schedule.objects.filter(staff=self.bob).delete()
+        self.assertEqual(self.get(self.manager, headers={'If-None-Match': etag}).status_code, 304)
+
+        # ...an edit or a deletion in theirs does
+        self.schedule.notes = 'Cover for bob'
+        self.schedule.save()
+        edited = self.get(self.manager, headers={'If-None-Match': etag})
+        self.assertEqual(edited.status_code, 200)
+        self.assertNotEqual(edited['ETag'], etag)
+
+        self.schedule.delete()
+        deleted = self.get(self.manager, headers={'If-None-Match': edited['ETag']})
+        self.assertEqual(deleted.status_code, 200)
+        self.assertEqual(deleted.json()['shifts'], [])
+
+    def test_range_limits(self):
+        last_allowed = self.START + timedelta(days=MAX_ROSTER_API_DAYS - 1)
+        response = self.get(self.admin, end=last_allowed.isoformat())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['dates']), MAX_ROSTER_API_DAYS)
+
+        too_long = self.get(self.admin, end=(last_allowed + timedelta(days=1)).isoformat())
+        self.assertEqual(too_long.status_code, 400)
+
+        self.assertEqual(self.get(self.admin, end=(self.START - timedelta(days=1)).isoformat()).status_code, 400)
+        self.assertEqual(self.get(self.admin, start='09/03/2026').status_code, 400)
+
+    def test_defaults_to_this_week(self):
+        self.client.force_login(self.admin)
+        payload = self.client.get(reverse('schedule:roster_api')).json()
 
-# Create your tests here.
+        today = date.today()
+        monday = today - timedelta(days=today.weekday())
+        self.assertEqual(payload['start'], monday.isoformat())
+        self.assertEqual(payload['end'], (monday + timedelta(days=6)).isoformat())
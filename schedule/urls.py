@@ -18,6 +18,7 @@ urlpatterns = [
     # Schedule management
     path('admin/create/', views.admin_create_schedule, name='admin_create_schedule'),
     path('admin/bulk-create/', views.admin_bulk_create, name='admin_bulk_create'),
+    path('admin/roster-templates/', views.admin_roster_templates, name='admin_roster_templates'),
     path('admin/edit/<int:schedule_id>/', views.admin_edit_schedule, name='admin_edit_schedule'),
     path('admin/delete/<int:schedule_id>/', views.admin_delete_schedule, name='admin_delete_schedule'),
     
@@ -77,4 +78,10 @@ urlpatterns = [
     path('export-my-schedule-pdf/', views.export_staff_schedule_pdf, name='staff_export_pdf'),
     path('export/staff/pdf/', views.export_staff_pdf, name='export_staff_pdf'),
 
+    # ============================================
+    # API
+    # ============================================
+    
+    path('api/roster/', views.roster_api, name='roster_api'),
+
 ]
\ No newline at end of file
@@ -10,8 +10,11 @@ from datetime import datetime, timedelta, date
 from calendar import monthrange
 import json
 
-from .models import Schedule, LeaveRequest, ShiftSwapRequest
-from .forms import ScheduleForm, BulkScheduleForm, LeaveRequestForm, ShiftSwapRequestForm
+from .models import Schedule, LeaveRequest, ShiftSwapRequest, RosterTemplate
+from .forms import (
+    ScheduleForm, BulkScheduleForm, LeaveRequestForm, ShiftSwapRequestForm,
+    RosterTemplateCaptureForm, RosterTemplateProjectForm,
+)
 from accounts.models import User
 
 from django.shortcuts import render, redirect, get_object_or_404
@@ -37,6 +40,18 @@ from django.shortcuts import redirect, render
 from accounts.models import User
 from .models import Schedule
 
+from django.core.cache import cache
+
+from task_management.utils.export_jobs import enqueue_export
+from .bulk import SKIP_REASONS, BulkResult, ScheduleCell, bulk_schedule
+from .leave_index import APPROVED_STATUSES, CALENDAR_STATUSES, LeaveIndex
+from .roster import (
+    PDF_CACHE_TIMEOUT, Roster, load_roster, load_roster_staff, roster_cache_key,
+    roster_etag, roster_payload, roster_schedules,
+)
+from django.utils.cache import get_conditional_response
+from .roster_templates import capture_template, project_templates
+
 # For PDF generation
 try:
     from weasyprint import HTML
@@ -83,17 +98,12 @@ def _build_days_data(user, start_date, end_date, include_pending=True):
     schedule_map = {s.date: s for s in schedules_qs}
 
     # Which leave statuses to show on calendar
-    if include_pending:
-        leave_statuses = ['pending_manager', 'manager_approved', 'approved']
-    else:
-        leave_statuses = ['approved']
-
-    leaves_qs = LeaveRequest.objects.filter(
-        staff=user,
-        status__in=leave_statuses,
-        start_date__lte=end_date,
-        end_date__gte=start_date
-    ).order_by('-created_at')
+    leave_index = LeaveIndex.load(
+        start_date,
+        end_date,
+        staff=[user.id],
+        statuses=CALENDAR_STATUSES if include_pending else APPROVED_STATUSES,
+    )
 
     # Build a list of days
     days_data = []
@@ -103,12 +113,8 @@ def _build_days_data(user, start_date, end_date, include_pending=True):
         # Find schedule
         day_schedule = schedule_map.get(current_day)
 
-        # Find leave covering this day
-        day_leave = None
-        for leave in leaves_qs:
-            if leave.start_date <= current_day <= leave.end_date:
-                day_leave = leave
-                break
+        # Most recent leave covering this day
+        day_leave = leave_index.leave_on(user.id, current_day)
 
         days_data.append({
             'date': current_day,
@@ -187,6 +193,9 @@ def admin_week_view(request, current_date, branch_filter):
     
     # Create lookup dictionary: (staff_id, date_string) -> schedule
     schedule_lookup = {(s.staff_id, s.date.isoformat()): s for s in schedules}
+
+    # Leave for everyone on the grid, one query
+    leave_index = LeaveIndex.load(week_start, week_end, staff=staff_list, statuses=CALENDAR_STATUSES)
     
     # Build rows the template can loop (FIXED)
     schedule_rows = []
@@ -198,6 +207,7 @@ def admin_week_view(request, current_date, branch_filter):
                 "day": day,
                 "day_key": day_key,
                 "schedule": schedule_lookup.get((staff.id, day_key)),
+                "leave": leave_index.leave_on(staff.id, day),
             })
         schedule_rows.append({
             "staff": staff,
@@ -287,6 +297,13 @@ def admin_month_view(request, current_date, branch_filter):
     for s in schedules:
         counts[s.date.isoformat()] += 1
 
+    # Staff on approved leave per day
+    leave_counts = LeaveIndex.load(
+        calendar_start,
+        calendar_end,
+        branch=None if branch_filter == 'all' else branch_filter,
+    ).day_counts()
+
     # Convert weeks -> cell objects for template
     calendar_weeks = []
     for week in weeks:
@@ -297,6 +314,7 @@ def admin_month_view(request, current_date, branch_filter):
                 "day": d,
                 "key": key,
                 "count": counts.get(key, 0),
+                "leave_count": leave_counts.get(d, 0),
             })
         calendar_weeks.append(row)
 
@@ -375,6 +393,10 @@ def admin_create_schedule(request):
     return render(request, 'schedule/admin/create_schedule.html', context)
 
 
+# Skipped cells listed individually after a bulk create
+MAX_SKIP_DETAILS = 10
+
+
 @login_required
 def admin_bulk_create(request):
     """Admin bulk schedule creation"""
@@ -386,17 +408,30 @@ def admin_bulk_create(request):
         form = BulkScheduleForm(request.POST, user=request.user)
         if form.is_valid():
             mode = form.cleaned_data['mode']
-            created_count = 0
+            result = BulkResult()
             
             try:
                 if mode == 'same_shift':
-                    created_count = create_same_shift_bulk(form.cleaned_data, request.user)
+                    result = create_same_shift_bulk(form.cleaned_data, request.user)
                 elif mode == 'weekly_pattern':
-                    created_count = create_weekly_pattern_bulk(form.cleaned_data, request.user)
+                    result = create_weekly_pattern_bulk(form.cleaned_data, request.user)
                 elif mode == 'copy_week':
-                    created_count = copy_week_schedules(form.cleaned_data, request.user)
+                    result = copy_week_schedules(form.cleaned_data, request.user)
                 
-                messages.success(request, f'Successfully created {created_count} schedule(s)!')
+                messages.success(request, f'Successfully created {result.created_count} schedule(s)!')
+                if result.skipped:
+                    summary = ', '.join(f'{count} {reason.lower()}' for reason, count in result.skipped_summary().items())
+                    messages.warning(request, f'Skipped {len(result.skipped)} schedule(s): {summary}.')
+                    
+                    # Per-cell detail for the first few
+                    usernames = dict(User.objects.filter(
+                        id__in={cell.staff_id for cell, _ in result.skipped[:MAX_SKIP_DETAILS]}
+                    ).values_list('id', 'username'))
+                    for cell, reason in result.skipped[:MAX_SKIP_DETAILS]:
+                        messages.info(
+                            request,
+                            f'{usernames.get(cell.staff_id, cell.staff_id)} on {cell.date:%a %d %b}: {SKIP_REASONS[reason]}'
+                        )
                 return redirect('schedule:admin_calendar')
             
             except Exception as e:
@@ -413,154 +448,126 @@ def admin_bulk_create(request):
 
 def create_same_shift_bulk(data, creator):
     """Create same shift for multiple staff"""
-    staff_members = data['staff_members']
-    start_date = data['start_date']
-    end_date = data['end_date']
     shift_type = data['shift_type']
-    start_time = data.get('start_time')
-    end_time = data.get('end_time')
-    
-    created_count = 0
-    current_date = start_date
     
-    while current_date <= end_date:
-        for staff in staff_members:
-            # Check if already scheduled
-            if Schedule.objects.filter(staff=staff, date=current_date).exists():
-                continue
-            
-            # Check for leave
-            has_leave = LeaveRequest.objects.filter(
-                staff=staff,
-                start_date__lte=current_date,
-                end_date__gte=current_date,
-                status='approved'
-            ).exists()
-            
-            if has_leave:
-                continue
-            
-            # Create schedule
-            Schedule.objects.create(
-                staff=staff,
-                date=current_date,
-                shift_type=shift_type,
-                start_time=start_time if shift_type != 'off' else None,
-                end_time=end_time if shift_type != 'off' else None,
-                branch=staff.branch,
-                created_by=creator
-            )
-            created_count += 1
-        
-        current_date += timedelta(days=1)
-    
-    return created_count
+    return bulk_schedule((
+        ScheduleCell(
+            staff_id=staff.id,
+            date=day,
+            shift_type=shift_type,
+            start_time=data.get('start_time'),
+            end_time=data.get('end_time'),
+            branch=staff.branch,
+        )
+        for day in date_range(data['start_date'], data['end_date'])
+        for staff in data['staff_members']
+    ), creator)
 
 
 def create_weekly_pattern_bulk(data, creator):
     """Create weekly pattern for one staff"""
     staff = data['single_staff']
-    start_date = data['start_date']
-    end_date = data['end_date']
     
     # Week pattern
+    weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
     week_pattern = {
-        0: {'shift': data.get('monday_shift'), 'start': data.get('monday_start'), 'end': data.get('monday_end')},
-        1: {'shift': data.get('tuesday_shift'), 'start': data.get('tuesday_start'), 'end': data.get('tuesday_end')},
-        2: {'shift': data.get('wednesday_shift'), 'start': data.get('wednesday_start'), 'end': data.get('wednesday_end')},
-        3: {'shift': data.get('thursday_shift'), 'start': data.get('thursday_start'), 'end': data.get('thursday_end')},
-        4: {'shift': data.get('friday_shift'), 'start': data.get('friday_start'), 'end': data.get('friday_end')},
-        5: {'shift': data.get('saturday_shift'), 'start': data.get('saturday_start'), 'end': data.get('saturday_end')},
-        6: {'shift': data.get('sunday_shift'), 'start': data.get('sunday_start'), 'end': data.get('sunday_end')},
+        index: {'shift': data.get(f'{day}_shift'), 'start': data.get(f'{day}_start'), 'end': data.get(f'{day}_end')}
+        for index, day in enumerate(weekdays)
     }
     
-    created_count = 0
-    current_date = start_date
-    
-    while current_date <= end_date:
-        weekday = current_date.weekday()
-        pattern = week_pattern[weekday]
-        
-        if pattern['shift']:
-            # Check if already scheduled
-            if Schedule.objects.filter(staff=staff, date=current_date).exists():
-                current_date += timedelta(days=1)
-                continue
-            
-            # Check for leave
-            has_leave = LeaveRequest.objects.filter(
-                staff=staff,
-                start_date__lte=current_date,
-                end_date__gte=current_date,
-                status='approved'
-            ).exists()
-            
-            if not has_leave:
-                Schedule.objects.create(
-                    staff=staff,
-                    date=current_date,
-                    shift_type=pattern['shift'],
-                    start_time=pattern['start'] if pattern['shift'] != 'off' else None,
-                    end_time=pattern['end'] if pattern['shift'] != 'off' else None,
-                    branch=staff.branch,
-                    created_by=creator
-                )
-                created_count += 1
-        
-        current_date += timedelta(days=1)
-    
-    return created_count
+    return bulk_schedule((
+        ScheduleCell(
+            staff_id=staff.id,
+            date=day,
+            shift_type=week_pattern[day.weekday()]['shift'],
+            start_time=week_pattern[day.weekday()]['start'],
+            end_time=week_pattern[day.weekday()]['end'],
+            branch=staff.branch,
+        )
+        for day in date_range(data['start_date'], data['end_date'])
+        if week_pattern[day.weekday()]['shift']
+    ), creator)
 
 
 def copy_week_schedules(data, creator):
     """Copy schedules from previous week"""
-    copy_from = data['copy_from_date']
-    start_date = data['start_date']
-    
-    # Get source week schedules
-    source_start = copy_from
+    source_start = data['copy_from_date']
     source_end = source_start + timedelta(days=6)
+    start_date = data['start_date']
     
     source_schedules = Schedule.objects.filter(
         date__range=[source_start, source_end]
-    )
+    ).values_list('staff_id', 'date', 'shift_type', 'start_time', 'end_time', 'branch', 'notes')
+    
+    # Same weekday, new week
+    return bulk_schedule((
+        ScheduleCell(staff_id, start_date + (day - source_start), shift_type, start, end, branch, notes)
+        for staff_id, day, shift_type, start, end, branch, notes in source_schedules
+    ), creator)
+
+
+def date_range(start_date, end_date):
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+@login_required
+def admin_roster_templates(request):
+    """Admin saves recurring roster templates and rolls them forward"""
+    if request.user.role != 'admin':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard:staff_dashboard')
     
-    created_count = 0
+    capture_form = RosterTemplateCaptureForm(prefix='capture')
+    project_form = RosterTemplateProjectForm(prefix='project')
     
-    for source in source_schedules:
-        # Calculate new date (same weekday, new week)
-        days_diff = (source.date - source_start).days
-        new_date = start_date + timedelta(days=days_diff)
-        
-        # Check if already scheduled
-        if Schedule.objects.filter(staff=source.staff, date=new_date).exists():
-            continue
+    if request.method == 'POST':
+        action = request.POST.get('action')
         
-        # Check for leave
-        has_leave = LeaveRequest.objects.filter(
-            staff=source.staff,
-            start_date__lte=new_date,
-            end_date__gte=new_date,
-            status='approved'
-        ).exists()
+        if action == 'capture':
+            capture_form = RosterTemplateCaptureForm(request.POST, prefix='capture')
+            if capture_form.is_valid():
+                data = capture_form.cleaned_data
+                template, shift_count = capture_template(
+                    data['name'], data['branch'], data['source_start'], data['weeks'],
+                    request.user, notes=data['notes'],
+                )
+                messages.success(request, f'Saved template "{template.name}" with {shift_count} shift(s).')
+                return redirect('schedule:admin_roster_templates')
         
-        if has_leave:
-            continue
+        elif action == 'project':
+            project_form = RosterTemplateProjectForm(request.POST, prefix='project')
+            if project_form.is_valid():
+                data = project_form.cleaned_data
+                result = project_templates(
+                    data['templates'], data['start_date'], data['end_date'],
+                    request.user, cycle_start=data['cycle_start'],
+                )
+                messages.success(request, f'Created {result.created_count} schedule(s) from templates!')
+                if result.skipped:
+                    summary = ', '.join(f'{count} {reason.lower()}' for reason, count in result.skipped_summary().items())
+                    messages.warning(request, f'Skipped {len(result.skipped)} schedule(s): {summary}.')
+                return redirect('schedule:admin_roster_templates')
         
-        # Copy schedule
-        Schedule.objects.create(
-            staff=source.staff,
-            date=new_date,
-            shift_type=source.shift_type,
-            start_time=source.start_time,
-            end_time=source.end_time,
-            branch=source.branch,
-            notes=source.notes,
-            created_by=creator
-        )
-        created_count += 1
+        elif action == 'delete':
+            template = get_object_or_404(RosterTemplate, id=request.POST.get('template_id'))
+            template.delete()
+            messages.success(request, f'Deleted template "{template.name}".')
+            return redirect('schedule:admin_roster_templates')
+    
+    templates = RosterTemplate.objects.annotate(
+        shift_count=Count('shifts'),
+        staff_count=Count('shifts__staff', distinct=True),
+    ).select_related('created_by')
     
-    return created_count
+    context = {
+        'templates': templates,
+        'capture_form': capture_form,
+        'project_form': project_form,
+    }
+    return render(request, 'schedule/admin/roster_templates.html', context)
 
 
 @login_required
@@ -653,6 +660,8 @@ def manager_week_view(request, current_date, branch):
     # Organize schedules (no template dict lookup)
     schedule_lookup = {(s.staff_id, s.date.isoformat()): s for s in schedules}
 
+    leave_index = LeaveIndex.load(week_start, week_end, staff=staff_list, statuses=CALENDAR_STATUSES)
+
     schedule_rows = []
     for staff in staff_list:
         cells = []
@@ -662,6 +671,7 @@ def manager_week_view(request, current_date, branch):
                 "day": day,
                 "day_key": day_key,
                 "schedule": schedule_lookup.get((staff.id, day_key)),
+                "leave": leave_index.leave_on(staff.id, day),
             })
         schedule_rows.append({
             "staff": staff,
@@ -717,6 +727,9 @@ def manager_month_view(request, current_date, branch):
     for s in schedules:
         counts[s.date.isoformat()] += 1
 
+    # Staff on approved leave per day
+    leave_counts = LeaveIndex.load(month_start, month_end, branch=branch).day_counts()
+
     # Convert weeks to "cell" objects so template doesn't need get_item
     calendar_weeks = []
     for week in weeks:
@@ -727,6 +740,7 @@ def manager_month_view(request, current_date, branch):
                 "day": d,
                 "key": key,
                 "count": counts.get(key, 0),
+                "leave_count": leave_counts.get(d, 0),
             })
         calendar_weeks.append(row)
 
@@ -1439,329 +1453,174 @@ def manager_approve_swap(request, swap_id):
 # PDF EXPORT VIEWS
 # ============================================
 
-@login_required
-def export_staff_schedule_pdf(request):
-    """Staff export their own schedule as PDF"""
-    
-    # Get date range
-    export_type = request.GET.get('type', 'week')  # week or month
-    date_str = request.GET.get('date', date.today().isoformat())
+def schedule_export_range(export_type, current_date):
+    """(start, end, filename label) for a week or month schedule export"""
+    if export_type == 'week':
+        start = current_date - timedelta(days=current_date.weekday())
+        end = start + timedelta(days=6)
+        return start, end, f'{start.isoformat()}_to_{end.isoformat()}'
     
+    start = current_date.replace(day=1)
+    end = start.replace(day=monthrange(current_date.year, current_date.month)[1])
+    return start, end, start.strftime('%Y-%m')
+
+
+def parse_export_date(date_str):
     try:
-        current_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-    except:
-        current_date = date.today()
+        return datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return date.today()
+
+
+def build_staff_schedule_export(staff, export_type, current_date):
+    """Template, context, filename and (no) PDF cache key for one staff member's schedule"""
+    export_type = 'week' if export_type == 'week' else 'month'
+    start_date, end_date, label = schedule_export_range(export_type, current_date)
     
-    if export_type == 'week':
-        week_start = current_date - timedelta(days=current_date.weekday())
-        week_end = week_start + timedelta(days=6)
-        
-        schedules = Schedule.objects.filter(
-            staff=request.user,
-            date__range=[week_start, week_end]
-        ).order_by('date')
-        
-        context = {
-            'staff': request.user,
-            'export_type': 'week',
-            'start_date': week_start,
-            'end_date': week_end,
-            'schedules': schedules,
-            'generated_at': timezone.now(),
-        }
-        
-        filename = f'schedule_{request.user.username}_{week_start.isoformat()}_to_{week_end.isoformat()}.pdf'
+    schedules = Schedule.objects.filter(
+        staff=staff,
+        date__range=[start_date, end_date]
+    ).order_by('date')
     
-    else:  # month
-        month_start = current_date.replace(day=1)
-        days_in_month = monthrange(current_date.year, current_date.month)[1]
-        month_end = month_start.replace(day=days_in_month)
-        
-        schedules = Schedule.objects.filter(
-            staff=request.user,
-            date__range=[month_start, month_end]
-        ).order_by('date')
-        
-        context = {
-            'staff': request.user,
-            'export_type': 'month',
-            'start_date': month_start,
-            'end_date': month_end,
-            'schedules': schedules,
-            'generated_at': timezone.now(),
-        }
-        
-        filename = f'schedule_{request.user.username}_{month_start.strftime("%Y-%m")}.pdf'
+    context = {
+        'staff': staff,
+        'export_type': export_type,
+        'start_date': start_date,
+        'end_date': end_date,
+        'schedules': schedules,
+        'generated_at': timezone.now(),
+    }
     
-    # Generate PDF
-    return generate_pdf_response(
-        'schedule/pdf/staff_schedule.html',
-        context,
-        filename
-    )
+    return 'schedule/pdf/staff_schedule.html', context, f'schedule_{staff.username}_{label}.pdf', None
 
 
-@login_required
-def export_manager_schedule_pdf(request):
-    """Manager export branch schedule as PDF"""
-    if request.user.role != 'manager':
-        messages.error(request, 'Access denied.')
-        return redirect('dashboard:staff_dashboard')
+def build_manager_schedule_export(manager, export_type, current_date):
+    """Template, context, filename and PDF cache key for a manager's branch schedule"""
+    export_type = 'week' if export_type == 'week' else 'month'
+    start_date, end_date, label = schedule_export_range(export_type, current_date)
     
-    # Get date range
-    export_type = request.GET.get('type', 'week')
-    date_str = request.GET.get('date', date.today().isoformat())
+    # Branch staff and their schedules in two queries
+    roster = load_roster(start_date, end_date, branches=[manager.branch], roles=('staff',))
     
-    try:
-        current_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-    except:
-        current_date = date.today()
+    context = {
+        'manager': manager,
+        'branch': manager.get_branch_display(),
+        'export_type': export_type,
+        'start_date': start_date,
+        'end_date': end_date,
+        'dates': roster.dates,
+        'roster_rows': roster.rows,
+        'staff_schedules': roster.staff_schedules(),
+        'generated_at': timezone.now(),
+    }
     
-    # Get branch staff
-    branch_staff = User.objects.filter(
-        branch=request.user.branch,
-        role='staff',
-        is_active=True
-    ).order_by('username')
+    cache_key = roster_cache_key(roster, 'manager', manager.id, manager.get_full_name())
+    return 'schedule/pdf/manager_schedule.html', context, f'schedule_{manager.branch}_{label}.pdf', cache_key
+
+
+def build_admin_schedule_export(admin, export_type, current_date, branch_filter='all'):
+    """Template, context, filename and PDF cache key for the all-branches (or one branch) schedule"""
+    export_type = 'week' if export_type == 'week' else 'month'
+    start_date, end_date, label = schedule_export_range(export_type, current_date)
     
-    if export_type == 'week':
-        week_start = current_date - timedelta(days=current_date.weekday())
-        week_end = week_start + timedelta(days=6)
-        
-        schedules = Schedule.objects.filter(
-            branch=request.user.branch,
-            date__range=[week_start, week_end]
-        ).select_related('staff').order_by('date', 'staff__username')
-        
-        # Organize by staff
-        staff_schedules = {}
-        for staff in branch_staff:
-            staff_schedules[staff] = schedules.filter(staff=staff)
-        
-        context = {
-            'manager': request.user,
-            'branch': request.user.get_branch_display(),
-            'export_type': 'week',
-            'start_date': week_start,
-            'end_date': week_end,
-            'staff_schedules': staff_schedules,
-            'generated_at': timezone.now(),
-        }
-        
-        filename = f'schedule_{request.user.branch}_{week_start.isoformat()}_to_{week_end.isoformat()}.pdf'
+    # Every branch's staff and schedules in two queries
+    roster = load_roster(
+        start_date, end_date,
+        branches=None if branch_filter == 'all' else [branch_filter],
+    )
     
-    else:  # month
-        month_start = current_date.replace(day=1)
-        days_in_month = monthrange(current_date.year, current_date.month)[1]
-        month_end = month_start.replace(day=days_in_month)
-        
-        schedules = Schedule.objects.filter(
-            branch=request.user.branch,
-            date__range=[month_start, month_end]
-        ).select_related('staff').order_by('date', 'staff__username')
-        
-        # Organize by staff
-        staff_schedules = {}
-        for staff in branch_staff:
-            staff_schedules[staff] = schedules.filter(staff=staff)
-        
-        context = {
-            'manager': request.user,
-            'branch': request.user.get_branch_display(),
-            'export_type': 'month',
-            'start_date': month_start,
-            'end_date': month_end,
-            'staff_schedules': staff_schedules,
-            'generated_at': timezone.now(),
+    # Organize by branch and staff
+    branch_names = dict(User.BRANCH_CHOICES)
+    branch_data = {}
+    for branch_code in roster.branches:
+        branch_data[branch_names.get(branch_code, branch_code)] = {
+            'code': branch_code,
+            'roster_rows': roster.rows_for(branch_code),
+            'staff_schedules': roster.staff_schedules(branch_code),
         }
-        
-        filename = f'schedule_{request.user.branch}_{month_start.strftime("%Y-%m")}.pdf'
     
-    # Generate PDF
-    return generate_pdf_response(
-        'schedule/pdf/manager_schedule.html',
-        context,
-        filename
-    )
+    context = {
+        'admin': admin,
+        'export_type': export_type,
+        'branch_filter': branch_filter,
+        'start_date': start_date,
+        'end_date': end_date,
+        'dates': roster.dates,
+        'branch_data': branch_data,
+        'generated_at': timezone.now(),
+    }
+    
+    if branch_filter == 'all':
+        filename = f'schedule_all_branches_{label}.pdf'
+    else:
+        filename = f'schedule_{branch_filter}_{label}.pdf'
+    
+    cache_key = roster_cache_key(roster, 'admin', branch_filter)
+    return 'schedule/pdf/admin_schedule.html', context, filename, cache_key
 
 
 @login_required
-def export_admin_schedule_pdf(request):
-    """Admin export all schedules as PDF"""
-    if request.user.role != 'admin':
+def export_staff_schedule_pdf(request):
+    """Staff export their own schedule as PDF (rendered by the export worker)"""
+    return enqueue_export(request, 'staff_schedule_pdf', {
+        'staff_id': request.user.id,
+        'type': request.GET.get('type', 'week'),  # week or month
+        'date': parse_export_date(request.GET.get('date')).isoformat(),
+    })
+
+
+@login_required
+def export_manager_schedule_pdf(request):
+    """Manager export branch schedule as PDF (rendered by the export worker)"""
+    if request.user.role != 'manager':
         messages.error(request, 'Access denied.')
         return redirect('dashboard:staff_dashboard')
     
-    # Get parameters
-    export_type = request.GET.get('type', 'week')
-    branch_filter = request.GET.get('branch', 'all')
-    date_str = request.GET.get('date', date.today().isoformat())
-    
-    try:
-        current_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-    except:
-        current_date = date.today()
-    
-    if export_type == 'week':
-        week_start = current_date - timedelta(days=current_date.weekday())
-        week_end = week_start + timedelta(days=6)
-        
-        # Get schedules
-        if branch_filter == 'all':
-            schedules = Schedule.objects.filter(
-                date__range=[week_start, week_end]
-            ).select_related('staff').order_by('branch', 'staff__username', 'date')
-            
-            branch_codes = (
-                User.objects.filter(is_active=True)
-                .exclude(branch__isnull=True)
-                .exclude(branch__exact="")
-                .values_list('branch', flat=True)
-                .distinct()
-            )
+    return enqueue_export(request, 'manager_schedule_pdf', {
+        'manager_id': request.user.id,
+        'branch': request.user.branch,
+        'type': request.GET.get('type', 'week'),
+        'date': parse_export_date(request.GET.get('date')).isoformat(),
+    })
 
-            branches = [
-                {"value": code, "label": str(code).replace("_", " ").title()}
-                for code in branch_codes
-            ]
-        else:
-            schedules = Schedule.objects.filter(
-                branch=branch_filter,
-                date__range=[week_start, week_end]
-            ).select_related('staff').order_by('staff__username', 'date')
-            
-            branches = [branch_filter]
-        
-        # Organize by branch and staff
-        branch_data = {}
-        for branch_code in branches:
-            branch_name = dict(User.BRANCH_CHOICES).get(branch_code, branch_code)
-            branch_schedules = schedules.filter(branch=branch_code)
-            
-            staff_list = User.objects.filter(
-                branch=branch_code,
-                role__in=['staff', 'manager'],
-                is_active=True
-            ).order_by('username')
-            
-            staff_schedules = {}
-            for staff in staff_list:
-                staff_schedules[staff] = branch_schedules.filter(staff=staff)
-            
-            branch_data[branch_name] = {
-                'code': branch_code,
-                'staff_schedules': staff_schedules,
-            }
-        
-        context = {
-            'admin': request.user,
-            'export_type': 'week',
-            'branch_filter': branch_filter,
-            'start_date': week_start,
-            'end_date': week_end,
-            'branch_data': branch_data,
-            'generated_at': timezone.now(),
-        }
-        
-        if branch_filter == 'all':
-            filename = f'schedule_all_branches_{week_start.isoformat()}_to_{week_end.isoformat()}.pdf'
-        else:
-            filename = f'schedule_{branch_filter}_{week_start.isoformat()}_to_{week_end.isoformat()}.pdf'
-    
-    else:  # month
-        month_start = current_date.replace(day=1)
-        days_in_month = monthrange(current_date.year, current_date.month)[1]
-        month_end = month_start.replace(day=days_in_month)
-        
-        # Get schedules
-        if branch_filter == 'all':
-            schedules = Schedule.objects.filter(
-                date__range=[month_start, month_end]
-            ).select_related('staff').order_by('branch', 'staff__username', 'date')
-            
-            branches = User.objects.filter(
-                is_active=True
-            ).values_list('branch', flat=True).distinct()
-        else:
-            schedules = Schedule.objects.filter(
-                branch=branch_filter,
-                date__range=[month_start, month_end]
-            ).select_related('staff').order_by('staff__username', 'date')
-            
-            branches = [branch_filter]
-        
-        # Organize by branch and staff
-        branch_data = {}
-        for branch_code in branches:
-            branch_name = dict(User.BRANCH_CHOICES).get(branch_code, branch_code)
-            branch_schedules = schedules.filter(branch=branch_code)
-            
-            staff_list = User.objects.filter(
-                branch=branch_code,
-                role__in=['staff', 'manager'],
-                is_active=True
-            ).order_by('username')
-            
-            staff_schedules = {}
-            for staff in staff_list:
-                staff_schedules[staff] = branch_schedules.filter(staff=staff)
-            
-            branch_data[branch_name] = {
-                'code': branch_code,
-                'staff_schedules': staff_schedules,
-            }
-        
-        context = {
-            'admin': request.user,
-            'export_type': 'month',
-            'branch_filter': branch_filter,
-            'start_date': month_start,
-            'end_date': month_end,
-            'branch_data': branch_data,
-            'generated_at': timezone.now(),
-        }
-        
-        if branch_filter == 'all':
-            filename = f'schedule_all_branches_{month_start.strftime("%Y-%m")}.pdf'
-        else:
-            filename = f'schedule_{branch_filter}_{month_start.strftime("%Y-%m")}.pdf'
+
+@login_required
+def export_admin_schedule_pdf(request):
+    """Admin export all schedules as PDF (rendered by the export worker)"""
+    if request.user.role != 'admin':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard:staff_dashboard')
     
-    # Generate PDF
-    return generate_pdf_response(
-        'schedule/pdf/admin_schedule.html',
-        context,
-        filename
-    )
+    return enqueue_export(request, 'admin_schedule_pdf', {
+        'type': request.GET.get('type', 'week'),
+        'branch': request.GET.get('branch', 'all'),
+        'date': parse_export_date(request.GET.get('date')).isoformat(),
+    })
 
 
-def generate_pdf_response(template_path, context, filename):
+def render_pdf(template_path, context, filename, cache_key=None):
     """
-    Generate PDF from HTML template
-    Uses WeasyPrint if available, otherwise returns HTML
+    Render an HTML template to PDF bytes.
+    Returns (content, filename, content_type); without WeasyPrint the
+    rendered HTML is returned instead (pip install weasyprint for PDFs).
+    With a cache_key (see schedule.roster) the result is cached.
     """
+    if cache_key:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
     
-    # Render HTML
     html_string = render_to_string(template_path, context)
     
     if not WEASYPRINT_AVAILABLE:
-        # If WeasyPrint not installed, return HTML for now
-        # (Admin can install WeasyPrint later: pip install weasyprint)
-        response = HttpResponse(html_string, content_type='text/html')
-        messages.warning(
-            None,
-            'WeasyPrint not installed. Showing HTML preview. '
-            'To generate PDF, run: pip install weasyprint'
-        )
-        return response
-    
-    # Generate PDF
-    pdf_file = HTML(string=html_string).write_pdf()
-    
-    # Return PDF response
-    response = HttpResponse(pdf_file, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        html_filename = filename.rsplit('.', 1)[0] + '.html'
+        result = (html_string.encode('utf-8'), html_filename, 'text/html')
+    else:
+        result = (HTML(string=html_string).write_pdf(), filename, 'application/pdf')
     
-    return response
+    if cache_key:
+        cache.set(cache_key, result, PDF_CACHE_TIMEOUT)
+    return result
 
 
 @login_required
@@ -1769,4 +1628,60 @@ def export_staff_pdf(request):
     # later you can generate a real PDF
     # for now: prevent NoReverseMatch and confirm endpoint works
     export_type = request.GET.get("type", "week")
-    return HttpResponse(f"Export PDF placeholder (type={export_type})", content_type="text/plain")
\ No newline at end of file
+    return HttpResponse(f"Export PDF placeholder (type={export_type})", content_type="text/plain")
+
+
+# ============================================
+# ROSTER API
+# ============================================
+
+MAX_ROSTER_API_DAYS = 62
+
+
+@login_required
+def roster_api(request):
+    """
+    Compact staff x date roster for client-side calendars.
+    GET ?start=YYYY-MM-DD&end=YYYY-MM-DD[&branch=<code>|all] (default: this week).
+    Sends a weak ETag; an unchanged roster answers If-None-Match with 304.
+    """
+    if request.user.role == 'admin':
+        branch = request.GET.get('branch', 'all').strip()
+        branches = None if branch in ('', 'all') else [branch]
+        roles = ('staff', 'manager')
+    elif request.user.role == 'manager':
+        # Managers only ever see their own branch's staff, as in manager_week_view
+        branches = [request.user.branch]
+        roles = ('staff',)
+    else:
+        return JsonResponse({'error': 'Access denied.'}, status=403)
+
+    try:
+        today = date.today()
+        start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date() if request.GET.get('start') \
+            else today - timedelta(days=today.weekday())
+        end = datetime.strptime(request.GET['end'], '%Y-%m-%d').date() if request.GET.get('end') \
+            else start + timedelta(days=6)
+    except ValueError:
+        return JsonResponse({'error': 'Dates must be YYYY-MM-DD.'}, status=400)
+
+    if end < start:
+        return JsonResponse({'error': 'End date cannot be before start date.'}, status=400)
+    if (end - start).days >= MAX_ROSTER_API_DAYS:
+        return JsonResponse({'error': f'At most {MAX_ROSTER_API_DAYS} days per request.'}, status=400)
+
+    staff = load_roster_staff(branches, roles)
+    etag = roster_etag(start, end, branches, staff)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    schedules = roster_schedules(start, end, branches).only(
+        'id', 'staff_id', 'date', 'shift_type', 'start_time', 'end_time', 'branch', 'notes',
+    )
+    roster = Roster(start, end, staff, list(schedules))
+
+    response = JsonResponse(roster_payload(roster), json_dumps_params={'separators': (',', ':')})
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,29 @@
+# task_management/management/commands/rebuild_branch_facts.py
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from task_management.utils.branch_facts import rebuild_facts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild BranchDailyFacts from closing reports and completed tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Number of days back from today to rebuild (default: 365)'
+        )
+
+    def handle(self, *args, **options):
+        end = date.today()
+        start = end - timedelta(days=options['days'])
+
+        self.stdout.write(f"📊 Rebuilding branch facts from {start} to {end}...")
+
+        written = rebuild_facts(start, end)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {written} branch-day row(s) written'))
@@ -0,0 +1,56 @@
+# task_management/management/commands/run_export_worker.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from task_management.utils.export_jobs import (
+    HOUSEKEEPING_INTERVAL, process_pending_jobs, purge_expired_jobs, requeue_stale_jobs,
+)
+from task_management.utils.report_pdfs import prerender_report_pdfs
+
+
+class Command(BaseCommand):
+    help = 'Render queued export jobs (PDF/Excel) in the background'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the current queue and exit instead of polling'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("📦 Export worker started")
+
+        last_housekeeping = 0
+        try:
+            while True:
+                if time.monotonic() - last_housekeeping >= HOUSEKEEPING_INTERVAL:
+                    requeued = requeue_stale_jobs()
+                    expired = purge_expired_jobs()
+                    if requeued or expired:
+                        self.stdout.write(f"🧹 {requeued} stale job(s) requeued, {expired} expired")
+                    last_housekeeping = time.monotonic()
+
+                processed = process_pending_jobs()
+                if processed:
+                    self.stdout.write(self.style.SUCCESS(f"✓ {processed} export(s) processed"))
+                else:
+                    # Requested exports first; closing report PDFs when idle
+                    processed = prerender_report_pdfs()
+                    if processed:
+                        self.stdout.write(self.style.SUCCESS(f"✓ {processed} closing report PDF(s) pre-rendered"))
+
+                if options['once']:
+                    break
+                if not processed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("👋 Export worker stopped")
@@ -0,0 +1,78 @@
+# task_management/management/commands/update_cat_ids.py
+# Re-key all existing cats to the CAT133001239 format in batches
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from task_management.models import Cat
+
+
+class Command(BaseCommand):
+    help = 'Regenerate every Cat ID in CAT133001239 format (batched bulk_update)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of cats re-keyed per bulk_update'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would change without saving'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+
+        total = Cat.objects.count()
+        if total == 0:
+            self.stdout.write(self.style.SUCCESS('✅ No cats in database to update!'))
+            return
+
+        self.stdout.write(f'Found {total} cat(s) to update{" (dry run)" if dry_run else ""}')
+
+        # Every ID currently in use - new IDs must not clash with any of them,
+        # including ones in batches that haven't been re-keyed yet
+        taken = set(Cat.objects.values_list('cat_id', flat=True))
+
+        updated = 0
+        with transaction.atomic():
+            batch = []
+            for cat in Cat.objects.order_by('id').only('id', 'cat_id').iterator(chunk_size=batch_size):
+                batch.append(cat)
+                if len(batch) >= batch_size:
+                    updated += self.rekey(batch, taken, dry_run)
+                    batch = []
+            if batch:
+                updated += self.rekey(batch, taken, dry_run)
+
+            if dry_run:
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🎉 {"Would update" if dry_run else "Updated"} {updated}/{total} cat IDs'
+        ))
+
+    def rekey(self, cats, taken, dry_run):
+        new_ids = Cat.reserve_cat_ids(len(cats))
+
+        # Replace the (very rare) clash with a fresh ID
+        for index, new_id in enumerate(new_ids):
+            while new_id in taken:
+                new_id = Cat.reserve_cat_ids(1)[0]
+            new_ids[index] = new_id
+            taken.add(new_id)
+
+        for cat, new_id in zip(cats, new_ids):
+            if self.verbosity >= 2:
+                self.stdout.write(f'  {cat.cat_id} → {new_id}')
+            cat.cat_id = new_id
+
+        if not dry_run:
+            Cat.objects.bulk_update(cats, ['cat_id'])
+
+        self.stdout.write(f'  ✓ Re-keyed batch of {len(cats)}')
+        return len(cats)
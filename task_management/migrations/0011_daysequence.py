@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0010_pendingbooking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DaySequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=30, unique=True)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['key'],
+            },
+        ),
+    ]
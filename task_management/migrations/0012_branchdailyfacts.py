@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:11
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0011_daysequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BranchDailyFacts',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('has_report', models.BooleanField(default=False)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('customers', models.IntegerField(default=0)),
+                ('grooming_count', models.IntegerField(default=0)),
+                ('boarding_count', models.IntegerField(default=0)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('task_points', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Branch Daily Facts',
+                'verbose_name_plural': 'Branch Daily Facts',
+                'ordering': ['branch', 'date'],
+                'indexes': [models.Index(fields=['date', 'branch'], name='task_manage_date_c4d255_idx')],
+                'unique_together': {('branch', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0013_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClosingReportPdf',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('content', models.BinaryField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('rendered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pdf_artifact', to='task_management.closingreport')),
+            ],
+        ),
+    ]
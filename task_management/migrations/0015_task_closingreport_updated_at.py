@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:51
+
+from django.db import migrations, models
+from django.db.models import DateTimeField
+from django.db.models.functions import Coalesce, Greatest
+
+
+def latest(*fields):
+    first = fields[0]
+    return Greatest(*[Coalesce(field, first) for field in fields], output_field=DateTimeField())
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Start from the change time bulk exports used before this column, so
+    # the first incremental pull doesn't re-send every row
+    Task = apps.get_model('task_management', 'Task')
+    ClosingReport = apps.get_model('task_management', 'ClosingReport')
+    Task.objects.update(
+        updated_at=latest('created_at', 'assigned_date', 'started_at', 'completed_at', 'approved_at')
+    )
+    ClosingReport.objects.update(updated_at=latest('created_at', 'submitted_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0014_closingreportpdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='closingreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:20
+
+from django.db import migrations
+
+
+def backfill_branch_facts(apps, schema_editor):
+    # BranchDailyFacts is only kept current from the moment it exists;
+    # fill in every day that already has closing reports or completed tasks
+    from task_management.utils.branch_facts import rebuild_facts
+
+    rebuild_facts(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0015_task_closingreport_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_branch_facts, migrations.RunPython.noop),
+    ]
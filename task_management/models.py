@@ -6,11 +6,108 @@ from django.utils import timezone
 from datetime import date
 from decimal import Decimal
 import uuid
-import random
 from django.db import models
 from django.conf import settings
 import json
-from django.db import transaction
+from django.db import transaction, connection, IntegrityError
+# ============================================
+# ID SEQUENCES
+# ============================================
+
+class DaySequence(models.Model):
+    """
+    Counters behind the business IDs (PKG-YYMMDD-NNNN, TSK-..., GRP001, ...).
+    One row per key, e.g. 'TSK-251218' for a day or 'GRP' for a global
+    counter. Numbers are handed out with a single UPDATE ... RETURNING, so
+    concurrent inserts never get the same number.
+    """
+    key = models.CharField(max_length=30, unique=True)
+    last_value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['key']
+    
+    def __str__(self):
+        return f"{self.key} = {self.last_value}"
+    
+    @classmethod
+    def allocate(cls, key, count=1, seed=None):
+        """
+        Reserve `count` consecutive numbers for `key` and return the first.
+        
+        `seed` is an optional callable returning the last number already in
+        use; it only runs the first time a key is seen, so existing rows
+        (e.g. created before the sequence existed) are never re-issued.
+        """
+        qn = connection.ops.quote_name
+        table, key_col, value_col = qn(cls._meta.db_table), qn('key'), qn('last_value')
+        
+        if connection.vendor in ('postgresql', 'sqlite'):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET {value_col} = {value_col} + %s "
+                    f"WHERE {key_col} = %s RETURNING {value_col}",
+                    [count, key]
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    start = seed() if seed else 0
+                    cursor.execute(
+                        f"INSERT INTO {table} ({key_col}, {value_col}) VALUES (%s, %s) "
+                        f"ON CONFLICT ({key_col}) DO UPDATE SET {value_col} = {table}.{value_col} + %s "
+                        f"RETURNING {value_col}",
+                        [key, start + count, count]
+                    )
+                    row = cursor.fetchone()
+            return row[0] - count + 1
+        
+        # Other backends: lock the counter row instead
+        with transaction.atomic():
+            sequence = cls.objects.select_for_update().filter(key=key).first()
+            if sequence is None:
+                try:
+                    with transaction.atomic():
+                        sequence = cls.objects.create(key=key, last_value=seed() if seed else 0)
+                except IntegrityError:
+                    sequence = cls.objects.select_for_update().get(key=key)
+            sequence.last_value += count
+            sequence.save(update_fields=['last_value'])
+            return sequence.last_value - count + 1
+
+
+def next_daily_ids(prefix, model, field, count=1, day=None):
+    """
+    Return `count` new IDs like PKG-251218-0001 for today (or `day`).
+    Pass count > 1 to reserve a block for bulk inserts.
+    """
+    day = day or date.today()
+    key = f"{prefix}-{day.strftime('%y%m%d')}"
+    
+    def seed():
+        last = model.objects.filter(
+            **{f'{field}__startswith': f'{key}-'}
+        ).order_by(f'-{field}').values_list(field, flat=True).first()
+        return int(last.rsplit('-', 1)[1]) if last else 0
+    
+    first = DaySequence.allocate(key, count, seed=seed)
+    return [f"{key}-{num:04d}" for num in range(first, first + count)]
+
+
+def next_sequential_id(prefix, model, field, width):
+    """Return the next global ID like GRP001 / TT001 / CUST0001"""
+    def seed():
+        numbers = [
+            int(value[len(prefix):])
+            for value in model.objects.filter(
+                **{f'{field}__startswith': prefix}
+            ).values_list(field, flat=True)
+            if value[len(prefix):].isdigit()
+        ]
+        return max(numbers, default=0)
+    
+    return f"{prefix}{DaySequence.allocate(prefix, seed=seed):0{width}d}"
+
+
 # ============================================
 # CUSTOMER & CAT MODELS
 # ============================================
@@ -41,11 +138,7 @@ class Customer(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.customer_id:
-            last = Customer.objects.all().order_by('id').last()
-            if last and last.customer_id:
-                self.customer_id = f"CUST{int(last.customer_id[4:]) + 1:04d}"
-            else:
-                self.customer_id = "CUST0001"
+            self.customer_id = next_sequential_id('CUST', Customer, 'customer_id', 4)
         super().save(*args, **kwargs)
 
 
@@ -139,52 +232,69 @@ class Cat(models.Model):
     def __str__(self):
         return f"{self.cat_id} - {self.name} ({self.owner.name})"
     
-    def generate_cat_id(self):
+    # The two "random" blocks are a bijective scramble of the sequence
+    # number, so IDs stay unique past 999 cats without any lookup
+    ID_PAIR_SPACE = 900 * 900
+    ID_PAIR_MULTIPLIER = 7919      # coprime with ID_PAIR_SPACE
+    ID_COUNT_MULTIPLIER = 104729
+    ID_PAIR_OFFSET = 133239
+    
+    @classmethod
+    def format_cat_id(cls, number):
         """
-        Generate Cat ID in format: CAT133001239
+        Turn a sequence number into a Cat ID: CAT133001239
         
         Format:
         - CAT = Prefix (3 chars)
-        - 133 = Random (3 digits: 100-999)
-        - 001 = Sequential count (3 digits with leading zeros)
-        - 239 = Random (3 digits: 100-999)
+        - 133 = Scrambled (3 digits: 100-999)
+        - 001 = Sequential count (3 digits, number mod 1000)
+        - 239 = Scrambled (3 digits: 100-999)
         
-        Total: 12 characters
-        Example: CAT133001239
+        Every number below 810,000,000 maps to a different ID.
         """
+        epoch, count = divmod(number, 1000)
+        pair = (
+            epoch * cls.ID_PAIR_MULTIPLIER
+            + count * cls.ID_COUNT_MULTIPLIER
+            + cls.ID_PAIR_OFFSET
+        ) % cls.ID_PAIR_SPACE
+        first, last = divmod(pair, 900)
+        return f"CAT{first + 100}{count:03d}{last + 100}"
+    
+    @classmethod
+    def reserve_cat_ids(cls, count):
+        """Reserve `count` new Cat IDs from the CAT sequence (one query)"""
         from django.db.models import Max
         
-        # Get sequential count based on database ID
-        last_cat = Cat.objects.aggregate(Max('id'))
-        count = (last_cat['id__max'] or 0) + 1
-        
-        # Format count with 3 digits (leading zeros)
-        count_str = str(count).zfill(3)
+        def seed():
+            return Cat.objects.aggregate(Max('id'))['id__max'] or 0
         
-        # Generate random parts (3 digits each: 100-999)
-        random_part1 = str(random.randint(100, 999))
-        random_part2 = str(random.randint(100, 999))
-        
-        # Combine: CAT + random1 + count + random2
-        cat_id = f"CAT{random_part1}{count_str}{random_part2}"
-        
-        # Ensure uniqueness (retry if duplicate - very rare)
-        max_attempts = 10
-        attempts = 0
-        
-        while Cat.objects.filter(cat_id=cat_id).exists() and attempts < max_attempts:
-            random_part1 = str(random.randint(100, 999))
-            random_part2 = str(random.randint(100, 999))
-            cat_id = f"CAT{random_part1}{count_str}{random_part2}"
-            attempts += 1
-        
-        return cat_id
+        start = DaySequence.allocate('CAT', count, seed=seed)
+        return [cls.format_cat_id(number) for number in range(start, start + count)]
+    
+    def generate_cat_id(self):
+        """Generate Cat ID in format: CAT133001239"""
+        return self.reserve_cat_ids(1)[0]
     
     def save(self, *args, **kwargs):
         """Override save to auto-generate cat_id"""
-        if not self.cat_id:
+        if self.cat_id:
+            return super().save(*args, **kwargs)
+        
+        # New IDs can only clash with pre-sequence random IDs - very rare,
+        # so insert optimistically and take the next number if it happens
+        for attempt in range(3):
             self.cat_id = self.generate_cat_id()
-        super().save(*args, **kwargs)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Only a taken cat_id is worth another number; FK/NOT NULL
+                # and other violations go straight back to the caller
+                clash = Cat.objects.filter(cat_id=self.cat_id).exists()
+                if not clash or attempt == 2:
+                    self.cat_id = ''
+                    raise
 
 
 # ============================================
@@ -243,13 +353,7 @@ class ServiceRequest(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.request_id:
-            today = date.today()
-            date_str = today.strftime('%y%m%d')
-            today_count = ServiceRequest.objects.filter(
-                created_at__date=today
-            ).count()
-            seq_num = str(today_count + 1).zfill(4)
-            self.request_id = f"SR-{date_str}-{seq_num}"
+            self.request_id = next_daily_ids('SR', ServiceRequest, 'request_id')[0]
         super().save(*args, **kwargs)
 
 
@@ -274,11 +378,7 @@ class TaskGroup(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.group_id:
-            last = TaskGroup.objects.all().order_by('id').last()
-            if last and last.group_id:
-                self.group_id = f"GRP{int(last.group_id[3:]) + 1:03d}"
-            else:
-                self.group_id = "GRP001"
+            self.group_id = next_sequential_id('GRP', TaskGroup, 'group_id', 3)
         super().save(*args, **kwargs)
 
 
@@ -322,12 +422,7 @@ class TaskType(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.task_type_id:
-            last = TaskType.objects.all().order_by('id').last()
-            if last and last.task_type_id:
-                num = int(last.task_type_id.replace('TT', ''))
-                self.task_type_id = f"TT{num + 1:03d}"
-            else:
-                self.task_type_id = "TT001"
+            self.task_type_id = next_sequential_id('TT', TaskType, 'task_type_id', 3)
         super().save(*args, **kwargs)
 
 
@@ -483,11 +578,7 @@ class TaskPackage(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.package_id:
-            today = date.today()
-            date_str = today.strftime('%y%m%d')
-            today_count = TaskPackage.objects.filter(created_at__date=today).count()
-            seq_num = str(today_count + 1).zfill(4)
-            self.package_id = f"PKG-{date_str}-{seq_num}"
+            self.package_id = next_daily_ids('PKG', TaskPackage, 'package_id')[0]
         
         # Auto-set scheduled_date from first task if not set
         if not self.scheduled_date and self.pk:
@@ -510,46 +601,22 @@ class TaskPackage(models.Model):
         if self.points_awarded:
             return False  # Already awarded
         
-        # Award points to staff
-        from performance.models import DailyPoints, MonthlyIncentive
-        from decimal import Decimal
+        from performance import ledger
         
         try:
-            # Create/update daily points
-            daily_points, created = DailyPoints.objects.get_or_create(
-                user=self.created_by,
-                date=self.created_at.date(),
-                defaults={
-                    'points': Decimal('0.00'),
-                    'booking_points': Decimal('0.00'),
-                }
-            )
-            
-            daily_points.booking_points += Decimal(str(self.total_points))
-            daily_points.points = (
-                daily_points.grooming_points +
-                daily_points.service_points +
-                daily_points.booking_points +
-                daily_points.bonus_points
-            )
-            daily_points.save()
-            
-            # Update monthly incentive
-            first_day = self.created_at.date().replace(day=1)
-            monthly, created = MonthlyIncentive.objects.get_or_create(
-                user=self.created_by,
-                month=first_day,
-                defaults={'total_points': Decimal('0.00')}
-            )
-            monthly.total_points += Decimal(str(self.total_points))
-            if hasattr(monthly, 'calculate_incentive'):
-                monthly.calculate_incentive()
-            monthly.save()
-            
-            # Mark as awarded
-            self.points_awarded = True
-            self.points_awarded_at = timezone.now()
-            self.save()
+            with transaction.atomic():
+                # Claim the award first so a double submit can't pay twice
+                if not self._claim_points_award():
+                    return False
+                
+                ledger.award_points(
+                    self.created_by,
+                    self.total_points,
+                    'booking',
+                    'package_award',
+                    on_date=self.created_at.date(),
+                    reference=self.package_id,
+                )
             
             return True
             
@@ -597,58 +664,34 @@ class TaskPackage(models.Model):
         if self.booking_type == 'type_b':
             return False  # Combo packages don't get points
         
-        # Award points to staff
-        from performance.models import DailyPoints, MonthlyIncentive
-        from decimal import Decimal
+        from performance import ledger
         
         try:
             # Award points on the scheduled date (when service happens)
             award_date = self.scheduled_date or self.created_at.date()
             
-            daily_points, created = DailyPoints.objects.get_or_create(
-                user=self.created_by,
-                date=award_date,
-                defaults={
-                    'points': Decimal('0.00'),
-                    'booking_points': Decimal('0.00'),
-                }
-            )
-            
-            daily_points.booking_points += Decimal(str(self.total_points))
-            daily_points.points = (
-                daily_points.grooming_points +
-                daily_points.service_points +
-                daily_points.booking_points +
-                daily_points.bonus_points
-            )
-            daily_points.save()
-            
-            # Update monthly
-            first_day = award_date.replace(day=1)
-            monthly, created = MonthlyIncentive.objects.get_or_create(
-                user=self.created_by,
-                month=first_day,
-                defaults={'total_points': Decimal('0.00')}
-            )
-            monthly.total_points += Decimal(str(self.total_points))
-            if hasattr(monthly, 'calculate_incentive'):
-                monthly.calculate_incentive()
-            monthly.save()
-            
-            # Mark as awarded
-            self.points_awarded = True
-            self.points_awarded_at = timezone.now()
-            self.save()
+            with transaction.atomic():
+                if not self._claim_points_award():
+                    return False
+                
+                ledger.award_points(
+                    self.created_by,
+                    self.total_points,
+                    'booking',
+                    'package_release',
+                    on_date=award_date,
+                    reference=self.package_id,
+                )
             
             # Create notification
-            from task_management.models import Notification
-            Notification.objects.create(
-                user=self.created_by,
-                notification_type='points_awarded',
-                title='Points Released!',
-                message=f'{self.total_points} points released for {self.package_id} - Customer arrived',
-                link=f'/registration/dashboard/'
-            )
+            if self.created_by:
+                Notification.objects.create(
+                    user=self.created_by,
+                    notification_type='points_awarded',
+                    title='Points Released!',
+                    message=f'{self.total_points} points released for {self.package_id} - Customer arrived',
+                    link=f'/registration/dashboard/'
+                )
             
             return True
             
@@ -656,6 +699,22 @@ class TaskPackage(models.Model):
             print(f"Error releasing points: {e}")
             return False
     
+    def _claim_points_award(self):
+        """
+        Atomically flip points_awarded from False to True.
+        Returns False if another request already awarded this package.
+        """
+        now = timezone.now()
+        claimed = TaskPackage.objects.filter(
+            pk=self.pk,
+            points_awarded=False
+        ).update(points_awarded=True, points_awarded_at=now, updated_at=now)
+        
+        if claimed:
+            self.points_awarded = True
+            self.points_awarded_at = now
+        return bool(claimed)
+    
     def get_booking_type_display_with_icon(self):
         """Get display text with icon for booking type"""
         icons = {
@@ -786,11 +845,7 @@ class ComboPackageOwnership(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.ownership_id:
-            today = date.today()
-            count = ComboPackageOwnership.objects.filter(
-                purchased_at__date=today
-            ).count() + 1
-            self.ownership_id = f"COMBO-{today.strftime('%y%m%d')}-{count:04d}"
+            self.ownership_id = next_daily_ids('COMBO', ComboPackageOwnership, 'ownership_id')[0]
         
         # Auto-calculate remaining sessions
         self.sessions_remaining = self.total_sessions - self.sessions_used
@@ -868,6 +923,7 @@ class Task(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['scheduled_date', 'scheduled_time']
@@ -875,18 +931,35 @@ class Task(models.Model):
     def __str__(self):
         return f"{self.task_id} - {self.task_type.name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored completion so save() can keep BranchDailyFacts current
+        instance._stored_completion = (instance.__dict__.get('status'), instance.__dict__.get('completed_at'))
+        return instance
+    
     def save(self, *args, **kwargs):
+        from .utils.branch_facts import record_task_completion
+        
         if not self.task_id:
-            today = date.today()
-            date_str = today.strftime('%y%m%d')
-            today_count = Task.objects.filter(created_at__date=today).count()
-            seq_num = str(today_count + 1).zfill(4)
-            self.task_id = f"TSK-{date_str}-{seq_num}"
+            self.task_id = next_daily_ids('TSK', Task, 'task_id')[0]
         
         if not self.points and self.task_type:
             self.points = self.task_type.points
         
-        super().save(*args, **kwargs)
+        stored_status, stored_completed_at = getattr(self, '_stored_completion', (None, None))
+        was_completed = stored_status == 'completed'
+        is_completed = self.status == 'completed'
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            if is_completed and not was_completed:
+                record_task_completion(self, self.completed_at)
+            elif was_completed and not is_completed:
+                record_task_completion(self, stored_completed_at, undo=True)
+        
+        self._stored_completion = (self.status, self.completed_at)
 
 
 # ============================================
@@ -923,36 +996,32 @@ class TaskCompletion(models.Model):
         if self.points_awarded > 0:
             return
         
-        self.points_awarded = self.task.points
-        self.points_awarded_at = timezone.now()
-        self.save()
+        from performance import ledger
         
-        try:
-            from performance.models import DailyPoints, MonthlyIncentive
-            daily_points, created = DailyPoints.objects.get_or_create(
-                user=self.completed_by,
-                date=self.completed_at.date(),
-                defaults={
-                    'points': Decimal('0.00'),
-                    'service_points': Decimal('0.00'),
-                }
-            )
-            daily_points.service_points += Decimal(str(self.points_awarded))
-            daily_points.points += Decimal(str(self.points_awarded))
-            daily_points.save()
+        points = self.task.points
+        now = timezone.now()
+        
+        with transaction.atomic():
+            # Conditional update so a double submit can't award twice
+            claimed = TaskCompletion.objects.filter(
+                pk=self.pk,
+                points_awarded=0
+            ).update(points_awarded=points, points_awarded_at=now)
             
-            first_day = self.completed_at.date().replace(day=1)
-            monthly, created = MonthlyIncentive.objects.get_or_create(
-                user=self.completed_by,
-                month=first_day,
-                defaults={'total_points': Decimal('0.00')}
+            if not claimed:
+                return
+            
+            self.points_awarded = points
+            self.points_awarded_at = now
+            
+            ledger.award_points(
+                self.completed_by,
+                points,
+                'service',
+                'task_completion',
+                on_date=self.completed_at.date(),
+                reference=self.task.task_id,
             )
-            monthly.total_points += Decimal(str(self.points_awarded))
-            if hasattr(monthly, 'calculate_incentive'):
-                monthly.calculate_incentive()
-            monthly.save()
-        except ImportError:
-            pass
 
 
 # ============================================
@@ -1056,11 +1125,7 @@ class PointRequest(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.request_id:
-            today = date.today()
-            count = PointRequest.objects.filter(
-                created_at__date=today
-            ).count() + 1
-            self.request_id = f"PR-{today.strftime('%y%m%d')}-{count:04d}"
+            self.request_id = next_daily_ids('PR', PointRequest, 'request_id')[0]
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -1069,7 +1134,7 @@ class PointRequest(models.Model):
     
     def approve(self, admin_user, notes='', awarded_points=None):
         """Approve request and award points on the date_completed"""
-        from performance.models import DailyPoints, MonthlyIncentive
+        from performance import ledger
         
         self.approval_status = 'approved'
         self.approved_by = admin_user
@@ -1082,39 +1147,18 @@ class PointRequest(models.Model):
             self.points_awarded = self.points_requested
         
         self.points_awarded_at = timezone.now()
-        self.save()
         
-        daily_points, created = DailyPoints.objects.get_or_create(
-            user=self.staff,
-            date=self.date_completed,
-            defaults={
-                'points': Decimal('0.00'),
-                'grooming_points': Decimal('0.00'),
-                'service_points': Decimal('0.00'),
-                'booking_points': Decimal('0.00'),
-                'bonus_points': Decimal('0.00'),
-            }
-        )
-        
-        daily_points.bonus_points += self.points_awarded
-        daily_points.points = (
-            daily_points.grooming_points +
-            daily_points.service_points +
-            daily_points.booking_points +
-            daily_points.bonus_points
-        )
-        daily_points.save()
-        
-        first_day = self.date_completed.replace(day=1)
-        monthly, created = MonthlyIncentive.objects.get_or_create(
-            user=self.staff,
-            month=first_day,
-            defaults={'total_points': Decimal('0.00')}
-        )
-        monthly.total_points += self.points_awarded
-        if hasattr(monthly, 'calculate_incentive'):
-            monthly.calculate_incentive()
-        monthly.save()
+        with transaction.atomic():
+            self.save()
+            
+            ledger.award_points(
+                self.staff,
+                self.points_awarded,
+                'bonus',
+                'point_request',
+                on_date=self.date_completed,
+                reference=self.request_id,
+            )
     
     def reject(self, admin_user, notes=''):
         """Reject request"""
@@ -1266,6 +1310,7 @@ class ClosingReport(models.Model):
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     submitted_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     # Calculated fields
     revenue_total = models.DecimalField(
@@ -1286,27 +1331,41 @@ class ClosingReport(models.Model):
     def __str__(self):
         return f"{self.report_id} - {self.branch} - {self.date}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored branch/day so save() can clear it if the report moves
+        instance._stored_key = (instance.__dict__.get('branch'), instance.__dict__.get('date'))
+        return instance
+    
     def save(self, *args, **kwargs):
+        from .utils.branch_facts import clear_closing_report, record_closing_report
+        
         if not self.report_id:
             self.report_id = self.generate_report_id()
         self.revenue_total = (self.payment_record_amount + self.payment_receipt_amount) / 2
-        super().save(*args, **kwargs)
+        
+        stored_key = getattr(self, '_stored_key', None)
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if stored_key and None not in stored_key and stored_key != (self.branch, self.date):
+                clear_closing_report(*stored_key)
+            record_closing_report(self)
+        
+        self._stored_key = (self.branch, self.date)
+    
+    def delete(self, *args, **kwargs):
+        from .utils.branch_facts import clear_closing_report
+        
+        with transaction.atomic():
+            stored_key = getattr(self, '_stored_key', None)
+            clear_closing_report(*(stored_key if stored_key and None not in stored_key else (self.branch, self.date)))
+            return super().delete(*args, **kwargs)
     
     def generate_report_id(self):
         """Generate unique report ID: CR-YYMMDD-XXXX"""
-        today = date.today()
-        prefix = f"CR-{today.strftime('%y%m%d')}"
-        last_report = ClosingReport.objects.filter(
-            report_id__startswith=prefix
-        ).order_by('report_id').last()
-        
-        if last_report:
-            last_sequence = int(last_report.report_id.split('-')[-1])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-        
-        return f"{prefix}-{new_sequence:04d}"
+        return next_daily_ids('CR', ClosingReport, 'report_id')[0]
     
     @property
     def payment_difference(self):
@@ -1336,6 +1395,42 @@ class ClosingReport(models.Model):
             return 'success'
 
 
+class BranchDailyFacts(models.Model):
+    """
+    One row per branch per day for the analytics dashboards.
+    Closing report figures are copied in on ClosingReport save; task
+    completions and their points are incremented as tasks complete.
+    Rebuild with `manage.py rebuild_branch_facts`.
+    """
+    branch = models.CharField(max_length=50)
+    date = models.DateField()
+    
+    # From the day's ClosingReport
+    has_report = models.BooleanField(default=False)
+    revenue = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    customers = models.IntegerField(default=0)
+    grooming_count = models.IntegerField(default=0)
+    boarding_count = models.IntegerField(default=0)
+    
+    # From completed tasks
+    tasks_completed = models.IntegerField(default=0)
+    task_points = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['branch', 'date']
+        unique_together = ['branch', 'date']
+        verbose_name = 'Branch Daily Facts'
+        verbose_name_plural = 'Branch Daily Facts'
+        indexes = [
+            models.Index(fields=['date', 'branch']),
+        ]
+    
+    def __str__(self):
+        return f"{self.branch} - {self.date}"
+
+
 class AuditLog(models.Model):
     """Track all admin actions for accountability"""
     
@@ -1522,11 +1617,7 @@ class PendingBooking(models.Model):
     def save(self, *args, **kwargs):
         # Generate booking ID
         if not self.booking_id:
-            today = date.today()
-            count = PendingBooking.objects.filter(
-                created_at__date=today
-            ).count() + 1
-            self.booking_id = f"PB-{today.strftime('%y%m%d')}-{count:04d}"
+            self.booking_id = next_daily_ids('PB', PendingBooking, 'booking_id')[0]
         
         # Set branch from user
         if self.created_by and not self.branch:
@@ -1568,17 +1659,18 @@ class PendingBooking(models.Model):
         try:
             with transaction.atomic():
                 # Get selected tasks
-                tasks = self.get_selected_tasks()
+                tasks = list(self.get_selected_tasks())
                 
                 if not tasks:
                     return False, None, "No tasks selected"
                 
-                # Calculate task points (for display, NOT for awarding now!)
-                task_points_total = sum(task.points for task in tasks)
+                # ✅ Create TaskPackage with payment proof, plus its tasks
+                # (task points will be awarded when completed)
+                from task_management.utils.package_builder import PackageBuilder
                 
-                # ✅ Create TaskPackage with payment proof
-                task_package = TaskPackage.objects.create(
-                    cat=self.cat,
+                builder = PackageBuilder()
+                task_package = builder.add_package(
+                    self.cat,
                     created_by=self.created_by,
                     status='pending',
                     notes=self.notes or f'Converted from {self.booking_id}',
@@ -1588,58 +1680,24 @@ class PendingBooking(models.Model):
                     scheduled_date=self.scheduled_date,
                     arrival_status='arrived',
                     points_awarded=False,  # Task points NOT awarded yet!
-                    total_points=task_points_total,  # Store for reference
                 )
-                
-                # ✅ Create individual tasks (points will be awarded when completed)
-                for task_type in tasks:
-                    Task.objects.create(
-                        package=task_package,
-                        task_type=task_type,
-                        points=task_type.points,
-                        scheduled_date=self.scheduled_date,
-                        scheduled_time=self.scheduled_time,
-                        status='pending',
-                    )
+                builder.add_tasks(task_package, tasks, self.scheduled_date, self.scheduled_time)
+                builder.save()
                 
                 # ✅✅✅ AWARD 2 POINTS FOR BOOKING CONFIRMATION!
-                from performance.models import DailyPoints, MonthlyIncentive
-                from decimal import Decimal
+                from performance import ledger
                 
                 try:
-                    # Award 2 points for booking confirmation
-                    award_date = timezone.now().date()
-                    
-                    daily_points, created = DailyPoints.objects.get_or_create(
-                        user=self.created_by,
-                        date=award_date,
-                        defaults={
-                            'points': Decimal('0.00'),
-                            'booking_points': Decimal('0.00'),
-                        }
-                    )
-                    
-                    # Add 2 points for booking confirmation
-                    daily_points.booking_points += Decimal('2.00')
-                    daily_points.points = (
-                        daily_points.grooming_points +
-                        daily_points.service_points +
-                        daily_points.booking_points +
-                        daily_points.bonus_points
-                    )
-                    daily_points.save()
-                    
-                    # Update monthly
-                    first_day = award_date.replace(day=1)
-                    monthly, created = MonthlyIncentive.objects.get_or_create(
-                        user=self.created_by,
-                        month=first_day,
-                        defaults={'total_points': Decimal('0.00')}
-                    )
-                    monthly.total_points += Decimal('2.00')
-                    if hasattr(monthly, 'calculate_incentive'):
-                        monthly.calculate_incentive()
-                    monthly.save()
+                    # Savepoint so a failed award doesn't roll back the conversion
+                    with transaction.atomic():
+                        ledger.award_points(
+                            self.created_by,
+                            Decimal('2.00'),
+                            'booking',
+                            'booking_confirmation',
+                            on_date=timezone.now().date(),
+                            reference=self.booking_id,
+                        )
                     
                 except Exception as e:
                     print(f"Error awarding booking confirmation points: {e}")
@@ -1694,3 +1752,95 @@ class PendingBooking(models.Model):
             self.save()
             return True
         return False
+
+
+# ============================================
+# BACKGROUND EXPORTS
+# ============================================
+
+class ExportJob(models.Model):
+    """
+    A PDF/Excel export rendered outside the request by the export worker.
+    The finished file is kept in the database (so web and worker processes
+    don't need shared disk) until `expires_at`.
+    """
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),
+    ]
+    
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict)
+    params_hash = models.CharField(max_length=64, db_index=True)
+    
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='export_jobs'
+    )
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    # Result
+    filename = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    content = models.BinaryField(null=True, blank=True, editable=False)
+    size = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['kind', 'params_hash', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.job_id} ({self.status})"
+    
+    @property
+    def is_ready(self):
+        return self.status == 'done' and (self.expires_at is None or self.expires_at > timezone.now())
+    
+    def can_access(self, user):
+        """Requester, admins, and managers of the branch the export covers"""
+        if user.role == 'admin' or self.requested_by_id == user.id:
+            return True
+        return user.role == 'manager' and self.params.get('branch') == user.branch
+
+
+class ClosingReportPdf(models.Model):
+    """
+    The rendered PDF of a ClosingReport, produced in the background after
+    the report is saved. `source_hash` fingerprints the report fields the
+    PDF shows, so the artifact is only re-rendered when those change;
+    `content_hash` (sha256 of the PDF) is the download ETag.
+    """
+    
+    report = models.OneToOneField(
+        ClosingReport,
+        on_delete=models.CASCADE,
+        related_name='pdf_artifact'
+    )
+    source_hash = models.CharField(max_length=64)
+    content_hash = models.CharField(max_length=64)
+    content = models.BinaryField(editable=False)
+    size = models.PositiveIntegerField(default=0)
+    rendered_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"PDF for {self.report_id} ({self.content_hash[:12]})"
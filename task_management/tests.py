@@ -1,3 +1,107 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Cat, Customer, DaySequence, Task, TaskGroup, TaskPackage, TaskType
+from .utils.package_builder import PackageBuilder
+
+
+class PackageBuilderTests(TestCase):
+    CATS = 3
+    TASK_TYPES = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='builder', password='x')
+        owner = Customer.objects.create(name='Owner', phone='0120000000', ic_number='900101-01-0001')
+        cls.cats = [
+            Cat.objects.create(name=f'Cat {n}', owner=owner, gender='female', age=2)
+            for n in range(cls.CATS)
+        ]
+        group = TaskGroup.objects.create(name='Grooming')
+        cls.task_types = [
+            TaskType.objects.create(group=group, name=f'Service {n}', points=n + 1)
+            for n in range(cls.TASK_TYPES)
+        ]
+        cls.day = date.today()
+
+    def build(self, cats, task_types):
+        builder = PackageBuilder()
+        for cat in cats:
+            package = builder.add_package(cat, created_by=self.user)
+            builder.add_tasks(package, task_types, self.day, '10:00')
+        return builder.save()
+
+    def test_query_count_does_not_grow_with_cats_or_tasks(self):
+        # The first booking of the day also seeds the PKG/TSK counters
+        self.build(self.cats[:1], self.task_types[:1])
+
+        # savepoint, PKG block, package insert, TSK block, task insert, release
+        with self.assertNumQueries(6):
+            self.build(self.cats[:1], self.task_types[:1])
+        with self.assertNumQueries(6):
+            self.build(self.cats, self.task_types)
+
+    def test_ids_are_consecutive_for_the_day(self):
+        packages = self.build(self.cats, self.task_types)
+
+        stamp = self.day.strftime('%y%m%d')
+        self.assertEqual(
+            [package.package_id for package in packages],
+            [f'PKG-{stamp}-{n:04d}' for n in range(1, self.CATS + 1)]
+        )
+        self.assertEqual(
+            list(Task.objects.order_by('task_id').values_list('task_id', flat=True)),
+            [f'TSK-{stamp}-{n:04d}' for n in range(1, self.CATS * self.TASK_TYPES + 1)]
+        )
+
+        # The next booking carries on from the reserved block
+        more = self.build(self.cats[:1], self.task_types[:1])
+        self.assertEqual(more[0].package_id, f'PKG-{stamp}-{self.CATS + 1:04d}')
+
+    def test_total_points_and_tasks_per_package(self):
+        self.build(self.cats, self.task_types)
+
+        expected_points = sum(task_type.points for task_type in self.task_types)
+        self.assertEqual(TaskPackage.objects.count(), self.CATS)
+        for package in TaskPackage.objects.all():
+            self.assertEqual(package.total_points, expected_points)
+            self.assertEqual(package.scheduled_date, self.day)
+            self.assertEqual(
+                sorted(package.tasks.values_list('task_type_id', flat=True)),
+                sorted(task_type.id for task_type in self.task_types)
+            )
+
+
+class CatIdTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = Customer.objects.create(name='Owner', phone='0120000001', ic_number='900101-01-0002')
+
+    def new_cat(self, **fields):
+        return Cat(owner=self.owner, name='Mochi', gender='male', age=1, **fields)
+
+    def test_taken_id_moves_on_to_the_next_number(self):
+        DaySequence.objects.create(key='CAT', last_value=10)
+        # A pre-sequence cat already holds the number the sequence hands out next
+        taken = self.new_cat(cat_id=Cat.format_cat_id(11))
+        taken.save()
+
+        cat = self.new_cat()
+        cat.save()
+
+        self.assertEqual(cat.cat_id, Cat.format_cat_id(12))
+
+    def test_other_integrity_errors_are_not_retried(self):
+        DaySequence.objects.create(key='CAT', last_value=10)
+        cat = self.new_cat()
+        cat.name = None
+
+        with self.assertRaises(IntegrityError):
+            cat.save()
+
+        # One number spent, and the failed save leaves no half-set ID behind
+        self.assertEqual(DaySequence.objects.get(key='CAT').last_value, 11)
+        self.assertEqual(cat.cat_id, '')
@@ -72,6 +72,25 @@ urlpatterns = [
     path('admin/closing-reports/export/', 
          views.export_reports_excel, 
          name='export_reports_excel'),
+    path('admin/exports/<str:dataset>/excel/', 
+         views.export_dataset_excel, 
+         name='export_dataset_excel'),
+    path('admin/exports/<str:table>/bulk/', 
+         views.bulk_export, 
+         name='bulk_export'),
+    
+    # ============================================
+    # BACKGROUND EXPORT JOBS
+    # ============================================
+    path('exports/jobs/<uuid:job_id>/', 
+         views.export_job_detail, 
+         name='export_job_detail'),
+    path('exports/jobs/<uuid:job_id>/status/', 
+         views.export_job_status, 
+         name='export_job_status'),
+    path('exports/jobs/<uuid:job_id>/download/', 
+         views.export_job_download, 
+         name='export_job_download'),
     # ============================================
     # MANAGE TASKS - Task Types & Groups
     # ============================================
@@ -8,6 +8,7 @@ from task_management.models import (
     Customer, Cat, TaskPackage, Task, TaskType, Notification
 )
 from accounts.models import User
+from task_management.utils.package_builder import PackageBuilder
 
 
 def create_booking_from_email(email_data, parsed_data):
@@ -71,9 +72,10 @@ def create_booking_from_email(email_data, parsed_data):
             
             result['cat_id'] = cat.cat_id
             branch = parsed_data.get('branch', 'Damansara_Perdana')
-            # 3. Create TaskPackage
-            package = TaskPackage.objects.create(
-                cat=cat,
+            # 3. Queue TaskPackage (written together with its tasks below)
+            builder = PackageBuilder()
+            package = builder.add_package(
+                cat,
                 created_by=None,  # System-generated
                 status='pending',
                 branch=branch,
@@ -85,8 +87,6 @@ Date: {email_data.get('date', 'N/A')}
 {parsed_data.get('special_notes', '')}"""
             )
             
-            result['package_id'] = package.package_id
-            
             # 4. Create Tasks from services
             scheduled_date = parsed_data.get('preferred_date')
             if scheduled_date and isinstance(scheduled_date, str):
@@ -99,38 +99,36 @@ Date: {email_data.get('date', 'N/A')}
             
             scheduled_time = parsed_data.get('preferred_time', '09:00')
             
+            # Load active task types once and match in memory
+            active_task_types = list(TaskType.objects.filter(is_active=True))
+            
             # Process each service - FLEXIBLE MATCHING (NO HARD-CODED MAPPING)
             for service_name in parsed_data.get('services', []):
-                service_name_clean = service_name.strip()
+                service_name_clean = service_name.strip().lower()
                 
                 # Try exact match first (case-insensitive)
-                task_type = TaskType.objects.filter(
-                    name__iexact=service_name_clean,
-                    is_active=True
-                ).first()
+                task_type = next(
+                    (tt for tt in active_task_types if tt.name.lower() == service_name_clean),
+                    None
+                )
                 
                 # If not found, try partial match (contains)
                 if not task_type:
-                    task_type = TaskType.objects.filter(
-                        name__icontains=service_name_clean,
-                        is_active=True
-                    ).first()
+                    task_type = next(
+                        (tt for tt in active_task_types if service_name_clean in tt.name.lower()),
+                        None
+                    )
                 
                 if task_type:
-                    Task.objects.create(
-                        package=package,
-                        task_type=task_type,
-                        points=task_type.points,
-                        scheduled_date=scheduled_date,
-                        scheduled_time=scheduled_time,
-                        status='pending'
-                    )
+                    builder.add_task(package, task_type, scheduled_date, scheduled_time)
                     result['tasks_created'] += 1
                 else:
                     result['tasks_not_found'].append(service_name)
             
-            # Calculate points
-            package.calculate_total_points()
+            # Save package + tasks (points summed in memory)
+            builder.save()
+            
+            result['package_id'] = package.package_id
             
             # 5. Notify managers - ONLY FOR CORRECT BRANCH
             branch = parsed_data.get('branch')
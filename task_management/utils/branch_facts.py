@@ -0,0 +1,196 @@
+# task_management/utils/branch_facts.py
+"""
+Branch x day fact table behind the closing-report analytics.
+
+ClosingReport.save() and Task.save() keep BranchDailyFacts current through
+record_closing_report() / record_task_completion(); the analytics views read
+a whole period with load_facts() in one range query. project_series() fits
+a linear trend plus day-of-week seasonality for the revenue projection.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from task_management.models import BranchDailyFacts, ClosingReport, Task
+
+
+# Days of history the projection model is fitted on
+PROJECTION_HISTORY_DAYS = 56
+
+# Below this many observed days the trend/seasonality fit is too noisy
+MIN_OBSERVATIONS_FOR_MODEL = 14
+
+
+def _upsert(branch, on_date, values=None, increments=None):
+    """Apply absolute `values` and F() `increments` to one fact row, creating it if missing"""
+    values = values or {}
+    increments = increments or {}
+
+    updates = dict(values)
+    updates.update({field: F(field) + amount for field, amount in increments.items()})
+    updates['updated_at'] = timezone.now()
+
+    def bump():
+        return BranchDailyFacts.objects.filter(branch=branch, date=on_date).update(**updates)
+
+    if bump():
+        return
+
+    try:
+        with transaction.atomic():
+            BranchDailyFacts.objects.create(branch=branch, date=on_date, **values, **increments)
+    except IntegrityError:
+        # Created concurrently - apply to the existing row
+        bump()
+
+
+def record_closing_report(report):
+    """Copy a closing report's figures into its branch/day row"""
+    _upsert(report.branch, report.date, values={
+        'has_report': True,
+        'revenue': report.revenue_total,
+        'customers': report.total_customers,
+        'grooming_count': report.grooming_count,
+        'boarding_count': report.boarding_count,
+    })
+
+
+def clear_closing_report(branch, on_date):
+    """Remove a closing report's figures from a branch/day row (deleted or moved away)"""
+    BranchDailyFacts.objects.filter(branch=branch, date=on_date).update(
+        has_report=False,
+        revenue=Decimal('0.00'),
+        customers=0,
+        grooming_count=0,
+        boarding_count=0,
+        updated_at=timezone.now(),
+    )
+
+
+def record_task_completion(task, completed_at=None, undo=False):
+    """Count a task completion (or take one back) on its branch/day row"""
+    branch = task.package.branch
+    on_date = timezone.localdate(completed_at) if completed_at else date.today()
+
+    if undo:
+        BranchDailyFacts.objects.filter(branch=branch, date=on_date).update(
+            tasks_completed=F('tasks_completed') - 1,
+            task_points=F('task_points') - (task.points or 0),
+            updated_at=timezone.now(),
+        )
+        return
+
+    _upsert(branch, on_date, increments={
+        'tasks_completed': 1,
+        'task_points': task.points or 0,
+    })
+
+
+def load_facts(start, end=None, branch=None):
+    """All fact rows in [start, end] (optionally one branch), oldest first"""
+    facts = BranchDailyFacts.objects.filter(date__gte=start)
+    if end is not None:
+        facts = facts.filter(date__lte=end)
+    if branch is not None:
+        facts = facts.filter(branch=branch)
+    return list(facts.order_by('date').values(
+        'branch', 'date', 'has_report', 'revenue', 'customers',
+        'grooming_count', 'boarding_count', 'tasks_completed', 'task_points',
+    ))
+
+
+def project_series(observations, horizon=30, today=None):
+    """
+    Project a daily series `horizon` days past `today`.
+
+    `observations` is a list of (date, value) for days that actually have
+    data. With enough history the model is value ~ a + b*t + weekday effect,
+    fitted by least squares; otherwise the flat mean is used. Projections
+    are never negative.
+    """
+    today = today or date.today()
+    future = [today + timedelta(days=i) for i in range(1, horizon + 1)]
+
+    if not observations:
+        return [0.0] * horizon
+
+    values = np.array([float(v) for _, v in observations])
+
+    if len(observations) < MIN_OBSERVATIONS_FOR_MODEL:
+        return [round(float(values.mean()), 2)] * horizon
+
+    def design(days):
+        t = np.array([(d - today).days for d in days], dtype=float)
+        weekday = np.eye(7)[[d.weekday() for d in days]][:, 1:]  # Monday is the baseline
+        return np.column_stack([np.ones(len(days)), t, weekday])
+
+    coefficients, *_ = np.linalg.lstsq(design([d for d, _ in observations]), values, rcond=None)
+    projected = np.clip(design(future) @ coefficients, 0, None)
+
+    return [round(float(v), 2) for v in projected]
+
+
+def rebuild_facts(start=None, end=None, apps=None):
+    """
+    Recompute every fact row in [start, end] from ClosingReport and Task
+    (one grouped query each) and replace the stored rows. A missing bound
+    means all history. Pass a migration's `apps` to run against the
+    historical models. Returns the number of rows written.
+    """
+    facts_model, report_model, task_model = (
+        (apps.get_model('task_management', name) for name in ('BranchDailyFacts', 'ClosingReport', 'Task'))
+        if apps else (BranchDailyFacts, ClosingReport, Task)
+    )
+
+    def in_range(queryset, field):
+        if start is not None:
+            queryset = queryset.filter(**{f'{field}__gte': start})
+        if end is not None:
+            queryset = queryset.filter(**{f'{field}__lte': end})
+        return queryset
+
+    rows = defaultdict(dict)
+
+    for report in in_range(report_model.objects.all(), 'date').values(
+        'branch', 'date', 'revenue_total', 'total_customers', 'grooming_count', 'boarding_count'
+    ):
+        rows[(report['branch'], report['date'])].update({
+            'has_report': True,
+            'revenue': report['revenue_total'],
+            'customers': report['total_customers'],
+            'grooming_count': report['grooming_count'],
+            'boarding_count': report['boarding_count'],
+        })
+
+    completions = in_range(
+        task_model.objects.filter(status='completed', completed_at__isnull=False), 'completed_at__date'
+    ).annotate(
+        day=TruncDate('completed_at')
+    ).values('package__branch', 'day').annotate(
+        completed=Count('id'),
+        points=Sum('points'),
+    )
+
+    for row in completions:
+        rows[(row['package__branch'], row['day'])].update({
+            'tasks_completed': row['completed'],
+            'task_points': row['points'] or 0,
+        })
+
+    facts = [
+        facts_model(branch=branch, date=on_date, **fields)
+        for (branch, on_date), fields in rows.items()
+    ]
+
+    with transaction.atomic():
+        in_range(facts_model.objects.all(), 'date').delete()
+        facts_model.objects.bulk_create(facts, batch_size=500)
+
+    return len(facts)
@@ -0,0 +1,243 @@
+# task_management/utils/bulk_export.py
+"""
+Columnar bulk exports for payroll/BI pulls.
+
+Each BulkTable streams raw column values with values_list().iterator()
+as gzip CSV or, when pyarrow is installed, Parquet (one row group per
+chunk). Exports can be incremental: only rows changed after a `since`
+watermark and up to `until` are included. The next pull passes `until`
+back as its `since`.
+"""
+
+import csv
+import io
+import zlib
+from datetime import datetime, time
+
+from django.db.models import DateTimeField, F
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from performance.models import DailyPoints, MonthlyIncentive
+from task_management.models import ClosingReport, Task, TaskCompletion, TaskPackage
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+CHUNK_SIZE = 5000
+
+FORMATS = ('csv', 'parquet')
+
+CONTENT_TYPES = {
+    'csv': 'application/gzip',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+EXTENSIONS = {
+    'csv': 'csv.gz',
+    'parquet': 'parquet',
+}
+
+
+def _latest(*fields):
+    """Most recent of several (nullable) timestamps, never NULL"""
+    first = fields[0]
+    return Greatest(*[Coalesce(field, first) for field in fields], output_field=DateTimeField())
+
+
+class BulkTable:
+    """
+    One exportable model: the concrete columns to export and how to find
+    rows changed since a watermark.
+
+    `changed_at` is an expression giving each row's last-change time.
+    """
+
+    def __init__(self, name, model, changed_at, order_by='id'):
+        self.name = name
+        self.model = model
+        self.changed_at = changed_at
+        self.order_by = order_by
+
+    @property
+    def fields(self):
+        return list(self.model._meta.concrete_fields)
+
+    @property
+    def columns(self):
+        return [field.attname for field in self.fields]
+
+    def queryset(self, since=None, until=None):
+        queryset = self.model.objects.all()
+
+        if since or until:
+            queryset = queryset.annotate(_changed_at=self.changed_at)
+            if since:
+                queryset = queryset.filter(_changed_at__gt=since)
+            if until:
+                queryset = queryset.filter(_changed_at__lte=until)
+
+        return queryset.order_by(self.order_by)
+
+    def rows(self, since=None, until=None, chunk_size=CHUNK_SIZE):
+        """Yield value tuples, fetched `chunk_size` rows at a time"""
+        return self.queryset(since, until).values_list(*self.columns).iterator(chunk_size=chunk_size)
+
+
+TABLES = {
+    table.name: table for table in [
+        BulkTable('tasks', Task, changed_at=F('updated_at')),
+        BulkTable('packages', TaskPackage, changed_at=F('updated_at')),
+        BulkTable(
+            'task-completions', TaskCompletion,
+            changed_at=_latest('completed_at', 'points_awarded_at'),
+        ),
+        BulkTable('daily-points', DailyPoints, changed_at=F('updated_at')),
+        BulkTable('monthly-incentives', MonthlyIncentive, changed_at=F('updated_at')),
+        BulkTable('closing-reports', ClosingReport, changed_at=F('updated_at')),
+    ]
+}
+
+
+def parse_watermark(value):
+    """ISO date/datetime string -> aware datetime (None for empty)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if not isinstance(parsed, datetime):
+        parsed = datetime.combine(parsed, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def resolve_format(fmt):
+    """'auto' picks Parquet when pyarrow is installed, otherwise gzip CSV"""
+    if fmt in (None, '', 'auto'):
+        return 'parquet' if PYARROW_AVAILABLE else 'csv'
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (choose from {', '.join(FORMATS)})")
+    if fmt == 'parquet' and not PYARROW_AVAILABLE:
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+    return fmt
+
+
+# ============================================
+# GZIP CSV
+# ============================================
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv_gz(table, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """Yield gzip-compressed CSV bytes (header + rows), one piece per chunk"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = compressor.compress(buffer.getvalue().encode('utf-8'))
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(table.columns)
+
+    pending = 0
+    for row in table.rows(since, until, chunk_size):
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= chunk_size:
+            data = flush()
+            if data:
+                yield data
+            pending = 0
+
+    yield flush() + compressor.flush()
+
+
+def write_csv_gz(fileobj, table, since=None, until=None, chunk_size=CHUNK_SIZE):
+    for data in iter_csv_gz(table, since, until, chunk_size):
+        fileobj.write(data)
+
+
+# ============================================
+# PARQUET
+# ============================================
+
+def _arrow_type(field):
+    internal = field.get_internal_type()
+    if internal in ('AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField',
+                    'PositiveIntegerField', 'SmallIntegerField', 'PositiveSmallIntegerField'):
+        return pa.int64()
+    if internal in ('ForeignKey', 'OneToOneField'):
+        return _arrow_type(field.target_field)
+    if internal == 'DecimalField':
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if internal == 'BooleanField':
+        return pa.bool_()
+    if internal == 'DateField':
+        return pa.date32()
+    if internal == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    if internal == 'TimeField':
+        return pa.time64('us')
+    if internal == 'FloatField':
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_schema(table):
+    return pa.schema([
+        pa.field(field.attname, _arrow_type(field), nullable=field.null)
+        for field in table.fields
+    ])
+
+
+def write_parquet(fileobj, table, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """Write the table as Parquet, one row group per `chunk_size` rows"""
+    schema = arrow_schema(table)
+    columns = table.columns
+
+    with pq.ParquetWriter(fileobj, schema, compression='snappy') as writer:
+        batch = []
+
+        def write_batch():
+            arrays = [
+                pa.array([row[i] for row in batch], type=schema.field(i).type)
+                for i in range(len(columns))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            batch.clear()
+
+        for row in table.rows(since, until, chunk_size):
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                write_batch()
+
+        if batch:
+            write_batch()
+
+
+def export_table(fileobj, table, fmt, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """Write `table` to `fileobj` in `fmt` ('csv' or 'parquet')"""
+    if fmt == 'parquet':
+        write_parquet(fileobj, table, since, until, chunk_size)
+    else:
+        write_csv_gz(fileobj, table, since, until, chunk_size)
+
+
+def export_filename(table, fmt, until):
+    return f"{table.name.replace('-', '_')}_{timezone.localtime(until):%Y%m%d_%H%M%S}.{EXTENSIONS[fmt]}"
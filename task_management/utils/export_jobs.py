@@ -0,0 +1,396 @@
+# task_management/utils/export_jobs.py
+"""
+Database-backed export queue.
+
+Views call enqueue_export() and get back a job id straight away; the file
+is rendered by a worker that claims ExportJob rows with a conditional
+UPDATE, so any number of workers can share the queue without a broker:
+
+- `python manage.py run_export_worker` as its own process, and/or
+- an in-process daemon thread started on enqueue (EXPORT_WORKER_MODE =
+  'thread', the default), so single-process deployments still work.
+  Set EXPORT_WORKER_MODE = 'process' on web wherever the worker command
+  runs (the Procfile does) so renders stay off the request processes.
+
+Both requeue jobs whose worker died and purge expired files, at most once
+every HOUSEKEEPING_INTERVAL seconds.
+
+Finished files are stored on the job for EXPORT_JOB_TTL seconds and
+identical requests within EXPORT_REUSE_WINDOW reuse the same job.
+"""
+
+import hashlib
+import json
+import tempfile
+import threading
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+
+from task_management.models import ExportJob
+
+
+EXPORT_WORKER_MODE = getattr(settings, 'EXPORT_WORKER_MODE', 'thread')
+EXPORT_JOB_TTL = getattr(settings, 'EXPORT_JOB_TTL', 24 * 3600)  # seconds
+EXPORT_REUSE_WINDOW = getattr(settings, 'EXPORT_REUSE_WINDOW', 10 * 60)  # seconds
+
+# A job running longer than this is assumed dead (worker restarted)
+STALE_AFTER = timedelta(minutes=15)
+MAX_ATTEMPTS = 2
+
+# Old failed/expired job rows are deleted after this long
+KEEP_FINISHED_FOR = timedelta(days=7)
+
+# Housekeeping (stale/expired jobs) runs at most every this many seconds per worker
+HOUSEKEEPING_INTERVAL = 300
+
+RENDERERS = {}
+
+# Kinds whose result is stored elsewhere: the renderer returns content=None
+# and the job's download link points at this `url(params)` instead
+DOWNLOAD_URLS = {}
+
+
+def renderer(kind, download_url=None):
+    """
+    Register `func(params, progress) -> (content, filename, content_type)` for a
+    job kind. Pass `download_url(params)` when func stores the file itself.
+    """
+    def register(func):
+        RENDERERS[kind] = func
+        if download_url:
+            DOWNLOAD_URLS[kind] = download_url
+        return func
+    return register
+
+
+def params_hash(kind, params):
+    payload = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# ============================================
+# ENQUEUE
+# ============================================
+
+def enqueue(kind, params, user=None):
+    """
+    Queue an export, or return a queued/running job or recent result for
+    the same kind and parameters. Returns (job, created).
+    """
+    if kind not in RENDERERS:
+        raise ValueError(f"Unknown export kind: {kind}")
+
+    digest = params_hash(kind, params)
+    now = timezone.now()
+
+    existing = ExportJob.objects.filter(kind=kind, params_hash=digest).filter(
+        Q(status__in=['queued', 'running']) |
+        Q(status='done', finished_at__gte=now - timedelta(seconds=EXPORT_REUSE_WINDOW), expires_at__gt=now)
+    ).defer('content').order_by('-created_at').first()
+
+    if existing:
+        return existing, False
+
+    job = ExportJob.objects.create(
+        kind=kind,
+        params=params,
+        params_hash=digest,
+        requested_by=user,
+        message='Waiting for worker',
+    )
+
+    if EXPORT_WORKER_MODE == 'thread':
+        transaction.on_commit(start_inline_worker)
+
+    return job, True
+
+
+def job_urls(job):
+    if job.kind in DOWNLOAD_URLS:
+        download_url = DOWNLOAD_URLS[job.kind](job.params)
+    else:
+        download_url = reverse('task_management:export_job_download', args=[job.job_id])
+    return {
+        'detail_url': reverse('task_management:export_job_detail', args=[job.job_id]),
+        'status_url': reverse('task_management:export_job_status', args=[job.job_id]),
+        'download_url': download_url,
+    }
+
+
+def wants_json(request):
+    return (
+        request.headers.get('x-requested-with') == 'XMLHttpRequest'
+        or 'application/json' in request.headers.get('accept', '')
+    )
+
+
+def enqueue_export(request, kind, params):
+    """
+    Queue an export for the current user. AJAX/JSON callers get 202 with the
+    job id and URLs; browsers are redirected to the job page.
+    """
+    job, created = enqueue(kind, params, request.user)
+
+    if wants_json(request):
+        return JsonResponse({
+            'job_id': str(job.job_id),
+            'status': job.status,
+            'reused': not created,
+            **job_urls(job),
+        }, status=202)
+
+    return redirect('task_management:export_job_detail', job_id=job.job_id)
+
+
+# ============================================
+# WORKER
+# ============================================
+
+def claim_next_job():
+    """Claim the oldest queued job; the conditional UPDATE makes the claim exclusive"""
+    candidates = ExportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True)[:10]
+
+    for job_id in candidates:
+        claimed = ExportJob.objects.filter(id=job_id, status='queued').update(
+            status='running',
+            started_at=timezone.now(),
+            progress=0,
+            message='Starting',
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ExportJob.objects.defer('content').get(id=job_id)
+
+    return None
+
+
+def run_job(job):
+    """Render one claimed job and store the result (or the failure)"""
+    def progress(percent, message=''):
+        ExportJob.objects.filter(id=job.id, status='running').update(
+            progress=max(0, min(int(percent), 99)),
+            message=message[:255],
+        )
+
+    try:
+        render = RENDERERS.get(job.kind)
+        if render is None:
+            raise ValueError(f"Unknown export kind: {job.kind}")
+        content, filename, content_type = render(job.params, progress)
+    except Exception as e:
+        ExportJob.objects.filter(id=job.id).update(
+            status='failed',
+            message=f'Export failed: {e}'[:255],
+            error=traceback.format_exc()[-4000:],
+            finished_at=timezone.now(),
+        )
+        print(f"❌ Export {job.job_id} ({job.kind}) failed: {e}")
+        return False
+
+    now = timezone.now()
+    ExportJob.objects.filter(id=job.id).update(
+        status='done',
+        progress=100,
+        message='Ready',
+        filename=filename,
+        content_type=content_type,
+        content=content,
+        size=len(content) if content is not None else 0,
+        finished_at=now,
+        expires_at=now + timedelta(seconds=EXPORT_JOB_TTL),
+    )
+    return True
+
+
+def process_pending_jobs(limit=None):
+    """Run queued jobs until the queue is empty (or `limit` jobs ran)"""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def requeue_stale_jobs():
+    """Put jobs whose worker died back on the queue (or fail them after MAX_ATTEMPTS)"""
+    cutoff = timezone.now() - STALE_AFTER
+    stale = ExportJob.objects.filter(status='running', started_at__lt=cutoff)
+
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='queued', message='Retrying')
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed',
+        message='Export timed out',
+        finished_at=timezone.now(),
+    )
+    return requeued
+
+
+def purge_expired_jobs():
+    """Drop stored files past their TTL and delete old finished job rows"""
+    now = timezone.now()
+    expired = ExportJob.objects.filter(status='done', expires_at__lte=now).update(
+        status='expired',
+        content=None,
+        message='Expired',
+    )
+    ExportJob.objects.filter(
+        status__in=['failed', 'expired'],
+        created_at__lt=now - KEEP_FINISHED_FOR,
+    ).delete()
+    return expired
+
+
+_inline_lock = threading.Lock()
+_last_inline_housekeeping = None
+
+
+def start_inline_worker():
+    """Drain the queue on a daemon thread in this process (one at a time)"""
+    if not _inline_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_drain_inline, name='export-worker', daemon=True).start()
+
+
+def _drain_inline():
+    global _last_inline_housekeeping
+    try:
+        close_old_connections()
+        # Thread-mode deployments have no run_export_worker to do this
+        now = time.monotonic()
+        if _last_inline_housekeeping is None or now - _last_inline_housekeeping >= HOUSEKEEPING_INTERVAL:
+            _last_inline_housekeeping = now
+            requeue_stale_jobs()
+            purge_expired_jobs()
+        process_pending_jobs()
+    finally:
+        _inline_lock.release()
+        # A job queued while we were finishing up would otherwise wait
+        pending = ExportJob.objects.filter(status='queued').exists()
+        connection.close()
+        if pending:
+            start_inline_worker()
+
+
+# ============================================
+# RENDERERS
+# ============================================
+
+@renderer('closing_reports_pdf')
+def render_closing_reports_pdf(params, progress):
+    from accounts.models import User
+    from task_management.models import ClosingReport
+    from task_management.utils.pdf_export import generate_reports_summary_pdf
+
+    progress(10, 'Loading reports')
+    reports = ClosingReport.objects.all()
+    if params.get('branch'):
+        reports = reports.filter(branch=params['branch'])
+    if params.get('date_from'):
+        reports = reports.filter(date__gte=params['date_from'])
+    if params.get('date_to'):
+        reports = reports.filter(date__lte=params['date_to'])
+    reports = list(reports.select_related('submitted_by').order_by('-date', '-submitted_at'))
+
+    filter_info = {}
+    if params.get('branch'):
+        filter_info['branch'] = dict(User.BRANCH_CHOICES).get(params['branch'], params['branch'])
+    if params.get('date_from'):
+        filter_info['date_from'] = params['date_from']
+    if params.get('date_to'):
+        filter_info['date_to'] = params['date_to']
+
+    progress(30, f'Rendering {len(reports)} report(s)')
+    pdf_buffer = generate_reports_summary_pdf(reports, filter_info)
+
+    filename = f"Closing_Reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return pdf_buffer.getvalue(), filename, 'application/pdf'
+
+
+def _closing_report_pdf_url(params):
+    return reverse('task_management:download_closing_report_pdf', args=[params['report_id']])
+
+
+@renderer('closing_report_pdf', download_url=_closing_report_pdf_url)
+def render_closing_report_pdf(params, progress):
+    from task_management.models import ClosingReport
+    from task_management.utils.report_pdfs import current_artifact, render_report_pdf, report_pdf_filename
+
+    report = ClosingReport.objects.select_related('submitted_by').get(report_id=params['report_id'])
+
+    # Another job (or the pre-render pass) may already have rendered this version
+    if current_artifact(report) is None:
+        progress(30, 'Rendering PDF')
+        render_report_pdf(report)
+
+    # The bytes live in ClosingReportPdf; the download is served from there
+    return None, report_pdf_filename(report), 'application/pdf'
+
+
+@renderer('dataset_excel')
+def render_dataset_excel(params, progress):
+    from task_management.utils.exports import DATASETS, SPOOL_MAX_SIZE, XLSX_CONTENT_TYPE, write_xlsx
+
+    dataset = DATASETS[params['dataset']]
+
+    progress(10, f'Writing {dataset.title}')
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        rows = write_xlsx(spool, dataset.title, dataset.headers, dataset.rows(
+            branch=params.get('branch'),
+            date_from=params.get('date_from'),
+            date_to=params.get('date_to'),
+        ))
+        progress(90, f'{rows} row(s) written')
+        spool.seek(0)
+        content = spool.read()
+
+    filename = f"{params['dataset'].replace('-', '_')}_{date.today()}.xlsx"
+    return content, filename, XLSX_CONTENT_TYPE
+
+
+def _schedule_pdf(build, *args):
+    from schedule.views import render_pdf
+
+    template_path, context, filename, cache_key = build(*args)
+    return render_pdf(template_path, context, filename, cache_key=cache_key)
+
+
+@renderer('staff_schedule_pdf')
+def render_staff_schedule_pdf(params, progress):
+    from accounts.models import User
+    from schedule.views import build_staff_schedule_export, parse_export_date
+
+    progress(20, 'Rendering schedule')
+    staff = User.objects.get(id=params['staff_id'])
+    return _schedule_pdf(build_staff_schedule_export, staff, params['type'], parse_export_date(params['date']))
+
+
+@renderer('manager_schedule_pdf')
+def render_manager_schedule_pdf(params, progress):
+    from accounts.models import User
+    from schedule.views import build_manager_schedule_export, parse_export_date
+
+    progress(20, 'Rendering schedule')
+    manager = User.objects.get(id=params['manager_id'])
+    return _schedule_pdf(build_manager_schedule_export, manager, params['type'], parse_export_date(params['date']))
+
+
+@renderer('admin_schedule_pdf')
+def render_admin_schedule_pdf(params, progress):
+    from schedule.views import build_admin_schedule_export, parse_export_date
+
+    progress(20, 'Rendering schedule')
+    return _schedule_pdf(
+        build_admin_schedule_export, None, params['type'], parse_export_date(params['date']), params['branch']
+    )
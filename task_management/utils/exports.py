@@ -0,0 +1,220 @@
+# task_management/utils/exports.py
+"""
+Admin data exports.
+
+Each ExportDataset knows its queryset, filters and columns. write_xlsx()
+writes one through an openpyxl write-only worksheet while iterating the
+queryset in chunks, so neither the rows nor the workbook are held in
+memory. The export queue (utils/export_jobs.py) renders datasets into a
+spooled temp file and serves the result as a job download.
+"""
+
+from itertools import chain, islice
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from performance.models import DailyPoints
+from task_management.models import ClosingReport, PointRequest, Task
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+ITERATOR_CHUNK_SIZE = 2000
+
+# Write-only sheets need column widths before the first row, so widths are
+# measured on the header plus this many leading rows.
+WIDTH_SAMPLE_ROWS = 500
+MAX_COLUMN_WIDTH = 60
+
+# Exports up to this size stay in memory, larger ones roll over to disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def _yes_no(value):
+    return 'Yes' if value else 'No'
+
+
+def _username(user):
+    return user.username if user else ''
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else ''
+
+
+def _datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
+
+def _number(value):
+    return float(value) if value is not None else 0.0
+
+
+class ExportDataset:
+    """A queryset plus the columns (header, getter) to export from it"""
+
+    def __init__(self, name, title, queryset, columns, branch_field, date_field):
+        self.name = name
+        self.title = title
+        self._queryset = queryset
+        self.columns = columns
+        self.branch_field = branch_field
+        self.date_field = date_field
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    def queryset(self, branch=None, date_from=None, date_to=None):
+        queryset = self._queryset()
+        if branch and branch != 'all':
+            queryset = queryset.filter(**{self.branch_field: branch})
+        if date_from:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': date_from})
+        if date_to:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': date_to})
+        return queryset
+
+    def rows(self, **filters):
+        """Yield one list of cell values per record"""
+        for obj in self.queryset(**filters).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            yield [getter(obj) for _, getter in self.columns]
+
+
+DATASETS = {
+    'closing-reports': ExportDataset(
+        name='closing-reports',
+        title='Closing Reports',
+        queryset=lambda: ClosingReport.objects.select_related('submitted_by').order_by('-date'),
+        branch_field='branch',
+        date_field='date',
+        columns=[
+            ('Report ID', lambda r: r.report_id),
+            ('Date', lambda r: _date(r.date)),
+            ('Branch', lambda r: r.branch),
+            ('Submitted By', lambda r: _username(r.submitted_by)),
+            ('Grooming Count', lambda r: r.grooming_count),
+            ('Boarding Count', lambda r: r.boarding_count),
+            ('Total Customers', lambda r: r.total_customers),
+            ('Payment Record (RM)', lambda r: _number(r.payment_record_amount)),
+            ('Payment Receipt (RM)', lambda r: _number(r.payment_receipt_amount)),
+            ('Revenue Total (RM)', lambda r: _number(r.revenue_total)),
+            ('All Paid Through System', lambda r: _yes_no(r.compliance_all_paid_through_system)),
+            ('Free Services Today', lambda r: _yes_no(r.compliance_free_services_today)),
+            ('Notes', lambda r: r.notes or ''),
+        ],
+    ),
+    'tasks': ExportDataset(
+        name='tasks',
+        title='Tasks',
+        queryset=lambda: Task.objects.select_related(
+            'package', 'package__cat', 'task_type', 'assigned_staff', 'approved_by'
+        ).order_by('-scheduled_date', '-id'),
+        branch_field='package__branch',
+        date_field='scheduled_date',
+        columns=[
+            ('Task ID', lambda t: t.task_id),
+            ('Package ID', lambda t: t.package.package_id),
+            ('Branch', lambda t: t.package.branch),
+            ('Cat', lambda t: t.package.cat.name if t.package.cat_id else ''),
+            ('Task Type', lambda t: t.task_type.name),
+            ('Points', lambda t: t.points),
+            ('Scheduled Date', lambda t: _date(t.scheduled_date)),
+            ('Scheduled Time', lambda t: t.scheduled_time.strftime('%H:%M') if t.scheduled_time else ''),
+            ('Status', lambda t: t.get_status_display()),
+            ('Assigned Staff', lambda t: _username(t.assigned_staff)),
+            ('Completed At', lambda t: _datetime(t.completed_at)),
+            ('Approved By', lambda t: _username(t.approved_by)),
+        ],
+    ),
+    'point-requests': ExportDataset(
+        name='point-requests',
+        title='Point Requests',
+        queryset=lambda: PointRequest.objects.select_related(
+            'staff', 'task_type', 'approved_by'
+        ).order_by('-date_completed', '-id'),
+        branch_field='staff__branch',
+        date_field='date_completed',
+        columns=[
+            ('Request ID', lambda p: p.request_id),
+            ('Staff', lambda p: _username(p.staff)),
+            ('Branch', lambda p: p.staff.branch),
+            ('Task Type', lambda p: p.task_type.name if p.task_type else ''),
+            ('Date Completed', lambda p: _date(p.date_completed)),
+            ('Reason', lambda p: p.get_reason_display()),
+            ('Details', lambda p: p.reason_details or ''),
+            ('Points Requested', lambda p: _number(p.points_requested)),
+            ('Status', lambda p: p.get_approval_status_display()),
+            ('Points Awarded', lambda p: _number(p.points_awarded)),
+            ('Approved By', lambda p: _username(p.approved_by)),
+            ('Approved At', lambda p: _datetime(p.approved_at)),
+            ('Manager Notes', lambda p: p.manager_notes or ''),
+        ],
+    ),
+    'daily-points': ExportDataset(
+        name='daily-points',
+        title='Daily Points',
+        queryset=lambda: DailyPoints.objects.select_related('user').order_by('-date', 'user__username'),
+        branch_field='user__branch',
+        date_field='date',
+        columns=[
+            ('Date', lambda d: _date(d.date)),
+            ('Staff', lambda d: d.user.username),
+            ('Branch', lambda d: d.user.branch),
+            ('Total Points', lambda d: _number(d.points)),
+            ('Grooming Points', lambda d: _number(d.grooming_points)),
+            ('Service Points', lambda d: _number(d.service_points)),
+            ('Booking Points', lambda d: _number(d.booking_points)),
+            ('Bonus Points', lambda d: _number(d.bonus_points)),
+            ('Grooming Count', lambda d: d.grooming_count),
+            ('Cat Service Count', lambda d: d.cat_service_count),
+            ('Booking Count', lambda d: d.booking_count),
+        ],
+    ),
+}
+
+
+def write_xlsx(fileobj, title, headers, rows):
+    """
+    Write `headers` and `rows` (any iterable of value lists) to `fileobj`
+    as a single-sheet workbook. Returns the number of data rows written.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title[:31])
+
+    rows = iter(rows)
+    sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+
+    widths = [len(str(header)) for header in headers]
+    for row in sample:
+        for i, value in enumerate(row):
+            widths[i] = max(widths[i], len(str(value)) if value is not None else 0)
+
+    for i, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = min(width + 2, MAX_COLUMN_WIDTH)
+
+    # Header style
+    header_fill = PatternFill(start_color='0066CC', end_color='0066CC', fill_type='solid')
+    header_font = Font(bold=True, color='FFFFFF')
+    header_alignment = Alignment(horizontal='center')
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    count = 0
+    for row in chain(sample, rows):
+        ws.append(row)
+        count += 1
+
+    wb.save(fileobj)
+    return count
+
@@ -0,0 +1,88 @@
+# task_management/utils/package_builder.py
+
+from django.db import transaction
+
+from task_management.models import TaskPackage, Task, next_daily_ids
+
+
+class PackageBuilder:
+    """
+    Collects TaskPackages and their Tasks in memory, then writes them in bulk.
+
+    IDs are reserved from the DaySequence in one block per prefix and
+    total_points is summed in memory, so a booking for several cats and
+    services costs a fixed handful of queries instead of one count + insert
+    per task plus a re-read/re-save per package.
+
+    Usage:
+        builder = PackageBuilder()
+        package = builder.add_package(cat, created_by=user, branch=user.branch)
+        builder.add_tasks(package, task_types, scheduled_date, scheduled_time)
+        packages = builder.save()
+    """
+
+    def __init__(self):
+        self.packages = []
+        self._tasks = {}
+
+    def add_package(self, cat, **fields):
+        """Queue a new (unsaved) TaskPackage for `cat` and return it"""
+        package = TaskPackage(cat=cat, **fields)
+        self.packages.append(package)
+        self._tasks[id(package)] = []
+        return package
+
+    def add_task(self, package, task_type, scheduled_date, scheduled_time='09:00', **fields):
+        """Queue one Task of `task_type` under a package from add_package()"""
+        fields.setdefault('points', task_type.points)
+        fields.setdefault('status', 'pending')
+        task = Task(
+            task_type=task_type,
+            scheduled_date=scheduled_date,
+            scheduled_time=scheduled_time or '09:00',
+            **fields
+        )
+        self._tasks[id(package)].append(task)
+        return task
+
+    def add_tasks(self, package, task_types, scheduled_date, scheduled_time='09:00'):
+        """Queue one Task per TaskType, all on the same date/time"""
+        return [
+            self.add_task(package, task_type, scheduled_date, scheduled_time)
+            for task_type in task_types
+        ]
+
+    def tasks_for(self, package):
+        return self._tasks[id(package)]
+
+    @transaction.atomic
+    def save(self):
+        """Insert all queued packages and tasks; returns the saved packages"""
+        if not self.packages:
+            return []
+
+        package_ids = next_daily_ids('PKG', TaskPackage, 'package_id', count=len(self.packages))
+
+        for package, package_id in zip(self.packages, package_ids):
+            tasks = self.tasks_for(package)
+            package.package_id = package_id
+            if tasks:
+                package.total_points = sum(task.points for task in tasks)
+                if not package.scheduled_date:
+                    package.scheduled_date = min(task.scheduled_date for task in tasks)
+
+        TaskPackage.objects.bulk_create(self.packages)
+
+        all_tasks = []
+        for package in self.packages:
+            for task in self.tasks_for(package):
+                task.package = package
+                all_tasks.append(task)
+
+        if all_tasks:
+            task_ids = next_daily_ids('TSK', Task, 'task_id', count=len(all_tasks))
+            for task, task_id in zip(all_tasks, task_ids):
+                task.task_id = task_id
+            Task.objects.bulk_create(all_tasks)
+
+        return self.packages
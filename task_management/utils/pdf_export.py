@@ -5,10 +5,10 @@ from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
-import requests
-from PIL import Image as PILImage
 from datetime import datetime
 
+from .proof_images import ProofImage, fetch_proof_images, proof_image_url
+
 
 def get_branch_display_name(report):
     """Helper function to get branch display name"""
@@ -239,6 +239,13 @@ def generate_reports_summary_pdf(reports, filters=None):
         elements.append(Spacer(1, 0.5*cm))
     
     # INDIVIDUAL REPORT DETAILS (One per page with image)
+    # Fetch every proof image up front, concurrently and through the thumbnail cache
+    proof_images = fetch_proof_images(
+        [proof_image_url(report) for report in reports],
+        max_width=12 * cm,
+        max_height=8 * cm,
+    )
+    
     for idx, report in enumerate(reports):
         if idx > 0:
             elements.append(PageBreak())
@@ -250,7 +257,7 @@ def generate_reports_summary_pdf(reports, filters=None):
         
         # Report info in 2 columns
         info_data = [
-            ['Submitted By:', report.submitted_by.username, 'Total Customers:', str(report.total_customers)],
+            ['Submitted By:', report.submitted_by.username if report.submitted_by else 'N/A', 'Total Customers:', str(report.total_customers)],
             ['Grooming:', str(report.grooming_count), 'Boarding:', str(report.boarding_count)],
             ['Payment Record:', f'RM {report.payment_record_amount:.2f}', 'Payment Receipt:', f'RM {report.payment_receipt_amount:.2f}'],
             ['Balanced:', '✓ Yes' if is_report_balanced(report) else '✗ No', 'Compliant:', '✓ Yes' if is_report_compliant(report) else '✗ No'],
@@ -278,42 +285,8 @@ def generate_reports_summary_pdf(reports, filters=None):
         elements.append(Paragraph("Payment Proof:", heading_style))
         elements.append(Spacer(1, 0.2*cm))
         
-        try:
-            image_url = report.payment_proof_photo.url
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            img_buffer = BytesIO(response.content)
-            pil_img = PILImage.open(img_buffer)
-            
-            # Resize to fit (landscape page)
-            max_width = 12 * cm
-            max_height = 8 * cm
-            
-            img_width, img_height = pil_img.size
-            aspect_ratio = img_height / img_width
-            
-            if img_width > max_width or img_height > max_height:
-                if img_width / max_width > img_height / max_height:
-                    new_width = max_width
-                    new_height = max_width * aspect_ratio
-                else:
-                    new_height = max_height
-                    new_width = max_height / aspect_ratio
-            else:
-                new_width = img_width
-                new_height = img_height
-            
-            img_output = BytesIO()
-            pil_img.save(img_output, format='JPEG', quality=80)
-            img_output.seek(0)
-            
-            img = Image(img_output, width=new_width, height=new_height)
-            elements.append(img)
-            
-        except Exception as e:
-            error_para = Paragraph(f"<i>Image unavailable: {str(e)}</i>", styles['Normal'])
-            elements.append(error_para)
+        proof = proof_images.get(proof_image_url(report)) or ProofImage(error='no image uploaded')
+        elements.append(proof.flowable(styles['Normal']))
         
         # Notes if any
         if report.notes:
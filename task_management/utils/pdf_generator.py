@@ -5,10 +5,11 @@ from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from io import BytesIO
-import requests
-from PIL import Image as PILImage
 from datetime import datetime
 
+from .proof_images import ProofImage, fetch_proof_images, proof_image_url
+from accounts.models import User
+
 
 def generate_closing_report_pdf(report):
     """
@@ -67,8 +68,8 @@ def generate_closing_report_pdf(report):
     report_info_data = [
         ['Report ID:', report.report_id],
         ['Date:', report.date.strftime('%A, %B %d, %Y')],
-        ['Branch:', report.get_branch_display()],
-        ['Submitted By:', report.submitted_by.get_full_name()],
+        ['Branch:', dict(User.BRANCH_CHOICES).get(report.branch, report.branch)],
+        ['Submitted By:', report.submitted_by.get_full_name() if report.submitted_by else 'N/A'],
         ['Submitted At:', report.submitted_at.strftime('%Y-%m-%d %H:%M:%S')],
     ]
     
@@ -213,45 +214,14 @@ def generate_closing_report_pdf(report):
     # =====================================
     elements.append(Paragraph("Payment Proof Image", heading_style))
     
-    try:
-        # Download image from Cloudinary
-        image_url = report.payment_proof_photo.url
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()
-        
-        # Open image and resize if needed
-        img_buffer = BytesIO(response.content)
-        pil_img = PILImage.open(img_buffer)
-        
-        # Resize to fit page width (max 16cm wide)
-        max_width = 16 * cm
-        max_height = 12 * cm
-        
-        img_width, img_height = pil_img.size
-        aspect_ratio = img_height / img_width
-        
-        if img_width > max_width:
-            new_width = max_width
-            new_height = new_width * aspect_ratio
-            if new_height > max_height:
-                new_height = max_height
-                new_width = new_height / aspect_ratio
-        else:
-            new_width = img_width
-            new_height = img_height
-        
-        # Save resized image to buffer
-        img_output = BytesIO()
-        pil_img.save(img_output, format='JPEG', quality=85)
-        img_output.seek(0)
-        
-        # Add image to PDF
-        img = Image(img_output, width=new_width, height=new_height)
-        elements.append(img)
-        
-    except Exception as e:
-        error_text = f"Error loading image: {str(e)}"
-        elements.append(Paragraph(error_text, normal_style))
+    # Download (or reuse the cached thumbnail of) the proof image
+    image_url = proof_image_url(report)
+    proof = fetch_proof_images(
+        [image_url],
+        max_width=16 * cm,
+        max_height=12 * cm,
+    ).get(image_url) or ProofImage(error='no image uploaded')
+    elements.append(proof.flowable(normal_style, message='Error loading image'))
     
     elements.append(Spacer(1, 1*cm))
     
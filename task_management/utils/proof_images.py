@@ -0,0 +1,217 @@
+# task_management/utils/proof_images.py
+"""
+Payment-proof image fetching for the PDF exports.
+
+Images are downloaded concurrently on a bounded thread pool through one
+pooled requests.Session, downscaled once to PDF resolution and kept in an
+LRU disk cache keyed by URL (revalidated with the stored ETag once an entry
+gets old). A fetch that fails or runs past the deadline becomes a
+placeholder instead of holding up the document.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import BytesIO
+
+import requests
+from django.conf import settings
+from PIL import Image as PILImage
+from reportlab.platypus import Image, Paragraph
+from requests.adapters import HTTPAdapter
+
+
+CACHE_DIR = getattr(
+    settings,
+    'PROOF_IMAGE_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'catzoteam_proof_images')
+)
+CACHE_MAX_BYTES = getattr(settings, 'PROOF_IMAGE_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+REVALIDATE_AFTER = 7 * 24 * 3600  # seconds
+
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = (3.05, 10)  # connect, read
+BATCH_DEADLINE = 30  # seconds for a whole batch
+
+# Thumbnails are rendered at this resolution for their box on the page
+PDF_DPI = 150
+JPEG_QUALITY = 80
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared Session with a connection pool sized for the fetch workers"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS, max_retries=1)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+class ProofImage:
+    """A cached thumbnail (path + display size in points) or the reason it's missing"""
+
+    def __init__(self, path=None, width=0, height=0, error=None):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.error = error
+
+    def flowable(self, style, message='Image unavailable'):
+        """reportlab Image for the thumbnail, or an italic placeholder paragraph"""
+        if self.path:
+            try:
+                return Image(self.path, width=self.width, height=self.height)
+            except Exception as e:
+                self.error = str(e)
+        return Paragraph(f"<i>{message}: {self.error}</i>", style)
+
+
+def _cache_paths(url, max_width, max_height):
+    key = hashlib.sha256(f'{url}|{int(max_width)}x{int(max_height)}'.encode()).hexdigest()
+    base = os.path.join(CACHE_DIR, key[:2], key)
+    return f'{base}.jpg', f'{base}.json'
+
+
+def display_size(width_px, height_px, max_width, max_height):
+    """Fit an image into the box (points) keeping its aspect ratio"""
+    if width_px <= max_width and height_px <= max_height:
+        return width_px, height_px
+    scale = min(max_width / width_px, max_height / height_px)
+    return width_px * scale, height_px * scale
+
+
+def _render_thumbnail(content, image_path, max_width, max_height):
+    """Downscale to PDF resolution, write JPEG, return the original pixel size"""
+    pil_img = PILImage.open(BytesIO(content))
+    original_size = pil_img.size
+
+    max_px = (int(max_width / 72 * PDF_DPI), int(max_height / 72 * PDF_DPI))
+    pil_img.draft('RGB', max_px)  # let JPEG decode at reduced scale
+    pil_img.thumbnail(max_px)
+    if pil_img.mode != 'RGB':
+        pil_img = pil_img.convert('RGB')
+
+    tmp_path = f'{image_path}.{threading.get_ident()}.tmp'
+    pil_img.save(tmp_path, format='JPEG', quality=JPEG_QUALITY)
+    os.replace(tmp_path, image_path)
+    return original_size
+
+
+def fetch_proof_image(url, max_width, max_height):
+    """Return a ProofImage for one URL, using the disk cache where possible"""
+    image_path, meta_path = _cache_paths(url, max_width, max_height)
+
+    meta = None
+    if os.path.exists(image_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+
+    headers = {}
+    if meta is not None:
+        if time.time() - meta.get('fetched_at', 0) < REVALIDATE_AFTER or not meta.get('etag'):
+            os.utime(image_path)  # LRU touch
+            return ProofImage(image_path, *display_size(*meta['size'], max_width, max_height))
+        headers['If-None-Match'] = meta['etag']
+
+    response = get_session().get(url, timeout=FETCH_TIMEOUT, headers=headers)
+
+    if response.status_code == 304 and meta is not None:
+        meta['fetched_at'] = time.time()
+    else:
+        response.raise_for_status()
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        size = _render_thumbnail(response.content, image_path, max_width, max_height)
+        meta = {'url': url, 'etag': response.headers.get('ETag', ''), 'size': size, 'fetched_at': time.time()}
+
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    os.utime(image_path)
+
+    return ProofImage(image_path, *display_size(*meta['size'], max_width, max_height))
+
+
+def fetch_proof_images(urls, max_width, max_height):
+    """
+    Fetch many images concurrently. Returns {url: ProofImage}; anything that
+    failed or missed BATCH_DEADLINE comes back with `error` set.
+    """
+    urls = [url for url in dict.fromkeys(urls) if url]
+    if not urls:
+        return {}
+
+    executor = ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(urls)))
+    futures = {
+        executor.submit(fetch_proof_image, url, max_width, max_height): url
+        for url in urls
+    }
+    wait(futures, timeout=BATCH_DEADLINE)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for future, url in futures.items():
+        if not future.done():
+            results[url] = ProofImage(error='timed out')
+        elif future.exception() is not None:
+            results[url] = ProofImage(error=str(future.exception()))
+        else:
+            results[url] = future.result()
+
+    prune_cache()
+    return results
+
+
+def proof_image_url(report):
+    """URL of a report's payment proof, or None if it has no usable file"""
+    try:
+        return report.payment_proof_photo.url if report.payment_proof_photo else None
+    except Exception:
+        return None
+
+
+def prune_cache(max_bytes=None):
+    """Evict least recently used thumbnails until the cache fits in max_bytes"""
+    max_bytes = max_bytes or CACHE_MAX_BYTES
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    entries = []
+    total = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if not name.endswith('.jpg'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    if total <= max_bytes:
+        return
+
+    for _, size, path in sorted(entries):
+        for stale in (path, path[:-len('.jpg')] + '.json'):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        total -= size
+        if total <= max_bytes:
+            break
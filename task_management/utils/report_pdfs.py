@@ -0,0 +1,134 @@
+# task_management/utils/report_pdfs.py
+"""
+Pre-rendered closing report PDFs.
+
+`run_export_worker` calls prerender_report_pdfs() whenever its queue is
+empty: reports saved since their ClosingReportPdf was rendered (or with
+none yet) are rendered once and stored, outside the web processes and
+without an ExportJob. Downloads serve the stored bytes with an ETag; a
+download that finds no current PDF (e.g. in thread mode, where nothing
+pre-renders) queues a 'closing_report_pdf' job, which also writes only
+the ClosingReportPdf.
+"""
+
+import hashlib
+import logging
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from task_management.models import ClosingReport, ClosingReportPdf
+
+
+logger = logging.getLogger(__name__)
+
+# Reports rendered per prerender_report_pdfs() pass
+PRERENDER_BATCH = 5
+
+
+# Everything generate_closing_report_pdf() shows
+FINGERPRINT_FIELDS = [
+    'report_id', 'date', 'branch', 'submitted_by_id', 'submitted_at',
+    'grooming_count', 'boarding_count', 'total_customers',
+    'payment_record_amount', 'payment_receipt_amount', 'revenue_total',
+    'payment_proof_photo', 'compliance_all_paid_through_system',
+    'compliance_free_services_today', 'notes',
+]
+
+
+def report_fingerprint(report):
+    digest = hashlib.sha256()
+    for field in FINGERPRINT_FIELDS:
+        value = getattr(report, field)
+        if field == 'payment_proof_photo':
+            value = value.name if value else ''
+        elif isinstance(value, Decimal):
+            value = f'{value:.2f}'  # in-memory values can carry extra places
+        digest.update(f'{field}={value}\x1f'.encode())
+    return digest.hexdigest()
+
+
+def current_artifact(report, with_content=False):
+    """The stored PDF if it matches the report as it is now, else None"""
+    artifacts = ClosingReportPdf.objects.filter(report=report, source_hash=report_fingerprint(report))
+    if not with_content:
+        artifacts = artifacts.defer('content')
+    return artifacts.first()
+
+
+def report_pdf_params(report):
+    # The fingerprint makes each edit a distinct job instead of reusing
+    # the previous render
+    return {
+        'report_id': report.report_id,
+        'branch': report.branch,
+        'version': report_fingerprint(report),
+    }
+
+
+def report_pdf_filename(report):
+    return f'Closing_Report_{report.report_id}_{report.date}.pdf'
+
+
+def render_report_pdf(report):
+    """Render and store the report's PDF; returns the ClosingReportPdf"""
+    from task_management.utils.pdf_generator import generate_closing_report_pdf
+
+    source_hash = report_fingerprint(report)
+    # Taken before rendering, so an edit saved meanwhile still looks newer
+    rendered_at = timezone.now()
+    content = generate_closing_report_pdf(report).getvalue()
+
+    values = {
+        'source_hash': source_hash,
+        'content_hash': hashlib.sha256(content).hexdigest(),
+        'content': content,
+        'size': len(content),
+        'rendered_at': rendered_at,
+    }
+
+    if not ClosingReportPdf.objects.filter(report=report).update(**values):
+        try:
+            with transaction.atomic():
+                ClosingReportPdf.objects.create(report=report, **values)
+        except IntegrityError:
+            # Created concurrently - overwrite the existing row
+            ClosingReportPdf.objects.filter(report=report).update(**values)
+
+    return ClosingReportPdf(report=report, **values)
+
+
+# (report id, updated_at) whose render failed in this process; retried
+# only after the report changes again
+_failed_renders = set()
+
+
+def prerender_report_pdfs(limit=PRERENDER_BATCH):
+    """Render up to `limit` reports saved since their stored PDF, newest first. Returns how many."""
+    stale = ClosingReport.objects.filter(
+        Q(pdf_artifact__isnull=True) | Q(updated_at__gt=F('pdf_artifact__rendered_at'))
+    ).select_related('submitted_by').order_by('-updated_at')
+
+    rendered = 0
+    for report in stale[:limit + len(_failed_renders)]:
+        if rendered >= limit:
+            break
+        if (report.id, report.updated_at) in _failed_renders:
+            continue
+
+        if current_artifact(report) is not None:
+            # Saved without changing anything the PDF shows
+            ClosingReportPdf.objects.filter(report=report).update(rendered_at=report.updated_at)
+            continue
+
+        try:
+            render_report_pdf(report)
+        except Exception:
+            logger.exception('Pre-rendering the PDF of %s failed', report.report_id)
+            _failed_renders.add((report.id, report.updated_at))
+            continue
+        rendered += 1
+
+    return rendered
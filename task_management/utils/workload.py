@@ -0,0 +1,71 @@
+# task_management/utils/workload.py
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from accounts.models import User
+
+
+WORKLOAD_CACHE_TTL = 60  # seconds
+
+PENDING_STATUSES = ['pending', 'assigned']
+ACTIVE_STATUSES = ['pending', 'assigned', 'in_progress']
+
+
+def _cache_key(branch):
+    return f'branch_workload:{branch}'
+
+
+def branch_workload(branch):
+    """
+    Active staff and managers of a branch with their task load, from one
+    annotated GROUP BY query (cached per branch for WORKLOAD_CACHE_TTL).
+
+    Each User carries:
+        pending_tasks     - tasks pending or assigned
+        active_tasks      - tasks pending, assigned or in progress
+        completed_tasks   - completed tasks
+        total_tasks_count - pending + completed
+        points_value      - sum of task type points over completed tasks
+    """
+    key = _cache_key(branch)
+    staff = cache.get(key)
+
+    if staff is None:
+        staff = list(
+            User.objects.filter(
+                is_active=True,
+                role__in=['staff', 'manager'],
+                branch=branch
+            ).annotate(
+                pending_tasks=Count(
+                    'tm_assigned_tasks',
+                    filter=Q(tm_assigned_tasks__status__in=PENDING_STATUSES)
+                ),
+                active_tasks=Count(
+                    'tm_assigned_tasks',
+                    filter=Q(tm_assigned_tasks__status__in=ACTIVE_STATUSES)
+                ),
+                completed_tasks=Count(
+                    'tm_assigned_tasks',
+                    filter=Q(tm_assigned_tasks__status='completed')
+                ),
+                points_value=Sum(
+                    'tm_assigned_tasks__task_type__points',
+                    filter=Q(tm_assigned_tasks__status='completed')
+                ),
+            ).order_by('username')
+        )
+
+        for member in staff:
+            member.points_value = member.points_value or 0
+            member.total_tasks_count = member.pending_tasks + member.completed_tasks
+
+        cache.set(key, staff, WORKLOAD_CACHE_TTL)
+
+    return staff
+
+
+def invalidate_branch_workload(branch):
+    """Drop the cached workload after assignments change"""
+    cache.delete(_cache_key(branch))
@@ -12,13 +12,23 @@ from django.db.models import Count, Sum, Avg, Max, Min, Q, F
 from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods, require_POST
 from django.utils import timezone
-from .utils.pdf_generator import generate_closing_report_pdf
-from django.http import HttpResponse
-from .utils.pdf_export import generate_reports_summary_pdf
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from .utils.package_builder import PackageBuilder
+from .utils.branch_facts import PROJECTION_HISTORY_DAYS, load_facts, project_series
+from .utils.exports import DATASETS as EXPORT_DATASETS, SPOOL_MAX_SIZE
+from .utils.bulk_export import (
+    CONTENT_TYPES as BULK_CONTENT_TYPES, TABLES as BULK_TABLES,
+    export_filename as bulk_export_filename, export_table, iter_csv_gz,
+    parse_watermark, resolve_format as resolve_bulk_format,
+)
+from .utils.export_jobs import enqueue_export, job_urls
+from .utils.report_pdfs import current_artifact, report_pdf_filename, report_pdf_params
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 import json
 import secrets
+import tempfile
 import string
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
@@ -30,7 +40,7 @@ from io import BytesIO
 from .models import (
     TaskGroup, TaskType, TaskPackage, Task, 
     TaskCompletion, PointRequest, Notification,
-    ServiceRequest, ClosingReport, Cat, Customer
+    ServiceRequest, ClosingReport, ClosingReportPdf, Cat, Customer, ExportJob
 )
 from accounts.models import User
 # ============================================
@@ -276,45 +286,33 @@ def register_service_step3(request):
         # Get package notes
         package_notes = request.POST.get('package_notes', '')
         
-        created_packages = []
-        
-        # Create package for each selected cat
+        # Build every cat's package and tasks, then write them in bulk
+        builder = PackageBuilder()
         for cat in cats:
-            # Create package
-            package = TaskPackage.objects.create(
-                cat=cat,
+            package = builder.add_package(
+                cat,
                 created_by=staff_user,
                 notes=package_notes,
                 status='pending',
             )
             
-            # Create tasks for this package
             for task_type in task_types:
                 # Get date and time for this task
                 scheduled_date = request.POST.get(f'date_{task_type.task_type_id}')
                 scheduled_time = request.POST.get(f'time_{task_type.task_type_id}', '09:00')
                 
                 if scheduled_date:
-                    Task.objects.create(
-                        package=package,
-                        task_type=task_type,
-                        points=task_type.points,
-                        scheduled_date=scheduled_date,
-                        scheduled_time=scheduled_time,
-                        status='pending',
-                    )
-            
-            # Calculate total points
-            package.calculate_total_points()
-            
-            created_packages.append(package)
-            
-            # Send email to customer
+                    builder.add_task(package, task_type, scheduled_date, scheduled_time)
+        
+        created_packages = builder.save()
+        
+        # Send email to customer
+        for package in created_packages:
             try:
                 send_registration_email(package, customer)
                 package.email_sent = True
                 package.email_sent_at = timezone.now()
-                package.save()
+                package.save(update_fields=['email_sent', 'email_sent_at', 'updated_at'])
             except Exception as e:
                 print(f"Email error: {e}")
         
@@ -1408,13 +1406,16 @@ def manager_analytics_dashboard(request):
     period = request.GET.get('period', '30')
     period_days = int(period)
     
-    start_date = date.today() - timedelta(days=period_days)
+    today = date.today()
+    start_date = today - timedelta(days=period_days)
+    last_30_days = today - timedelta(days=30)
     
-    # Get closing reports for the period
-    reports = ClosingReport.objects.filter(
-        branch=request.user.branch,
-        date__gte=start_date
-    ).order_by('date')
+    # One range query covers the chart period and the projection history
+    facts = load_facts(
+        min(start_date, today - timedelta(days=PROJECTION_HISTORY_DAYS)),
+        branch=request.user.branch
+    )
+    report_days = [f for f in facts if f['has_report']]
     
     # Prepare data for charts
     dates = []
@@ -1423,42 +1424,47 @@ def manager_analytics_dashboard(request):
     grooming_counts = []
     boarding_counts = []
     
-    for report in reports:
-        dates.append(report.date.strftime('%Y-%m-%d'))
-        revenues.append(float(report.revenue_total))
-        customers.append(report.total_customers)
-        grooming_counts.append(report.grooming_count)
-        boarding_counts.append(report.boarding_count)
-    
-    # Calculate 30-day projection
-    last_30_days = date.today() - timedelta(days=30)
-    last_30_reports = ClosingReport.objects.filter(
-        branch=request.user.branch,
-        date__gte=last_30_days
-    )
+    for fact in report_days:
+        if fact['date'] < start_date:
+            continue
+        dates.append(fact['date'].strftime('%Y-%m-%d'))
+        revenues.append(float(fact['revenue']))
+        customers.append(fact['customers'])
+        grooming_counts.append(fact['grooming_count'])
+        boarding_counts.append(fact['boarding_count'])
+    
+    # Last 30 days averages (report days only)
+    last_30 = [f for f in report_days if f['date'] >= last_30_days]
+    
+    def average(field):
+        if not last_30:
+            return None
+        return sum(f[field] for f in last_30) / len(last_30)
+    
+    avg_stats = {
+        'avg_revenue': average('revenue'),
+        'avg_customers': average('customers'),
+        'avg_grooming': average('grooming_count'),
+        'avg_boarding': average('boarding_count'),
+    }
     
-    avg_stats = last_30_reports.aggregate(
-        avg_revenue=Avg('revenue_total'),
-        avg_customers=Avg('total_customers'),
-        avg_grooming=Avg('grooming_count'),
-        avg_boarding=Avg('boarding_count')
+    # 30-day projection from trend + day-of-week seasonality
+    projection_dates = [
+        (today + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, 31)
+    ]
+    projection_revenues = project_series(
+        [(f['date'], f['revenue']) for f in report_days
+         if f['date'] >= today - timedelta(days=PROJECTION_HISTORY_DAYS)],
+        horizon=30,
+        today=today,
     )
     
-    # Generate projection for next 30 days
-    projection_dates = []
-    projection_revenues = []
-    
-    for i in range(1, 31):
-        future_date = date.today() + timedelta(days=i)
-        projection_dates.append(future_date.strftime('%Y-%m-%d'))
-        projection_revenues.append(float(avg_stats['avg_revenue'] or 0))
-    
     # Calculate summary stats
-    summary = last_30_reports.aggregate(
-        total_revenue=Sum('revenue_total'),
-        total_customers=Sum('total_customers'),
-        total_reports=Count('id')
-    )
+    summary = {
+        'total_revenue': sum(f['revenue'] for f in last_30) if last_30 else None,
+        'total_customers': sum(f['customers'] for f in last_30) if last_30 else None,
+        'total_reports': len(last_30),
+    }
     
     context = {
         'branch': request.user.get_branch_display(),
@@ -1566,60 +1572,46 @@ def admin_analytics_dashboard(request):
     period = request.GET.get('period', '30')
     period_days = int(period)
     
-    start_date = date.today() - timedelta(days=period_days)
-    end_date = date.today()
+    today = date.today()
+    start_date = today - timedelta(days=period_days)
+    end_date = today
+    last_30_days = today - timedelta(days=30)
+    history_start = today - timedelta(days=PROJECTION_HISTORY_DAYS)
     
     # Generate complete date range for the period
-    date_range = []
-    current_date = start_date
-    while current_date <= end_date:
-        date_range.append(current_date)
-        current_date += timedelta(days=1)
+    date_range = [start_date + timedelta(days=i) for i in range(period_days + 1)]
     
     # Format dates for JSON
     date_labels = [d.strftime('%Y-%m-%d') for d in date_range]
     
+    # Every branch's facts for the window in one range query
+    facts_by_branch = {}
+    for fact in load_facts(min(start_date, history_start), end_date):
+        facts_by_branch.setdefault(fact['branch'], {})[fact['date']] = fact
+    
     # Build data for each branch
     branches_data = {}
     
     for branch_code, branch_name in User.BRANCH_CHOICES:
-        # Get all reports for this branch in the period
-        reports = ClosingReport.objects.filter(
-            branch=branch_code,
-            date__gte=start_date,
-            date__lte=end_date
-        ).order_by('date')
-        
-        # Create a lookup dictionary: date -> report
-        reports_by_date = {
-            report.date: report for report in reports
-        }
+        facts = facts_by_branch.get(branch_code, {})
         
-        # Build arrays with 0 for missing dates
+        # Arrays with 0 for dates without a report
         revenues = []
         customers = []
-        
         for current_date in date_range:
-            if current_date in reports_by_date:
-                report = reports_by_date[current_date]
-                revenues.append(float(report.revenue_total))
-                customers.append(report.total_customers)
+            fact = facts.get(current_date)
+            if fact and fact['has_report']:
+                revenues.append(float(fact['revenue']))
+                customers.append(fact['customers'])
             else:
-                # No report for this date - use 0
                 revenues.append(0)
                 customers.append(0)
         
-        # Calculate 30-day average (only from actual reports, not zeros)
-        last_30_days = date.today() - timedelta(days=30)
-        recent_reports = ClosingReport.objects.filter(
-            branch=branch_code,
-            date__gte=last_30_days
-        )
+        report_days = [f for f in facts.values() if f['has_report']]
         
-        if recent_reports.exists():
-            avg_revenue = recent_reports.aggregate(avg=Avg('revenue_total'))['avg'] or 0
-        else:
-            avg_revenue = 0
+        # 30-day average (only from actual reports, not zeros)
+        recent = [f['revenue'] for f in report_days if f['date'] >= last_30_days]
+        avg_revenue = sum(recent) / len(recent) if recent else 0
         
         branches_data[branch_code] = {
             'name': branch_name,
@@ -1627,34 +1619,33 @@ def admin_analytics_dashboard(request):
             'revenues': revenues,
             'customers': customers,
             'avg_revenue': float(avg_revenue),
+            'projection': project_series(
+                [(f['date'], f['revenue']) for f in report_days if f['date'] >= history_start],
+                horizon=30,
+                today=today,
+            ),
         }
     
     # Generate projection dates (next 30 days)
-    projection_dates = []
-    for i in range(1, 31):
-        future_date = date.today() + timedelta(days=i)
-        projection_dates.append(future_date.strftime('%Y-%m-%d'))
+    projection_dates = [
+        (today + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, 31)
+    ]
     
-    # Calculate system-wide stats
-    last_30_days = date.today() - timedelta(days=30)
-    system_stats = ClosingReport.objects.filter(
-        date__gte=last_30_days
-    ).aggregate(
-        total_revenue=Sum('revenue_total'),
-        total_customers=Sum('total_customers'),
-        total_reports=Count('id'),
-        avg_revenue=Avg('revenue_total')
-    )
+    # Calculate system-wide stats (last 30 days, all branches)
+    recent_reports = [
+        fact
+        for facts in facts_by_branch.values()
+        for fact in facts.values()
+        if fact['has_report'] and fact['date'] >= last_30_days
+    ]
+    total_revenue = sum(f['revenue'] for f in recent_reports)
     
-    # Ensure defaults if no data
-    if system_stats['total_revenue'] is None:
-        system_stats['total_revenue'] = 0
-    if system_stats['total_customers'] is None:
-        system_stats['total_customers'] = 0
-    if system_stats['total_reports'] is None:
-        system_stats['total_reports'] = 0
-    if system_stats['avg_revenue'] is None:
-        system_stats['avg_revenue'] = 0
+    system_stats = {
+        'total_revenue': total_revenue,
+        'total_customers': sum(f['customers'] for f in recent_reports),
+        'total_reports': len(recent_reports),
+        'avg_revenue': total_revenue / len(recent_reports) if recent_reports else 0,
+    }
     
     context = {
         'period': period,
@@ -1675,84 +1666,72 @@ def export_reports_excel(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard:admin_dashboard')
     
-    import openpyxl
-    from openpyxl.styles import Font, Alignment, PatternFill
+    return enqueue_export(request, 'dataset_excel', {
+        'dataset': 'closing-reports',
+        'branch': request.GET.get('branch', 'all'),
+        'date_from': request.GET.get('date_from', ''),
+        'date_to': request.GET.get('date_to', ''),
+    })
+
+
+@login_required
+def export_dataset_excel(request, dataset):
+    """Export tasks, point requests, daily points or closing reports to Excel"""
+    if request.user.role != 'admin':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard:admin_dashboard')
     
-    # Get filters
-    branch_filter = request.GET.get('branch', 'all')
-    date_from = request.GET.get('date_from', '')
-    date_to = request.GET.get('date_to', '')
+    export = EXPORT_DATASETS.get(dataset)
+    if export is None:
+        messages.error(request, f'Unknown export: {dataset}')
+        return redirect('dashboard:admin_dashboard')
     
-    # Query reports
-    reports = ClosingReport.objects.all().order_by('-date')
+    return enqueue_export(request, 'dataset_excel', {
+        'dataset': dataset,
+        'branch': request.GET.get('branch', 'all'),
+        'date_from': request.GET.get('date_from', ''),
+        'date_to': request.GET.get('date_to', ''),
+    })
+
+
+@login_required
+def bulk_export(request, table):
+    """
+    Stream a table as gzip CSV or Parquet for payroll/BI pulls.
+    ?format=auto|csv|parquet, ?since=<ISO datetime> for rows changed after a
+    watermark; the X-Export-Watermark header is the `since` for the next pull.
+    """
+    if request.user.role != 'admin':
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard:admin_dashboard')
     
-    if branch_filter != 'all':
-        reports = reports.filter(branch=branch_filter)
-    if date_from:
-        reports = reports.filter(date__gte=date_from)
-    if date_to:
-        reports = reports.filter(date__lte=date_to)
-    
-    # Create workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Closing Reports'
-    
-    # Header style
-    header_fill = PatternFill(start_color='0066CC', end_color='0066CC', fill_type='solid')
-    header_font = Font(bold=True, color='FFFFFF')
-    
-    # Headers
-    headers = [
-        'Report ID', 'Date', 'Branch', 'Submitted By',
-        'Grooming Count', 'Boarding Count', 'Total Customers',
-        'Payment Record (RM)', 'Payment Receipt (RM)', 'Revenue Total (RM)',
-        'All Paid Through System', 'Free Services Today', 'Notes'
-    ]
+    export = BULK_TABLES.get(table)
+    if export is None:
+        return JsonResponse({'error': f'Unknown table: {table}', 'tables': list(BULK_TABLES)}, status=404)
     
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Data rows
-    for row_num, report in enumerate(reports, 2):
-        ws.cell(row=row_num, column=1, value=report.report_id)
-        ws.cell(row=row_num, column=2, value=report.date.strftime('%Y-%m-%d'))
-        ws.cell(row=row_num, column=3, value=report.branch)
-        ws.cell(row=row_num, column=4, value=report.submitted_by.username if report.submitted_by else '')
-        ws.cell(row=row_num, column=5, value=report.grooming_count)
-        ws.cell(row=row_num, column=6, value=report.boarding_count)
-        ws.cell(row=row_num, column=7, value=report.total_customers)
-        ws.cell(row=row_num, column=8, value=float(report.payment_record_amount))
-        ws.cell(row=row_num, column=9, value=float(report.payment_receipt_amount))
-        ws.cell(row=row_num, column=10, value=float(report.revenue_total))
-        ws.cell(row=row_num, column=11, value='Yes' if report.compliance_all_paid_through_system else 'No')
-        ws.cell(row=row_num, column=12, value='Yes' if report.compliance_free_services_today else 'No')
-        ws.cell(row=row_num, column=13, value=report.notes or '')
-    
-    # Adjust column widths
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(cell.value)
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column].width = adjusted_width
-    
-    # Create HTTP response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename=closing_reports_{date.today()}.xlsx'
+    try:
+        fmt = resolve_bulk_format(request.GET.get('format', 'auto'))
+        since = parse_watermark(request.GET.get('since', ''))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    until = timezone.now()
+    filename = bulk_export_filename(export, fmt, until)
+    
+    if fmt == 'csv':
+        response = StreamingHttpResponse(
+            iter_csv_gz(export, since=since, until=until),
+            content_type=BULK_CONTENT_TYPES[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    else:
+        # Parquet needs the whole file (footer) before it can be read
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        export_table(spool, export, fmt, since=since, until=until)
+        spool.seek(0)
+        response = FileResponse(spool, as_attachment=True, filename=filename, content_type=BULK_CONTENT_TYPES[fmt])
     
-    wb.save(response)
+    response['X-Export-Watermark'] = until.isoformat()
     return response
 
 
@@ -2671,7 +2650,7 @@ def ajax_reassign_tasks(request, user_id):
         )
         
         count = tasks_to_reassign.count()
-        tasks_to_reassign.update(assigned_staff=to_user)
+        tasks_to_reassign.update(assigned_staff=to_user, updated_at=timezone.now())
         
         # Log action
         from task_management.models import log_admin_action
@@ -3171,13 +3150,21 @@ def download_closing_report_pdf(request, report_id):
         messages.error(request, 'Access denied. You can only view reports from your branch.')
         return redirect('task_management:my_closing_reports')
     
-    # Generate PDF
-    pdf_buffer = generate_closing_report_pdf(report)
-    
-    # Create response
-    response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="Closing_Report_{report.report_id}_{report.date}.pdf"'
-    
+    # Serve the pre-rendered PDF; render it in the background if it's missing or stale
+    artifact = current_artifact(report)
+    if artifact is None:
+        return enqueue_export(request, 'closing_report_pdf', report_pdf_params(report))
+    
+    etag = f'"{artifact.content_hash}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    
+    content = ClosingReportPdf.objects.filter(id=artifact.id).values_list('content', flat=True).get()
+    response = HttpResponse(bytes(content), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{report_pdf_filename(report)}"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
     return response
 
 
@@ -3188,47 +3175,83 @@ def export_reports_pdf(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard:staff_dashboard')
     
-    # Get filters
-    branch = request.GET.get('branch', '')
-    date_from = request.GET.get('date_from', '')
-    date_to = request.GET.get('date_to', '')
-    
-    # Base queryset
+    # Managers only ever export their own branch
     if request.user.role == 'admin':
-        reports = ClosingReport.objects.all()
-    else:  # manager
-        reports = ClosingReport.objects.filter(branch=request.user.branch)
-    
-    # Apply filters
-    if branch:
-        reports = reports.filter(branch=branch)
-    if date_from:
-        reports = reports.filter(date__gte=date_from)
-    if date_to:
-        reports = reports.filter(date__lte=date_to)
-    
-    # Order by date descending
-    reports = reports.select_related('submitted_by').order_by('-date', '-submitted_at')
+        branch = request.GET.get('branch', '')
+    else:
+        branch = request.user.branch
     
-    # Prepare filter info for PDF
-    filter_info = {}
-    if branch:
-        branch_display = dict(ClosingReport._meta.get_field('branch').choices).get(branch, branch)
-        filter_info['branch'] = branch_display
-    if date_from:
-        filter_info['date_from'] = date_from
-    if date_to:
-        filter_info['date_to'] = date_to
+    return enqueue_export(request, 'closing_reports_pdf', {
+        'branch': branch,
+        'date_from': request.GET.get('date_from', ''),
+        'date_to': request.GET.get('date_to', ''),
+    })
+
+
+# ============================================
+# BACKGROUND EXPORT JOBS
+# ============================================
+
+def _get_export_job(request, job_id):
+    job = get_object_or_404(ExportJob.objects.defer('content'), job_id=job_id)
+    return job if job.can_access(request.user) else None
+
+
+@login_required
+def export_job_detail(request, job_id):
+    """Progress page for a queued export; polls the status endpoint"""
+    job = _get_export_job(request, job_id)
+    if job is None:
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard:staff_dashboard')
     
-    # Generate PDF
-    pdf_buffer = generate_reports_summary_pdf(reports, filter_info)
+    context = {
+        'job': job,
+        **job_urls(job),
+    }
+    return render(request, 'task_management/export_job.html', context)
+
+
+@login_required
+def export_job_status(request, job_id):
+    """JSON status of an export job"""
+    job = _get_export_job(request, job_id)
+    if job is None:
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    
+    return JsonResponse({
+        'job_id': str(job.job_id),
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.message,
+        'filename': job.filename,
+        'size': job.size,
+        'expires_at': job.expires_at.isoformat() if job.expires_at else None,
+        'download_url': job_urls(job)['download_url'] if job.is_ready else None,
+    })
+
+
+@login_required
+def export_job_download(request, job_id):
+    """Download the finished file of an export job"""
+    job = _get_export_job(request, job_id)
+    if job is None:
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard:staff_dashboard')
     
-    # Create filename
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f'Closing_Reports_{timestamp}.pdf'
+    if not job.is_ready:
+        messages.warning(request, 'This export is not available (still running, failed or expired).')
+        return redirect('task_management:export_job_detail', job_id=job.job_id)
     
-    # Return response
-    response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    content = ExportJob.objects.filter(id=job.id).values_list('content', flat=True).get()
+    if content is None:
+        # Stored outside the job (e.g. a pre-rendered closing report PDF)
+        return redirect(job_urls(job)['download_url'])
     
-    return response
\ No newline at end of file
+    return FileResponse(
+        BytesIO(bytes(content)),
+        as_attachment=True,
+        filename=job.filename,
+        content_type=job.content_type,
+    )